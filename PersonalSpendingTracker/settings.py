@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'walletwizard.middleware.profilingMiddleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,13 +55,14 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_auto_logout.middleware.auto_logout',
+    'walletwizard.middleware.notificationsMiddleware.NotificationDispatchMiddleware',
 ]
 
 ROOT_URLCONF = 'PersonalSpendingTracker.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'walletwizard.helpers.profilingHelpers.ProfiledDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -90,6 +92,18 @@ DATABASES = {
     }
 }
 
+# Cache of the per-user notification figures, read on every page without a query. The default
+# memory cache belongs to one process, so when the server runs several worker processes a user's
+# figures cleared by one of them can still be served by the others until they expire
+# (NOTIFICATION_CACHE_TIMEOUT, five minutes). Set CACHE_BACKEND and CACHE_LOCATION to a cache
+# shared by every worker, such as memcached, to have them refreshed at once.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -159,4 +173,35 @@ AUTO_LOGOUT = {
     # 1800 seconds in 30 minutes 
     'MESSAGE':'This session has expired',
     'REDIRECT_TO_LOGIN_IMMEDIATELY': True,
-}
\ No newline at end of file
+}
+
+# Fraction of requests profiled by the request profiling middleware (0 turns it off, 1 profiles every request)
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0)),
+    'DUPLICATE_QUERY_LIMIT': 5,
+}
+
+# How receipts are sent: 'stream' (by Django, in chunks, with range requests), 'x-sendfile'
+# (Apache mod_xsendfile or lighttpd) or 'x-accel-redirect' (nginx, with an internal location
+# serving MEDIA_ROOT at ACCEL_REDIRECT_PREFIX)
+RECEIPT_SERVING = {
+    'MODE': os.environ.get('RECEIPT_SERVING_MODE', 'stream'),
+    'ACCEL_REDIRECT_PREFIX': '/protected-media/',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'walletwizard.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
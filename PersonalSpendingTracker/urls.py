@@ -54,12 +54,17 @@ urlpatterns = [
     path('createExpenditure/<int:categoryId>/', CreateExpenditureView.as_view(), name='createExpenditure'),
     path('category/<int:categoryId>/edit/<int:expenditureId>/', EditExpenditureView.as_view(), name='editExpenditure'),
     path('category/<int:categoryId>/delete/<int:expenditureId>/', DeleteExpenditureView.as_view(), name='deleteExpenditure'),
+    path('importExpenditures/<int:categoryId>/', ImportExpendituresView.as_view(), name='importExpenditures'),
+    path('exportExpenditures/<str:exportFormat>/', ExportExpendituresView.as_view(), name='exportExpenditures'),
+    path('receipt/<int:expenditureId>/<str:variant>/', ReceiptView.as_view(), name='receipt'),
 
     path('profile/', ProfileView.as_view(), name='profile'),
     path('editProfile/', EditProfileView.as_view(), name='editProfile'),
     path('changePassword/', ChangePasswordView.as_view(template_name = 'changePassword.html'), name='changePassword'),
 
     path('user/<int:userId>/', ShowUserView.as_view(), name='showUser'),
+    path('user/<int:userId>/followers/', FollowListView.as_view(relation='followers'), name='followers'),
+    path('user/<int:userId>/followees/', FollowListView.as_view(relation='followees'), name='followees'),
     path('users/', UserListView.as_view(), name='users'),
     path('followToggle/<int:userId>/', FollowToggleView.as_view(), name='followToggle'),
     path('searchUsers/', searchUsers, name='searchUsers'),
@@ -1,13 +1,14 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, pre_save, post_save, pre_delete, post_delete, m2m_changed
 
 class ExpensetrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'walletwizard'
 
     def ready(self):
-        from walletwizard.models import House
+        from walletwizard.models import House, Category, Expenditure, User
         from .defaultData import DEFAULT_HOUSES
+        from .helpers import rollupHelpers, avatarHelpers, followHelpers, receiptHelpers
 
 
         def createHouses(sender, **kwargs):
@@ -16,4 +17,22 @@ class ExpensetrackerConfig(AppConfig):
                 House.objects.get_or_create(**house)
 
         # Connect the createHouses function to the post_migrate signal
-        post_migrate.connect(createHouses, sender=self)
\ No newline at end of file
+        post_migrate.connect(createHouses, sender=self)
+
+        # Keep the daily spending rollup up to date whenever expenditures change
+        pre_save.connect(rollupHelpers.expenditurePreSave, sender=Expenditure)
+        post_save.connect(rollupHelpers.expenditurePostSave, sender=Expenditure)
+        pre_delete.connect(rollupHelpers.expenditurePreDelete, sender=Expenditure)
+        post_delete.connect(rollupHelpers.expenditurePostDelete, sender=Expenditure)
+        m2m_changed.connect(rollupHelpers.categoryExpendituresChanged, sender=Category.expenditures.through)
+
+        # Count the references to the shared receipt files whenever expenditures change
+        pre_save.connect(receiptHelpers.expenditurePreSave, sender=Expenditure)
+        post_save.connect(receiptHelpers.expenditurePostSave, sender=Expenditure)
+        post_delete.connect(receiptHelpers.expenditurePostDelete, sender=Expenditure)
+
+        # Store the gravatar URLs of a user whenever they are saved
+        pre_save.connect(avatarHelpers.userPreSave, sender=User)
+
+        # Keep the follower and followee counts up to date whenever followers change
+        m2m_changed.connect(followHelpers.userFollowersChanged, sender=User.followers.through)
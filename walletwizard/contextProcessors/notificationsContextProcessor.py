@@ -1,15 +1,18 @@
 from ..models import Notification
+from ..helpers.notificationsHelpers import getCachedNotificationSummary
+from ..helpers.profilingHelpers import profileContextProcessor
 
+@profileContextProcessor
 def getNotifications(request):
     context = {}
     context['unreadNotifications'] = []
     context['readNotifications'] = []
     
     if request.user.is_authenticated:
-        unreadNotifications = Notification.objects.filter(toUser = request.user, isSeen = False)
-        readNotifications = Notification.objects.filter(toUser = request.user, isSeen = True)
-        context['unreadNotifications'] = unreadNotifications
-        context['latestNotifications'] = unreadNotifications[:3]
-        context['readNotifications'] = readNotifications
+        # The dropdown only needs the cached figures, the querysets are lazy and
+        # are only evaluated by the pages that list every notification
+        context.update(getCachedNotificationSummary(request.user))
+        context['unreadNotifications'] = Notification.objects.filter(toUser = request.user, isSeen = False)
+        context['readNotifications'] = Notification.objects.filter(toUser = request.user, isSeen = True)
     
-    return context
\ No newline at end of file
+    return context
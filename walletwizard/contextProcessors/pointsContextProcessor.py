@@ -1,5 +1,7 @@
 from ..models import Points
+from ..helpers.profilingHelpers import profileContextProcessor
 
+@profileContextProcessor
 def getPoints(request):
     context = {}
     if request.user.is_authenticated:
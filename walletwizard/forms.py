@@ -6,7 +6,9 @@ from .models import User, Category, SpendingLimit, Expenditure
 from django.core.validators import RegexValidator
 from walletwizard.helpers.notificationsHelpers import createShareCategoryNotification
 from walletwizard.helpers.modelHelpers import computeTotalSpendingLimitByMonth
-import os
+from walletwizard.helpers.limitBudgetHelpers import getCategoryLimitBudget
+from walletwizard.helpers.importHelpers import getImportFormat
+from walletwizard.helpers.receiptHelpers import queueReceipt
 from django.contrib.auth import authenticate
 from decimal import Decimal
 
@@ -117,17 +119,35 @@ class ExpenditureForm(forms.ModelForm):
                 otherCategory.expenditures.add(expenditure)
                 otherCategory.save()
 
-            # remove old file from media folder
             newReceipt = self.cleaned_data.get("receipt")
-            if (self.initialReceipt != None and self.initialReceipt != newReceipt):
-                path = os.path.join(settings.MEDIA_ROOT, self.initialReceipt.name)
-                if not os.path.isdir(path):
-                    os.remove(path)
+            isReceiptReplaced = self.initialReceipt != newReceipt
+            if isReceiptReplaced:
+                # the old files are left to the receipt collector, they may be shared
+                expenditure.receiptThumbnail = None
+                expenditure.receiptWeb = None
+                expenditure.receiptHash = ''
 
             expenditure.save() 
+            # the new receipt is processed by the receipt worker instead of during the request
+            if isReceiptReplaced and expenditure.receipt:
+                queueReceipt(expenditure)
         return expenditure
 
 
+class ImportExpendituresForm(forms.Form):
+    """Form enabling users to import expenditures from a CSV file or an OFX bank statement."""
+
+    file = forms.FileField(label="CSV file (title, amount, date, description) or OFX bank statement")
+
+    def clean_file(self):
+        """Check the file is a CSV or OFX file."""
+
+        file = self.cleaned_data.get('file')
+        if file and getImportFormat(file.name) is None:
+            raise forms.ValidationError('Only .csv, .ofx and .qfx files can be imported.', code='invalid')
+        return file
+
+
 class CategorySpendingLimitForm(forms.ModelForm):
     """Form enabling users to create or update a category and its spending limit."""
 
@@ -179,9 +199,7 @@ class CategorySpendingLimitForm(forms.ModelForm):
     def validateSpendingLimits(self, timePeriod, amount):
         """Check the new category's spending limit does not exceed user's overall spending limit."""
 
-        categoriesTotal = Decimal(0)
-        for category in Category.objects.filter(users__in=[self.user]):
-            categoriesTotal += category.totalSpendingLimitByMonth()
+        categoriesTotal = getCategoryLimitBudget(self.user)
 
         categoriesTotal += computeTotalSpendingLimitByMonth(timePeriod, amount)
         overallTimePeriod = self.user.overallSpendingLimit.timePeriod
@@ -338,9 +356,7 @@ class OverallSpendingForm(forms.Form):
     def validateSpendingLimits(self, timePeriod, amount):
         """Check user's new overall spending limit does not exceed their current category spending limits."""
 
-        categoriesTotal = Decimal(0)
-        for category in Category.objects.filter(users__in=[self.user]):
-            categoriesTotal += category.totalSpendingLimitByMonth()
+        categoriesTotal = getCategoryLimitBudget(self.user)
         amount = Decimal(amount)
         overallTotal = computeTotalSpendingLimitByMonth(timePeriod, amount)
 
@@ -0,0 +1,20 @@
+'''Helper file for the gravatar URLs stored on each user.'''
+from libgravatar import Gravatar
+
+GRAVATAR_SIZE = 120
+MINI_GRAVATAR_SIZE = 60
+
+def getGravatarUrl(email, size=GRAVATAR_SIZE):
+    return Gravatar(email).get_image(size=size, default='mp')
+
+def setGravatarUrls(user):
+    '''Store the URL of every gravatar size the templates render on the user, hashing the email once.'''
+    gravatar = Gravatar(user.email)
+    user.gravatarUrl = gravatar.get_image(size=GRAVATAR_SIZE, default='mp')
+    user.miniGravatarUrl = gravatar.get_image(size=MINI_GRAVATAR_SIZE, default='mp')
+    return user
+
+def userPreSave(sender, instance, raw=False, **kwargs):
+    '''Recompute the stored URLs whenever a user is saved, as the email may have changed.'''
+    if not raw:
+        setGravatarUrls(instance)
@@ -0,0 +1,154 @@
+'''Helper file for measuring the query count and latency of the app's pages at different data sizes.'''
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from walletwizard.models import *
+from .avatarHelpers import setGravatarUrls
+
+BENCHMARK_SIZES = {
+    'small': {'categoriesPerUser': 2, 'expendituresPerCategory': 5, 'followers': 2, 'notifications': 3},
+    'large': {'categoriesPerUser': 8, 'expendituresPerCategory': 40, 'followers': 15, 'notifications': 30},
+}
+BENCHMARK_USERNAME_PREFIX = 'benchmarkfollower'
+
+def getBenchmarkUrls(user):
+    '''Return (name, url, postData) triples for every page of the user's own data, postData is None for a GET.'''
+    category = user.categories.order_by('id').first()
+    expenditure = category.expenditures.order_by('id').first()
+    follower = user.followers.order_by('id').first()
+    # the report over every category of the user, computed on POST
+    reportData = {'timePeriod': 'month', 'selectedCategory': list(user.categories.values_list('id', flat=True))}
+    urls = [
+        ('home', reverse('home')),
+        ('reports', reverse('reports')),
+        ('scores', reverse('scores')),
+        ('notifications', reverse('notifications')),
+        ('category', reverse('category', args=[category.id])),
+        ('editCategory', reverse('editCategory', args=[category.id])),
+        ('shareCategory', reverse('shareCategory', args=[category.id])),
+        ('createExpenditure', reverse('createExpenditure', args=[category.id])),
+        ('editExpenditure', reverse('editExpenditure', args=[category.id, expenditure.id])),
+        ('exportExpenditures', reverse('exportExpenditures', args=['csv'])),
+        ('profile', reverse('profile')),
+        ('editProfile', reverse('editProfile')),
+        ('users', reverse('users')),
+        ('showUser', reverse('showUser', args=[follower.id])),
+        ('followers', reverse('followers', args=[user.id])),
+        ('followees', reverse('followees', args=[user.id])),
+        ('searchUsers', f"{reverse('searchUsers')}?q={BENCHMARK_USERNAME_PREFIX}"),
+    ]
+    return [(name, url, None) for name, url in urls] + [
+        ('reportsPost', reverse('reports'), reportData),
+    ]
+
+class SqlTimer:
+    '''Database execute wrapper that adds up the time spent running queries.'''
+
+    def __init__(self):
+        self.total = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # the captured query times are rounded to milliseconds, too coarse for a single query
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += time.perf_counter() - start
+
+def requestUrl(client, url, postData=None):
+    '''GET the url, or POST the data to it.'''
+    if postData is None:
+        return client.get(url)
+    return client.post(url, postData)
+
+def measureUrl(client, url, postData=None):
+    '''Request the url and return its query count, total SQL time and wall time (in seconds).'''
+    sqlTimer = SqlTimer()
+    with CaptureQueriesContext(connection) as context, connection.execute_wrapper(sqlTimer):
+        start = time.perf_counter()
+        response = requestUrl(client, url, postData)
+        # streamed responses only run their queries while the content is consumed
+        if response.streaming:
+            b''.join(response.streaming_content)
+        wallTime = time.perf_counter() - start
+    return {
+        'status': response.status_code,
+        'queries': len(context.captured_queries),
+        'sqlTime': sqlTimer.total,
+        'wallTime': wallTime,
+    }
+
+def benchmarkUrls(client, user):
+    '''Measure every benchmark url, after a first request that warms the caches and sessions.'''
+    results = {}
+    for name, url, postData in getBenchmarkUrls(user):
+        requestUrl(client, url, postData)
+        results[name] = measureUrl(client, url, postData)
+    return results
+
+def seedBenchmarkData(user, categoriesPerUser, expendituresPerCategory, followers, notifications):
+    '''Top the user's data up to the given sizes, so one user can be benchmarked at growing sizes.'''
+    _seedCategories(user, categoriesPerUser, expendituresPerCategory)
+    _seedFollowers(user, followers)
+    _seedNotifications(user, notifications)
+
+def _seedCategories(user, categoriesPerUser, expendituresPerCategory):
+    categories = list(user.categories.order_by('id'))
+    for i in range(len(categories), categoriesPerUser):
+        spendingLimit = SpendingLimit.objects.create(timePeriod='monthly', amount=Decimal(1000))
+        category = Category.objects.create(name=f'Benchmark {i}', spendingLimit=spendingLimit)
+        category.users.add(user)
+        user.categories.add(category)
+        categories.append(category)
+
+    today = date.today()
+    for category in categories:
+        existing = category.expenditures.count()
+        newExpenditures = [
+            Expenditure.objects.create(
+                title=f'Benchmark expenditure {i}',
+                amount=Decimal(i % 50 + 1),
+                date=today - timedelta(days=i % 60),
+            ) for i in range(existing, expendituresPerCategory)
+        ]
+        # a single add() refreshes the category's daily spending rollup once
+        category.expenditures.add(*newExpenditures)
+
+def _seedFollowers(user, followers):
+    existing = user.followers.count()
+    password = make_password('Password123')
+    houses = list(House.objects.all())
+    User.objects.bulk_create([
+        setGravatarUrls(User(
+            username=f'{BENCHMARK_USERNAME_PREFIX}{user.id}x{i}',
+            firstName='Benchmark',
+            lastName=f'Follower {i}',
+            email=f'{BENCHMARK_USERNAME_PREFIX}{user.id}x{i}@example.org',
+            password=password,
+            house=houses[i % len(houses)] if houses else None,
+        )) for i in range(existing, followers)
+    ])
+    newFollowers = User.objects.filter(username__startswith=f'{BENCHMARK_USERNAME_PREFIX}{user.id}x').exclude(
+        id__in=user.followers.all()
+    )
+    for follower in newFollowers:
+        Points.objects.create(user=follower, count=50)
+    user.followers.add(*newFollowers)
+    user.followees.add(*newFollowers)
+
+def _seedNotifications(user, notifications):
+    existing = Notification.objects.filter(toUser=user).count()
+    follower = user.followers.order_by('id').first()
+    category = user.categories.order_by('id').first()
+    for i in range(existing, notifications):
+        fields = {'toUser': user, 'title': 'Benchmark', 'message': f'Benchmark notification {i}', 'isSeen': i % 2 == 0}
+        if i % 3 == 1:
+            ShareCategoryNotification.objects.create(type='category', sharedCategory=category, fromUser=follower, **fields)
+        elif i % 3 == 2:
+            FollowRequestNotification.objects.create(type='follow', fromUser=follower, **fields)
+        else:
+            Notification.objects.create(type='basic', **fields)
@@ -0,0 +1,54 @@
+'''Helper file for computing a user's dashboard figures.'''
+from decimal import Decimal
+from django.db.models import Q, Sum
+from .spendingHelpers import getCategorySpentInTimePeriodFilter, getTimePeriodStartAndEnd
+
+class DashboardSummary:
+    '''Spending figures for every category of a user, computed in one grouped query.
+
+    Each category in `categories` is annotated with `totalSpent` (in its spending limit's
+    current time period), `spentThisMonth`, `remainingBudget` (negative when over the limit)
+    and `progress` (as a percentage of the limit).'''
+
+    def __init__(self, user):
+        self.user = user
+        monthStart, monthEnd = getTimePeriodStartAndEnd('monthly')
+        # the daily spending rollup holds at most one row per category per day, so this stays
+        # cheap however many expenditures the categories have
+        categories = user.categories.select_related('spendingLimit').annotate(
+            spentInTimePeriod=Sum(
+                'dailySpendings__total',
+                filter=getCategorySpentInTimePeriodFilter(dateField='dailySpendings__date'),
+            ),
+            spentInMonth=Sum(
+                'dailySpendings__total',
+                filter=Q(dailySpendings__date__gte=monthStart, dailySpendings__date__lt=monthEnd),
+            ),
+        )
+
+        self.categories = []
+        self.totalLimit = Decimal(0)
+        self.totalSpent = Decimal(0)
+        self.totalSpentThisMonth = Decimal(0)
+        for category in categories:
+            limit = category.spendingLimit.amount
+            category.totalSpent = round(category.spentInTimePeriod or Decimal(0), 2)
+            category.spentThisMonth = round(category.spentInMonth or Decimal(0), 2)
+            category.remainingBudget = limit - category.totalSpent
+            category.progress = round(100*category.totalSpent/limit, 2)
+            self.categories.append(category)
+            self.totalLimit += limit
+            self.totalSpent += category.totalSpent
+            self.totalSpentThisMonth += category.spentThisMonth
+
+    def progressAsPercentage(self):
+        '''Return the user's total category progress as a percentage.'''
+        if self.totalLimit == 0:
+            return Decimal('0.00')
+        return round(100*self.totalSpent/self.totalLimit, 2)
+
+    def categoryNames(self):
+        return [str(category) for category in self.categories]
+
+    def spentThisMonthByCategory(self):
+        return [float(category.spentThisMonth) for category in self.categories]
@@ -0,0 +1,71 @@
+'''Helper file for exporting a user's expenditures.'''
+import csv
+import json
+from itertools import groupby
+from walletwizard.models import Category
+
+CategoryExpenditure = Category.expenditures.through
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_FIELDS = ['id', 'title', 'description', 'amount', 'date', 'receipt', 'categories']
+EXPORT_CHUNK_SIZE = 2000
+
+class Echo:
+    '''Pseudo file whose write returns the value, so csv.writer can produce lines for streaming.'''
+
+    def write(self, value):
+        return value
+
+def iterateUserExpenditures(user):
+    '''Yield each of the user's expenditures once as a dict, with the names of all of the user's
+    categories it belongs to. Rows are read through a server-side cursor where the database
+    supports one, so memory use does not grow with the number of expenditures.'''
+
+    rows = CategoryExpenditure.objects.filter(
+        category_id__in=user.categories.values('id')
+    ).order_by('-expenditure__date', 'expenditure_id', 'category__name').values_list(
+        'expenditure_id',
+        'expenditure__title',
+        'expenditure__description',
+        'expenditure__amount',
+        'expenditure__date',
+        'expenditure__receipt',
+        'category__name',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    # an expenditure shared with other categories has one row per category, which are adjacent
+    for _, expenditureRows in groupby(rows, key=lambda row: row[0]):
+        expenditureRows = list(expenditureRows)
+        id, title, description, amount, date, receipt, _ = expenditureRows[0]
+        yield {
+            'id': id,
+            'title': title,
+            'description': description,
+            'amount': str(amount),
+            'date': date.isoformat(),
+            'receipt': receipt or '',
+            'categories': [row[-1] for row in expenditureRows],
+        }
+
+def streamExpendituresAsCsv(user):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for expenditure in iterateUserExpenditures(user):
+        expenditure['categories'] = '; '.join(expenditure['categories'])
+        yield writer.writerow([expenditure[field] for field in EXPORT_FIELDS])
+
+def streamExpendituresAsNdjson(user):
+    for expenditure in iterateUserExpenditures(user):
+        yield json.dumps(expenditure) + '\n'
+
+def streamExpenditures(user, exportFormat):
+    '''Return a generator of the user's expenditures encoded in the given export format.'''
+
+    if exportFormat == 'csv':
+        return streamExpendituresAsCsv(user)
+    if exportFormat == 'ndjson':
+        return streamExpendituresAsNdjson(user)
+    raise ValueError(f'Unknown export format: {exportFormat}')
@@ -0,0 +1,97 @@
+'''Helper file for serving stored files with range and conditional request support.'''
+import mimetypes
+import os
+import re
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+FILE_CHUNK_SIZE = 64 * 1024
+SERVING_MODES = ['stream', 'x-sendfile', 'x-accel-redirect']
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def getFileETag(stat):
+    '''Return a strong ETag built from the file's modification time and size.'''
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+def parseRangeHeader(header, size):
+    '''Return the first and last byte of the Range header, None to ignore it, or raise ValueError if unsatisfiable.'''
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # a suffix range, the last `end` bytes of the file
+        suffixLength = int(end)
+        if suffixLength == 0 or size == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(size - suffixLength, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError('Unsatisfiable range')
+    end = int(end) if end else size - 1
+    return start, min(end, size - 1)
+
+def iterFileRange(path, start, length, chunkSize=FILE_CHUNK_SIZE):
+    '''Yield `length` bytes of the file from `start`, a chunk at a time.'''
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunkSize, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def createFileResponse(request, path, mode='stream', accelRedirectUrl=None):
+    '''Return a response sending the file, streamed in chunks or handed to the web server depending on the mode.'''
+    if mode not in SERVING_MODES:
+        raise ValueError(f'Unknown file serving mode: {mode}')
+    stat = os.stat(path)
+    etag = getFileETag(stat)
+    lastModified = int(stat.st_mtime)
+    # conditional headers (If-None-Match, If-Modified-Since...) are answered without opening the file
+    response = get_conditional_response(request, etag=etag, last_modified=lastModified)
+    if response is None:
+        contentType = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if mode == 'x-sendfile':
+            response = HttpResponse(content_type=contentType)
+            response['X-Sendfile'] = path
+        elif mode == 'x-accel-redirect':
+            response = HttpResponse(content_type=contentType)
+            response['X-Accel-Redirect'] = accelRedirectUrl
+        else:
+            response = createStreamingFileResponse(request, path, stat.st_size, contentType, etag, lastModified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(lastModified)
+    # receipts are private, the browser may keep them but must check they are still current
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def createStreamingFileResponse(request, path, size, contentType, etag, lastModified):
+    '''Return a response streaming the whole file, or the byte range of it that was asked for.'''
+    byteRange = None
+    rangeHeader = request.META.get('HTTP_RANGE')
+    ifRange = request.META.get('HTTP_IF_RANGE')
+    # a range of a file that has changed since the client's copy would not fit with it
+    if rangeHeader and (ifRange is None or ifRange in (etag, http_date(lastModified))):
+        try:
+            byteRange = parseRangeHeader(rangeHeader, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byteRange is None:
+        # handed to the server's file wrapper, which can send it without copying it through Python
+        response = FileResponse(open(path, 'rb'), content_type=contentType)
+    else:
+        start, end = byteRange
+        response = StreamingHttpResponse(iterFileRange(path, start, end - start + 1), status=206, content_type=contentType)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -1,14 +1,12 @@
 '''Helpers file for following functionality.'''
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from walletwizard.models import *
+from .notificationsHelpers import createFollowRequestNotification
 
-def createFollowRequestNotification(toUser, title, message, fromUser):
-    FollowRequestNotification.objects.create(
-        toUser=toUser,
-        fromUser = fromUser,
-        title=title,
-        message=message,
-        type='follow'
-    )
+# a row means to_user follows from_user, as it is added with from_user.followers.add(to_user)
+UserFollower = User.followers.through
+FOLLOW_PAGE_SIZE = 20
 
 def toggleFollow(user, followee):
     sentFollowRequest = False
@@ -31,4 +29,53 @@ def follow(user, followee):
     followee.followers.add(user)
 
 def unfollow(user, followee):
-    followee.followers.remove(user)
\ No newline at end of file
+    followee.followers.remove(user)
+
+def getFollowedUserIds(user, users):
+    '''Return the ids of the users in `users` (users or ids) that the user follows, with a single query.'''
+    userIds = [getattr(other, 'pk', other) for other in users]
+    return set(UserFollower.objects.filter(to_user=user, from_user_id__in=userIds).values_list('from_user_id', flat=True))
+
+def getFollowersPage(user, cursor=None, limit=FOLLOW_PAGE_SIZE):
+    '''Return a page of the user's followers, most recent first, and the cursor of the next page or None.'''
+    return _getFollowPage(UserFollower.objects.filter(from_user=user), 'to_user', cursor, limit)
+
+def getFolloweesPage(user, cursor=None, limit=FOLLOW_PAGE_SIZE):
+    '''Return a page of the users the user follows and the cursor of the next page or None.'''
+    return _getFollowPage(UserFollower.objects.filter(to_user=user), 'from_user', cursor, limit)
+
+def _getFollowPage(follows, userField, cursor, limit):
+    if cursor is not None:
+        follows = follows.filter(id__lt=cursor)
+    # one extra row tells whether there is a next page without counting
+    follows = list(follows.select_related(userField).order_by('-id')[:limit + 1])
+    nextCursor = follows[limit - 1].id if len(follows) > limit else None
+    return [getattr(follow, userField) for follow in follows[:limit]], nextCursor
+
+def refreshFollowCounts(userIds=None):
+    '''Recount the followers and followees of the given users (every user if None) with a single update.'''
+    users = User.objects.all() if userIds is None else User.objects.filter(id__in=userIds)
+    users.update(
+        followersCount=_countFollows('from_user'),
+        followeesCount=_countFollows('to_user'),
+    )
+
+def _countFollows(field):
+    counts = UserFollower.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('id')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+def userFollowersChanged(sender, instance, action, reverse, pk_set, **kwargs):
+    '''Keep the follow counts in step with followers being added or removed.'''
+    if action == 'pre_clear':
+        field, otherField = ('from_user', 'to_user') if reverse else ('to_user', 'from_user')
+        instance._clearedFollowIds = set(
+            UserFollower.objects.filter(**{otherField: instance.pk}).values_list(f'{field}_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_clearedFollowIds', set())
+    refreshFollowCounts({instance.pk, *pk_set})
@@ -0,0 +1,132 @@
+'''Helper file for importing expenditures in bulk from CSV files or OFX bank statements.'''
+import csv
+import io
+import os
+import re
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from walletwizard.models import Category, Expenditure
+from .modelHelpers import allocateBulkInsertIds
+from .pointsHelpers import isCategoryOverSpendingLimit, updateUserPointsForSpending
+from .rollupHelpers import refreshDailySpending
+from .spendingHelpers import getTimePeriodStartAndEnd
+
+CategoryExpenditure = Category.expenditures.through
+
+IMPORT_FORMATS = {
+    '.csv': 'csv',
+    '.ofx': 'ofx',
+    '.qfx': 'ofx',
+}
+IMPORT_CHUNK_SIZE = 1000
+# raised while the rows are read from a file that is not UTF-8 text or not valid CSV
+IMPORT_READ_ERRORS = (UnicodeDecodeError, csv.Error)
+OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|</BANKTRANLIST>)', re.DOTALL | re.IGNORECASE)
+OFX_ELEMENT = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+class ImportResult:
+    '''The outcome of an import: the number of created expenditures and the rows that were rejected.'''
+
+    def __init__(self):
+        self.createdCount = 0
+        self.errors = []
+
+def getImportFormat(filename):
+    '''Return 'csv' or 'ofx' depending on the extension of the file name, or None.'''
+    return IMPORT_FORMATS.get(os.path.splitext(filename)[1].lower())
+
+def parseRows(file, importFormat):
+    '''Return a generator of row dicts (title, description, amount, date) read from the file.'''
+
+    if importFormat == 'csv':
+        return parseCsvRows(file)
+    if importFormat == 'ofx':
+        return parseOfxRows(file)
+    raise ValueError(f'Unknown import format: {importFormat}')
+
+def parseCsvRows(file):
+    '''Read a CSV file with a header row containing title, amount and date, and optionally description.'''
+
+    for row in csv.DictReader(_asText(file)):
+        row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+        yield {
+            'title': row.get('title', ''),
+            'description': row.get('description', ''),
+            'amount': row.get('amount', ''),
+            'date': row.get('date', ''),
+        }
+
+def parseOfxRows(file):
+    '''Read the debit transactions of an OFX (SGML or XML) bank statement. Credits are not expenditures.'''
+
+    for match in OFX_TRANSACTION.finditer(_asText(file).read()):
+        elements = {name.upper(): value.strip() for name, value in OFX_ELEMENT.findall(match.group(1))}
+        amount = elements.get('TRNAMT', '')
+        if not amount.startswith('-'):
+            continue
+        posted = elements.get('DTPOSTED', '')
+        yield {
+            'title': (elements.get('NAME') or elements.get('MEMO') or 'Imported transaction')[:50],
+            'description': elements.get('MEMO', '')[:250],
+            'amount': amount[1:],
+            'date': f'{posted[0:4]}-{posted[4:6]}-{posted[6:8]}' if len(posted) >= 8 else posted,
+        }
+
+def importExpenditures(user, category, rows):
+    '''Validate the rows in chunks, bulk insert the valid ones into the category and award or
+    deduct the user's points once for the whole import.'''
+
+    result = ImportResult()
+    overLimit = isCategoryOverSpendingLimit(category)
+    start, end = getTimePeriodStartAndEnd(category.spendingLimit.timePeriod)
+    amountInTimePeriod = Decimal(0)
+    dates = set()
+
+    with transaction.atomic():
+        chunk = []
+        for rowNumber, row in enumerate(rows, start=1):
+            try:
+                expenditure = _buildExpenditure(row)
+            except ValidationError as error:
+                result.errors.append((rowNumber, ' '.join(error.messages)))
+                continue
+            chunk.append(expenditure)
+            dates.add(expenditure.date)
+            if start <= expenditure.date < end:
+                amountInTimePeriod += expenditure.amount
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                result.createdCount += _saveChunk(category, chunk)
+                chunk = []
+        result.createdCount += _saveChunk(category, chunk)
+        # signals do not fire for bulk inserts, so the daily spending rollup is refreshed once here
+        refreshDailySpending([category.id], dates)
+
+    if amountInTimePeriod > 0:
+        updateUserPointsForSpending(user, category, overLimit, amountInTimePeriod)
+    return result
+
+def _buildExpenditure(row):
+    expenditure = Expenditure(
+        title=row['title'],
+        description=row['description'],
+        amount=row['amount'],
+        date=row['date'],
+    )
+    # converts the amount and date strings in place and runs the model's validators
+    expenditure.full_clean(exclude=['receipt'])
+    return expenditure
+
+def _saveChunk(category, expenditures):
+    if not expenditures:
+        return 0
+    created = Expenditure.objects.bulk_create(allocateBulkInsertIds(expenditures))
+    CategoryExpenditure.objects.bulk_create([
+        CategoryExpenditure(category_id=category.id, expenditure_id=expenditure.pk) for expenditure in created
+    ])
+    return len(created)
+
+def _asText(file):
+    if isinstance(file, io.TextIOBase):
+        return file
+    return io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
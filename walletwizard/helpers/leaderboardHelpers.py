@@ -0,0 +1,81 @@
+'''Helper file for the ranking of user points shown on the scores page.'''
+import re
+from django.db.models import Q
+from walletwizard.models import Points
+from .paginationHelpers import KeysetPage, MAX_ROW_ID
+
+TOP_USER_COUNT = 4
+RANK_BATCH_SIZE = 500
+LEADERBOARD_CURSOR_PATTERN = re.compile(r'(-?[0-9]+)_([0-9]+)_([0-9]+)')
+
+def getLeaderboard():
+    '''Return the points rows in rank order, read from the points_rank_idx index.'''
+    return Points.objects.select_related('user__house').order_by('-count', 'id')
+
+def encodeLeaderboardCursor(points, position):
+    '''Return a URL safe cursor holding the row's count and id and its position on the leaderboard.'''
+    return f'{points.count}_{points.id}_{position}'
+
+def decodeLeaderboardCursor(cursor):
+    '''Return the (count, id, position) held by the cursor, raising ValueError if it is malformed or out of range.'''
+    match = LEADERBOARD_CURSOR_PATTERN.fullmatch(cursor)
+    if match is None:
+        raise ValueError(f'Malformed leaderboard cursor: {cursor}')
+    count, pointsId, position = (int(value) for value in match.groups())
+    if abs(count) > MAX_ROW_ID or pointsId > MAX_ROW_ID:
+        raise ValueError(f'Leaderboard cursor out of range: {cursor}')
+    return count, pointsId, position
+
+def getLeaderboardPage(perPage, after=None, before=None):
+    '''Return the page of the leaderboard after or before the cursor, or the first page, and the top users.'''
+    # read from points_rank_idx starting at the cursor, so no page counts or skips over the rows ahead
+    leaderboard = getLeaderboard()
+    topPoints = list(leaderboard[:TOP_USER_COUNT])
+    if before is not None:
+        count, pointsId, position = decodeLeaderboardCursor(before)
+        rows = leaderboard.filter(Q(count__gte=count) & (Q(count__gt=count) | Q(id__lt=pointsId)))
+        rows = list(rows.order_by('count', '-id')[:perPage + 1])
+        hasMore = len(rows) > perPage
+        rows = rows[:perPage][::-1]
+        # positions carried by the cursors are only shown, they may be off after points change
+        startingNumber = max(position - 1 - len(rows), 0)
+        page = KeysetPage(
+            rows,
+            encodeLeaderboardCursor(rows[-1], startingNumber + len(rows)) if rows else None,
+            encodeLeaderboardCursor(rows[0], startingNumber + 1) if hasMore else None,
+        )
+    else:
+        startingNumber = 0
+        if after is not None:
+            count, pointsId, startingNumber = decodeLeaderboardCursor(after)
+            leaderboard = leaderboard.filter(Q(count__lte=count) & (Q(count__lt=count) | Q(id__gt=pointsId)))
+        rows = list(leaderboard[:perPage + 1])
+        hasMore = len(rows) > perPage
+        rows = rows[:perPage]
+        page = KeysetPage(
+            rows,
+            encodeLeaderboardCursor(rows[-1], startingNumber + len(rows)) if hasMore else None,
+            encodeLeaderboardCursor(rows[0], startingNumber + 1) if after is not None and rows else None,
+        )
+    page.startingNumber = startingNumber
+    return page, topPoints
+
+def getUserRank(user):
+    '''Return the user's rank when the ranks were last refreshed, or None if they were not ranked then.'''
+    return Points.objects.filter(user=user).values_list('rank', flat=True).first()
+
+def refreshLeaderboardRanks(batchSize=RANK_BATCH_SIZE):
+    '''Store the current leaderboard position on every points row and return how many were ranked.'''
+    # walked in batches along points_rank_idx, each batch written with one bulk update
+    rows = Points.objects.order_by('-count', 'id').values_list('count', 'id')
+    position = 0
+    batch = rows[:batchSize]
+    while batch:
+        batch = list(batch)
+        Points.objects.bulk_update(
+            [Points(id=pointsId, rank=position + index) for index, (_, pointsId) in enumerate(batch, 1)], ['rank']
+        )
+        position += len(batch)
+        count, pointsId = batch[-1]
+        batch = rows.filter(Q(count__lte=count) & (Q(count__lt=count) | Q(id__gt=pointsId)))[:batchSize]
+    return position
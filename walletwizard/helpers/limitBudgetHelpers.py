@@ -0,0 +1,14 @@
+'''Helper file for the monthly budget that a user's category spending limits add up to.'''
+from decimal import Decimal
+from django.db.models import Sum
+from walletwizard.models import Category
+from .periodHelpers import PERIODS, convertAmounts
+
+def getCategoryLimitBudget(user):
+    '''Return the user's category spending limits, summed per time period in one query, as a monthly amount.'''
+    totals = Category.objects.filter(users=user, spendingLimit__timePeriod__in=PERIODS).values(
+        'spendingLimit__timePeriod'
+    ).annotate(total=Sum('spendingLimit__amount')).values_list('spendingLimit__timePeriod', 'total').order_by()
+    periods = [period for period, _ in totals]
+    amounts = [total for _, total in totals]
+    return round(sum(convertAmounts(amounts, periods, 'monthly'), Decimal(0)), 2)
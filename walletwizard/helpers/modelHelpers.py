@@ -1,37 +1,23 @@
 ''' Helper file for models functions.'''
-from datetime import datetime
-from datetime import timedelta
 from decimal import Decimal
-
-AVERAGE_DAYS_PER_MONTH = Decimal(30.43)
-AVERAGE_WEEKS_PER_MONTH = Decimal(4.35)
-
-def computeTotalSpentInTimePeriod(timePeriod, expenditures):
-    total = 0.0
-    today = datetime.now()
-    if timePeriod == 'daily':
-        for expense in expenditures.filter(date__day=today.day):
-            total += float(expense.amount)
-    elif timePeriod == 'weekly':
-        startOfWeek = today - timedelta(days=today.weekday())
-        for expense in expenditures.filter(date__gte=startOfWeek):
-            total += float(expense.amount)
-    elif timePeriod == 'monthly':
-        for expense in expenditures.filter(date__month=today.month):
-            total += float(expense.amount)
-    elif timePeriod == 'yearly':
-        for expense in expenditures.filter(date__year=today.year):
-            total += float(expense.amount)
-    return total
+from django.db import connection
+from django.db.models import Max
+from .periodHelpers import PERIODS, convertAmount
 
 def computeTotalSpendingLimitByMonth(timePeriod, amount):
-    result = 0.0
-    if timePeriod == 'daily':
-        result = Decimal(amount * AVERAGE_DAYS_PER_MONTH)
-    elif timePeriod == 'weekly':
-        result = Decimal(amount * AVERAGE_WEEKS_PER_MONTH)
-    elif timePeriod == 'monthly':
-        result = Decimal(amount)
-    elif timePeriod == 'yearly':
-        result = Decimal(amount / 12)
-    return result
\ No newline at end of file
+    if timePeriod not in PERIODS:
+        return Decimal(0)
+    return convertAmount(amount, timePeriod, 'monthly')
+
+def allocateBulkInsertIds(objs):
+    '''Give the new objects explicit ids after the largest in their table when the backend does not
+    return primary keys from bulk inserts, so they can be linked without reading them back.'''
+    if not objs or connection.features.can_return_rows_from_bulk_insert:
+        return objs
+    # a row inserted concurrently with one of these ids makes the insert fail instead of being
+    # mistaken for one of the new objects
+    model = type(objs[0])
+    firstId = (model.objects.aggregate(maxId=Max('id'))['maxId'] or 0) + 1
+    for offset, obj in enumerate(objs):
+        obj.id = firstId + offset
+    return objs
@@ -1,29 +1,154 @@
 ''''Helpers file to create different types of notifications.'''
+import threading
+from contextlib import contextmanager
+from django.core.cache import cache
+from django.db import connection, transaction
 from walletwizard.models import Notification, ShareCategoryNotification, FollowRequestNotification
 
+NOTIFICATION_CACHE_TIMEOUT = 300
+LATEST_NOTIFICATION_COUNT = 3
+
 def createBasicNotification(toUser, title, message):
-    Notification.objects.create(
+    dispatchNotification(Notification(
         toUser=toUser,
         title=title,
         message=message,
         type='basic'
-    )
+    ))
 
 def createShareCategoryNotification(toUser, title, message, sharedCategory, fromUser):
-    ShareCategoryNotification.objects.create(
+    dispatchNotification(ShareCategoryNotification(
         toUser=toUser,
         fromUser=fromUser,
         title=title,
         message=message,
         sharedCategory=sharedCategory,
         type='category'
-    )
+    ))
 
 def createFollowRequestNotification(toUser, title, message, fromUser):
-    FollowRequestNotification.objects.create(
+    dispatchNotification(FollowRequestNotification(
         toUser=toUser,
         fromUser=fromUser,
         title=title,
         message=message,
         type='follow'
-    )
\ No newline at end of file
+    ))
+
+def broadcastBasicNotification(toUsers, title, message):
+    '''Send the same basic notification to every user in toUsers (e.g. `house.user_set.all()`).
+    A queryset of users is read with a single query for their ids.'''
+
+    if hasattr(toUsers, 'values_list'):
+        userIds = toUsers.values_list('id', flat=True)
+    else:
+        userIds = [user.pk for user in toUsers]
+    dispatchNotifications([
+        Notification(toUser_id=userId, title=title, message=message, type='basic')
+        for userId in userIds
+    ])
+
+'''Functions to gather the notifications created while a dispatcher is open and write them in bulk.'''
+
+_dispatcherState = threading.local()
+
+@contextmanager
+def notificationDispatcher():
+    '''Buffer every notification created inside the block and write them at the end of it, with
+    one bulk insert per notification model, in the same transaction. Nested dispatchers join the
+    outermost one. Nothing is written if the block raises.'''
+
+    if getattr(_dispatcherState, 'pending', None) is not None:
+        yield
+        return
+    _dispatcherState.pending = []
+    try:
+        yield
+        pending = _dispatcherState.pending
+    finally:
+        _dispatcherState.pending = None
+    saveNotifications(pending)
+
+def discardDispatchedNotifications():
+    '''Drop the notifications buffered by the open dispatcher, so they are never written.'''
+
+    pending = getattr(_dispatcherState, 'pending', None)
+    if pending is not None:
+        pending.clear()
+
+def dispatchNotification(notification):
+    dispatchNotifications([notification])
+
+def dispatchNotifications(notifications):
+    '''Save the notifications now, or add them to the open dispatcher's buffer.'''
+
+    pending = getattr(_dispatcherState, 'pending', None)
+    if pending is not None:
+        pending.extend(notifications)
+    else:
+        saveNotifications(notifications)
+
+def saveNotifications(notifications):
+    '''Write the notifications with one bulk insert per notification model and clear the
+    cached notification figures of every recipient once they are committed.'''
+
+    if not notifications:
+        return
+    notificationsByModel = {}
+    for notification in notifications:
+        notificationsByModel.setdefault(type(notification), []).append(notification)
+    with transaction.atomic():
+        for model, modelNotifications in notificationsByModel.items():
+            if model is Notification:
+                Notification.objects.bulk_create(modelNotifications)
+            else:
+                _bulkCreateInheritedNotifications(model, modelNotifications)
+    keys = {getNotificationCacheKey(notification.toUser_id) for notification in notifications}
+    # cleared after the commit, as a request reading the figures before it would cache them stale again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+def _bulkCreateInheritedNotifications(model, notifications):
+    # bulk_create refuses multi-table inherited models, so the Notification rows are bulk created
+    # first and the model's own rows are then inserted pointing at them. No public API inserts the
+    # child table's rows alone, _insert is the call Model.save() itself makes for each of them.
+    if not connection.features.can_return_rows_from_bulk_insert:
+        for notification in notifications:
+            notification.save()
+        return
+    parentFields = [field for field in Notification._meta.concrete_fields if not field.primary_key]
+    parents = Notification.objects.bulk_create([
+        Notification(**{field.attname: getattr(notification, field.attname) for field in parentFields})
+        for notification in notifications
+    ])
+    for notification, parent in zip(notifications, parents):
+        for field in Notification._meta.concrete_fields:
+            setattr(notification, field.attname, getattr(parent, field.attname))
+        notification.notification_ptr_id = parent.pk
+        notification._state.adding = False
+        notification._state.db = parent._state.db
+    model._base_manager._insert(notifications, fields=model._meta.local_concrete_fields, using=parents[0]._state.db)
+
+'''Functions to cache the notification figures shown on every page.'''
+
+def getNotificationCacheKey(userId):
+    return f'notifications:{userId}'
+
+def getCachedNotificationSummary(user):
+    '''Return the user's unread notification count and latest unread notifications,
+    querying the database only when they are not already cached.'''
+
+    key = getNotificationCacheKey(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        unreadNotifications = Notification.objects.filter(toUser=user, isSeen=False)
+        summary = {
+            'unreadNotificationCount': unreadNotifications.count(),
+            'latestNotifications': list(unreadNotifications[:LATEST_NOTIFICATION_COUNT]),
+        }
+        cache.set(key, summary, NOTIFICATION_CACHE_TIMEOUT)
+    return summary
+
+def clearNotificationCache(user):
+    '''Forget the cached notification figures of a user whose notifications have changed, once the change is committed.'''
+    key = getNotificationCacheKey(user.pk)
+    transaction.on_commit(lambda: cache.delete(key))
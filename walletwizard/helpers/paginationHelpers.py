@@ -0,0 +1,77 @@
+'''Helper file for keyset (cursor) pagination on a timestamp and the id that breaks its ties.'''
+from datetime import datetime, timedelta, timezone
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+class KeysetPage:
+    '''A page of rows ordered newest first, with the cursors of the pages either side of it.
+
+    `nextCursor` leads to older rows and `previousCursor` to newer ones, each is None when
+    there is no such page.'''
+
+    def __init__(self, objectList, nextCursor, previousCursor):
+        self.object_list = objectList
+        self.nextCursor = nextCursor
+        self.previousCursor = previousCursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.nextCursor is not None
+
+    def has_previous(self):
+        return self.previousCursor is not None
+
+def encodeCursor(row, field='createdAt'):
+    '''Return a URL safe cursor holding the row's timestamp (in microseconds) and id.'''
+    return f'{(getattr(row, field) - EPOCH) // timedelta(microseconds=1)}-{row.id}'
+
+# the largest id a database stores, a larger one fails the query instead of matching nothing
+MAX_ROW_ID = 2 ** 63 - 1
+
+def decodeCursor(cursor):
+    '''Return the (timestamp, id) held by the cursor, raising ValueError if it is malformed or out of range.'''
+    microseconds, rowId = cursor.split('-')
+    rowId = int(rowId)
+    if rowId > MAX_ROW_ID:
+        raise ValueError(f'Cursor id out of range: {rowId}')
+    try:
+        return EPOCH + timedelta(microseconds=int(microseconds)), rowId
+    except OverflowError as error:
+        raise ValueError(f'Cursor timestamp out of range: {microseconds}') from error
+
+def getKeysetPage(queryset, perPage, after=None, before=None, field='createdAt'):
+    '''Return the page of the queryset after (older than) or before (newer than) the cursor, or the first page.'''
+    # read from an index on (field, id) starting at the cursor, so no page is counted or skipped over
+    if before is not None:
+        timestamp, rowId = decodeCursor(before)
+        # the range on the timestamp is what the index serves, the id only breaks ties
+        rows = queryset.filter(Q(**{f'{field}__gte': timestamp}) & (Q(**{f'{field}__gt': timestamp}) | Q(id__gt=rowId)))
+        rows = list(rows.order_by(field, 'id')[:perPage + 1])
+        hasMore = len(rows) > perPage
+        rows = rows[:perPage][::-1]
+        return KeysetPage(
+            rows,
+            encodeCursor(rows[-1], field) if rows else None,
+            encodeCursor(rows[0], field) if hasMore else None,
+        )
+
+    if after is not None:
+        timestamp, rowId = decodeCursor(after)
+        queryset = queryset.filter(Q(**{f'{field}__lte': timestamp}) & (Q(**{f'{field}__lt': timestamp}) | Q(id__lt=rowId)))
+    rows = list(queryset.order_by(f'-{field}', '-id')[:perPage + 1])
+    hasMore = len(rows) > perPage
+    rows = rows[:perPage]
+    return KeysetPage(
+        rows,
+        encodeCursor(rows[-1], field) if hasMore else None,
+        encodeCursor(rows[0], field) if after is not None and rows else None,
+    )
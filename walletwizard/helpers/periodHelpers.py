@@ -0,0 +1,46 @@
+'''Helper file converting amounts between the daily, weekly, monthly and yearly time periods.'''
+from decimal import Decimal
+from fractions import Fraction
+
+PERIODS = ['daily', 'weekly', 'monthly', 'yearly']
+# the time frames of the reports page name the same periods
+REPORT_PERIODS = {'day': 'daily', 'week': 'weekly', 'month': 'monthly', 'year': 'yearly'}
+
+# the average length of a Gregorian year, so a month is 30.436875 days (4.348125 weeks)
+DAYS_PER_YEAR = Fraction(Decimal('365.2425'))
+DAYS_PER_PERIOD = {
+    'daily': Fraction(1),
+    'weekly': Fraction(7),
+    'monthly': DAYS_PER_YEAR / 12,
+    'yearly': DAYS_PER_YEAR,
+}
+
+# CONVERSION_MATRIX[fromPeriod][toPeriod] turns an amount per fromPeriod into an amount per toPeriod,
+# every factor comes from the same day counts so no two conversions disagree
+CONVERSION_MATRIX = {
+    fromPeriod: {toPeriod: DAYS_PER_PERIOD[toPeriod] / DAYS_PER_PERIOD[fromPeriod] for toPeriod in PERIODS}
+    for fromPeriod in PERIODS
+}
+
+def getPeriod(period):
+    '''Return the time period, given by name or as a report time frame ('day', 'week'...).'''
+    period = REPORT_PERIODS.get(period, period)
+    if period not in CONVERSION_MATRIX:
+        raise ValueError(f'Unknown time period: {period}')
+    return period
+
+def convertAmounts(amounts, periods, toPeriod):
+    '''Return each amount converted from its own period into toPeriod, rounded once by the exact factor.'''
+    toPeriod = getPeriod(toPeriod)
+    factors = {}
+    converted = []
+    for amount, period in zip(amounts, periods):
+        if period not in factors:
+            factors[period] = CONVERSION_MATRIX[getPeriod(period)][toPeriod]
+        factor = factors[period]
+        converted.append(Decimal(amount) * factor.numerator / factor.denominator)
+    return converted
+
+def convertAmount(amount, period, toPeriod):
+    '''Return the amount per period converted into an amount per toPeriod.'''
+    return convertAmounts([amount], [period], toPeriod)[0]
@@ -1,30 +1,45 @@
 '''Helper file for points functionality.'''
-from walletwizard.models import Points, Category
-from .notificationsHelpers import createBasicNotification
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from walletwizard.models import Points, Category, House, PointsLedgerEntry
+from .notificationsHelpers import createBasicNotification, broadcastBasicNotification
 from decimal import Decimal
 
+COMPACTION_BATCH_SIZE = 500
+# the number of ledger entries after which a writer compacts them itself
+COMPACTION_INTERVAL = 1000
+
 '''
 Updates the user's point based on the amount given as an argument.
 If amount is negative the user loses points otherwise they gain points.
+The balance is changed with a single atomic increment that never goes below zero.
 '''
 def updateUserPoints(user, amount):
-    points = Points.objects.get(user=user)
-    if points.count + amount < 0:
-        points.count = 0
-    else:
-        points.count += amount
-    points.save()
-    updateHousePoints(user, amount)
+    with transaction.atomic():
+        Points.objects.filter(user=user).update(count=Greatest(F('count') + amount, Value(0)))
+        updateHousePoints(user, amount)
 
 def createUserPoints(requestUser):
     points = Points.objects.create(user=requestUser, count=50)
     points.save()
     return points.count
 
+'''
+Records the change in the user's points in the ledger, with their house if they have one.
+The house's own points are only brought up to date when the ledger is compacted, so members
+never write to the same house row. Every member of the house is told about the change.
+'''
 def updateHousePoints(user, amount):
     house = user.house
-    house.points += amount
-    house.save()
+    entry = PointsLedgerEntry.objects.create(user=user, house=house, amount=amount)
+    # ids are handed out in order, so the pending entries summed by every read of the house
+    # totals stay bounded even when the periodic compaction does not run
+    if entry.id % COMPACTION_INTERVAL == 0:
+        compactHousePoints()
+    if house is None:
+        return
     
     title = ''
     message = ''
@@ -36,7 +51,43 @@ def updateHousePoints(user, amount):
         title = "House points gained!"
         message = str(house.name) + " has gained " + str(amount) + " points"
     
-    createBasicNotification(user, title, message)
+    broadcastBasicNotification(house.user_set.all(), title, message)
+
+'''
+Folds every pending ledger entry into the points of its house, if any, and marks it as compacted.
+The pending entries are locked and read by id first, and exactly those ids are summed and
+marked, so an entry committed meanwhile is left for the next run instead of being lost.
+Returns the number of compacted entries.
+'''
+def compactHousePoints():
+    with transaction.atomic():
+        entries = list(PointsLedgerEntry.objects.select_for_update().filter(
+            isCompacted=False
+        ).values_list('id', 'house_id', 'amount').order_by())
+        houseTotals = defaultdict(int)
+        for _, houseId, amount in entries:
+            if houseId is not None:
+                houseTotals[houseId] += amount
+        for houseId, total in houseTotals.items():
+            House.objects.filter(id=houseId).update(points=F('points') + total)
+        entryIds = [entryId for entryId, _, _ in entries]
+        # marked in batches, as some databases limit the parameters of a statement
+        for index in range(0, len(entryIds), COMPACTION_BATCH_SIZE):
+            PointsLedgerEntry.objects.filter(id__in=entryIds[index:index + COMPACTION_BATCH_SIZE]).update(isCompacted=True)
+        return len(entryIds)
+
+'''
+Returns the houses annotated with `totalPoints`: their compacted points plus any
+entries still waiting to be compacted.
+'''
+def getHousesWithPoints():
+    return House.objects.annotate(
+        totalPoints=F('points') + Coalesce(
+            Sum('pointsLedgerEntries__amount', filter=Q(pointsLedgerEntries__isCompacted=False)),
+            Value(0),
+            output_field=IntegerField(),
+        )
+    )
 
 '''
 Handles user losing points based on the percentage they've gone over their spending limit.
@@ -74,13 +125,19 @@ User loses points if they are over the limit.
 '''
 def updateUserPointsForExpenditureCreation(user, category, overLimit):
     expenditure = category.expenditures.latest('createdAt')
-    
+    updateUserPointsForSpending(user, category, overLimit, expenditure.amount)
+
+'''
+Handles the user gaining and losing points after spending the given amount in the category,
+either through a single expenditure or a whole import.
+'''
+def updateUserPointsForSpending(user, category, overLimit, amount):
     spendingCurrent = category.totalSpentInTimePeriod()
     spendingLimit = category.spendingLimit.amount
     
     if overLimit:
-        # if category was already over limit, lose point depending on new expenditure not previous overdraft(s)
-        loseUserPoints(user, spendingLimit, spendingLimit + expenditure.amount)
+        # if category was already over limit, lose point depending on new spending not previous overdraft(s)
+        loseUserPoints(user, spendingLimit, spendingLimit + amount)
     else:
         if spendingCurrent > spendingLimit:
             loseUserPoints(user, spendingLimit, spendingCurrent)
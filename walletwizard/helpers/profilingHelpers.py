@@ -0,0 +1,95 @@
+'''Helper file for profiling the SQL, context processors and templates of a single request.'''
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+_state = threading.local()
+
+class RequestProfile:
+    '''Database execute wrapper that records the queries of a request, along with the time spent
+    in the context processors and rendering templates (in seconds).'''
+
+    def __init__(self):
+        self.queryCount = 0
+        self.sqlTime = 0.0
+        self.fingerprints = Counter()
+        self.contextProcessorTimes = defaultdict(float)
+        self.templateTime = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sqlTime += time.perf_counter() - start
+            self.queryCount += 1
+            self.fingerprints[getSqlFingerprint(sql)] += 1
+
+    def duplicateQueries(self, limit):
+        '''Return the most repeated (fingerprint, count) pairs, the usual sign of an N+1 query.'''
+        return [(sql, count) for sql, count in self.fingerprints.most_common(limit) if count > 1]
+
+    def contextProcessorTime(self):
+        return sum(self.contextProcessorTimes.values())
+
+def getSqlFingerprint(sql):
+    '''Return the sql with its whitespace and IN lists collapsed, so repeats of a query match.'''
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return re.sub(r'IN \((?:%s, )*%s\)', 'IN (...)', sql)
+
+def getActiveProfile():
+    return getattr(_state, 'profile', None)
+
+@contextmanager
+def profileRequest():
+    '''Record every query run in the block, on every database, in the yielded profile.'''
+    profile = RequestProfile()
+    _state.profile = profile
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            yield profile
+    finally:
+        _state.profile = None
+
+def profileContextProcessor(function):
+    '''Decorator recording the time a context processor takes while its request is profiled.'''
+    @wraps(function)
+    def wrapper(request):
+        profile = getActiveProfile()
+        if profile is None:
+            return function(request)
+        start = time.perf_counter()
+        try:
+            return function(request)
+        finally:
+            profile.contextProcessorTimes[function.__name__] += time.perf_counter() - start
+    return wrapper
+
+class ProfiledTemplate(Template):
+    '''Django template recording its render time (which includes the context processors) while its request is profiled.'''
+
+    def render(self, context=None, request=None):
+        profile = getActiveProfile()
+        if profile is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.templateTime += time.perf_counter() - start
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    '''Django templates backend returning templates that record their render time.'''
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
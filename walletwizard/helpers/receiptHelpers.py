@@ -0,0 +1,197 @@
+'''Helper file for the background pipeline that turns uploaded receipts into web-ready images.'''
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+from walletwizard.models import Expenditure, ReceiptJob, ReceiptBlob
+from walletwizard.storage.receiptStorage import receiptStorage, getContentHash
+
+# twice the size the receipts are shown at, so they stay sharp on high density screens
+THUMBNAIL_SIZE = (120, 70)
+WEB_SIZE = (1600, 1600)
+THUMBNAIL_QUALITY = 70
+WEB_QUALITY = 82
+ORIGINAL_QUALITY = 95
+RECEIPT_JOB_BATCH_SIZE = 20
+RECEIPT_JOB_MAX_ATTEMPTS = 3
+# a job claimed longer ago than this belongs to a worker that died, so it is claimed again
+RECEIPT_JOB_CLAIM_TIMEOUT = timedelta(minutes=10)
+# jobs that used up their attempts are kept this long with their error, then deleted
+RECEIPT_JOB_FAILED_RETENTION = timedelta(days=7)
+RECEIPT_COLLECTION_BATCH_SIZE = 500
+# unreferenced files are kept this long, so an upload of the same content that is still
+# being saved can take its reference before the file is deleted
+RECEIPT_COLLECTION_GRACE_PERIOD = timedelta(hours=1)
+
+def queueReceipt(expenditure):
+    '''Queue the expenditure's receipt to be processed by the receipt worker.'''
+    ReceiptJob.objects.create(expenditure=expenditure)
+
+def getReceiptFileNames(expenditure):
+    '''Return the names of the stored files of the expenditure's receipt.'''
+    fieldFiles = [expenditure.receipt, expenditure.receiptThumbnail, expenditure.receiptWeb]
+    return [fieldFile.name for fieldFile in fieldFiles if fieldFile]
+
+def changeReceiptReferences(addedNames=(), removedNames=()):
+    '''Add a reference to each added file and remove one from each removed file, marking unreferenced files for the collector.'''
+    changes = Counter(addedNames)
+    changes.subtract(removedNames)
+    changes = {name: change for name, change in changes.items() if change}
+    if not changes:
+        return
+    for name, change in changes.items():
+        blob, created = ReceiptBlob.objects.get_or_create(name=name, defaults={'referenceCount': max(change, 0)})
+        if not created:
+            ReceiptBlob.objects.filter(id=blob.id).update(referenceCount=F('referenceCount') + change)
+    ReceiptBlob.objects.filter(name__in=changes, referenceCount__gt=0).exclude(unreferencedAt=None).update(unreferencedAt=None)
+    ReceiptBlob.objects.filter(name__in=changes, referenceCount__lte=0, unreferencedAt=None).update(unreferencedAt=timezone.now())
+
+def registerUnreferencedReceiptFiles(names):
+    '''Record stored files that nothing refers to yet, so the collector deletes them if that stays so.'''
+    for name in names:
+        ReceiptBlob.objects.get_or_create(name=name, defaults={'unreferencedAt': timezone.now()})
+
+def collectReceiptFiles(batchSize=RECEIPT_COLLECTION_BATCH_SIZE, gracePeriod=RECEIPT_COLLECTION_GRACE_PERIOD):
+    '''Delete up to a batch of the files unreferenced for longer than the grace period and return how many were deleted.'''
+    unreferencedBefore = timezone.now() - gracePeriod
+    collectableBlobs = ReceiptBlob.objects.filter(referenceCount__lte=0, unreferencedAt__lt=unreferencedBefore)
+    blobs = collectableBlobs.values_list('id', 'name')[:batchSize]
+    collectedFiles = 0
+    for blobId, name in blobs:
+        # the row is locked and checked again, and only deleted after its file, so a file referenced
+        # again or claimed by an upload meanwhile is kept, and an upload waiting on the row rewrites it
+        with transaction.atomic():
+            if not collectableBlobs.select_for_update().filter(id=blobId).exists():
+                continue
+            receiptStorage.delete(name)
+            ReceiptBlob.objects.filter(id=blobId).delete()
+            collectedFiles += 1
+    return collectedFiles
+
+def hashReceipt(fieldFile):
+    '''Return the SHA-256 of the stored receipt.'''
+    with fieldFile.open('rb'):
+        return getContentHash(fieldFile)
+
+def flattenReceiptImage(image):
+    '''Return the image in RGB, with any transparency laid over white.'''
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+def encodeReceiptImage(image, quality):
+    '''Return the image as JPEG bytes, without the EXIF data of the upload.'''
+    output = BytesIO()
+    # saved without the EXIF block, which holds the camera, time and often location of a phone photo
+    flattenReceiptImage(image).save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+def createReceiptVariant(image, size, quality):
+    '''Return the image shrunk to fit the size as JPEG bytes, without the EXIF data of the upload.'''
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    return encodeReceiptImage(variant, quality)
+
+def openReceiptImage(fieldFile):
+    '''Return the decoded receipt image at full size, turned the way its EXIF orientation says.'''
+    with fieldFile.open('rb') as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+def processReceipt(expenditure):
+    '''Replace the receipt with a copy without its EXIF data and create its thumbnail and web
+    versions, reusing the files of an identical upload.'''
+    receipt = expenditure.receipt
+    if not receipt or (expenditure.receiptHash and expenditure.receiptThumbnail):
+        return
+    receiptHash = hashReceipt(receipt)
+    duplicate = Expenditure.objects.filter(receiptHash=receiptHash).exclude(
+        id=expenditure.id).exclude(receiptThumbnail='').exclude(receiptThumbnail=None).first()
+    if duplicate is not None:
+        fields = {
+            'receipt': duplicate.receipt.name,
+            'receiptThumbnail': duplicate.receiptThumbnail.name,
+            'receiptWeb': duplicate.receiptWeb.name,
+        }
+    else:
+        image = openReceiptImage(receipt)
+        fields = {
+            # the upload itself is never served, only this copy re-encoded at full size
+            'receipt': receiptStorage.save(
+                'receipts/original.jpg', ContentFile(encodeReceiptImage(image, ORIGINAL_QUALITY))
+            ),
+            'receiptThumbnail': receiptStorage.save(
+                'receipts/thumbnails/thumbnail.jpg',
+                ContentFile(createReceiptVariant(image, THUMBNAIL_SIZE, THUMBNAIL_QUALITY)),
+            ),
+            'receiptWeb': receiptStorage.save(
+                'receipts/web/web.jpg',
+                ContentFile(createReceiptVariant(image, WEB_SIZE, WEB_QUALITY)),
+            ),
+        }
+    # a queryset update sends no signals, so the references are counted here
+    # only updated if the receipt has not been replaced in the meantime
+    isUpdated = Expenditure.objects.filter(id=expenditure.id, receipt=receipt.name).update(receiptHash=receiptHash, **fields)
+    if isUpdated:
+        changeReceiptReferences(fields.values(), [receipt.name])
+    else:
+        registerUnreferencedReceiptFiles(fields.values())
+
+def processReceiptJobs(batchSize=RECEIPT_JOB_BATCH_SIZE):
+    '''Process up to a batch of queued receipts and return how many jobs were taken.'''
+    now = timezone.now()
+    jobs = ReceiptJob.objects.filter(attempts__lt=RECEIPT_JOB_MAX_ATTEMPTS).filter(
+        Q(claimedAt=None) | Q(claimedAt__lt=now - RECEIPT_JOB_CLAIM_TIMEOUT)
+    ).select_related('expenditure').order_by('id')[:batchSize]
+    processedJobs = 0
+    for job in jobs:
+        # claimed with a conditional update, so several workers can drain the queue side by side
+        if not ReceiptJob.objects.filter(id=job.id, claimedAt=job.claimedAt).update(claimedAt=now):
+            continue
+        processedJobs += 1
+        # any error (a file that is not an image, truncated or missing, a storage failure...)
+        # only fails this job, the worker goes on with the next one
+        try:
+            processReceipt(job.expenditure)
+        except Exception as error:
+            ReceiptJob.objects.filter(id=job.id).update(
+                attempts=F('attempts') + 1, claimedAt=None, lastError=str(error)[:250]
+            )
+        else:
+            job.delete()
+    return processedJobs
+
+def deleteFailedReceiptJobs(retention=RECEIPT_JOB_FAILED_RETENTION):
+    '''Delete the jobs that used up their attempts and were queued longer ago than the retention, and return how many were deleted.'''
+    failedJobs = ReceiptJob.objects.filter(
+        attempts__gte=RECEIPT_JOB_MAX_ATTEMPTS, createdAt__lt=timezone.now() - retention
+    )
+    return failedJobs.delete()[0]
+
+'''Signal receivers counting the references to receipt files as expenditures change.'''
+
+def expenditurePreSave(sender, instance, raw=False, **kwargs):
+    instance._previousReceiptFiles = []
+    if instance.pk and not raw:
+        previousNames = Expenditure.objects.filter(pk=instance.pk).values_list(
+            'receipt', 'receiptThumbnail', 'receiptWeb'
+        ).first() or []
+        instance._previousReceiptFiles = [name for name in previousNames if name]
+
+def expenditurePostSave(sender, instance, raw=False, **kwargs):
+    if not raw:
+        changeReceiptReferences(getReceiptFileNames(instance), getattr(instance, '_previousReceiptFiles', []))
+
+def expenditurePostDelete(sender, instance, **kwargs):
+    changeReceiptReferences(removedNames=getReceiptFileNames(instance))
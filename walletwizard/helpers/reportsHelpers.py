@@ -1,158 +1,168 @@
 '''Helper file containing methods to generate graph data for reports.'''
 
+from collections import defaultdict
 from datetime import datetime
 from datetime import timedelta
-from walletwizard.models import Category
-
-# Constants used in calculations.
-DAYS_PER_WEEK = 7
-DAYS_PER_MONTH = 30
-DAYS_PER_YEAR = 365
-WEEKS_PER_MONTH = 4
-WEEKS_PER_YEAR = 52
-MONTHS_PER_YEAR = 12
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from walletwizard.models import Category, CategoryDailySpending
+from .spendingHelpers import getTimePeriodStartAndEnd
+from .periodHelpers import convertAmounts
 
 '''Spending Limit (Budget) Calculations'''
 
+def convertBudgets(categories, timePeriod):
+    '''Convert the spending limits of the categories to the report's 'day', 'week' or 'month' time period at once.'''
+
+    return convertAmounts(
+        [category.spendingLimit.amount for category in categories],
+        [category.spendingLimit.timePeriod for category in categories],
+        timePeriod,
+    )
+
+def convertBudget(category, timePeriod):
+    '''Convert the category's spending limit to the report's 'day', 'week' or 'month' time period.'''
+
+    return convertBudgets([category], timePeriod)[0]
+
 def convertBudgetToDaily(category):
     '''Convert the category's spending limit into a daily spending limit.'''
 
-    currentTimePeriod = category.spendingLimit.timePeriod
-    amount = category.spendingLimit.getNumber()
-
-    if currentTimePeriod == 'weekly':
-        return amount / DAYS_PER_WEEK
-    elif currentTimePeriod == 'monthly':
-        return amount / DAYS_PER_MONTH
-    elif currentTimePeriod == 'yearly':
-        return amount / DAYS_PER_YEAR
-    else:
-        return amount
+    return convertBudget(category, 'daily')
 
 def convertBudgetToWeekly(category):
     '''Convert the category's spending limit into a weekly spending limit.'''
 
-    currentTimePeriod = category.spendingLimit.timePeriod
-    amount = category.spendingLimit.getNumber()
-
-    if currentTimePeriod == 'daily':
-        return amount * DAYS_PER_WEEK
-    elif currentTimePeriod == 'monthly':
-        return amount / WEEKS_PER_MONTH
-    elif currentTimePeriod == 'yearly':
-        return amount / WEEKS_PER_YEAR
-    else:
-        return amount
+    return convertBudget(category, 'weekly')
 
 def convertBudgetToMonthly(category):
-    '''Convert the category's spending limit into a weekly spending limit.'''
-    
-    currentTimePeriod = category.spendingLimit.timePeriod
-    amount = category.spendingLimit.getNumber()
-
-    if currentTimePeriod == 'daily':
-        return amount * DAYS_PER_MONTH
-    elif currentTimePeriod == 'weekly':
-        return amount * WEEKS_PER_MONTH
-    elif currentTimePeriod == 'yearly':
-        return amount / MONTHS_PER_YEAR
-    else:
-        return amount
+    '''Convert the category's spending limit into a monthly spending limit.'''
+
+    return convertBudget(category, 'monthly')
     
 '''Data and Label generation for reports page graphs.'''
 
-def createDataAndLabelArrays(categories, timePeriod):
-    '''Create 2 arrays (graph data points as well as their labels). The data consists of the expenditures
-    within the last 'day', 'week', or 'month', according to the user's choice.'''
+def getCurrentWindow(timePeriod, today):
+    '''Return the (start, end) dates of the last 'day', 'week' or 'month'. An end of None is unbounded.'''
+
+    if timePeriod == 'day':
+        # all expenditures within the previous day
+        yesterday = today - timedelta(days=1)
+        return (yesterday.date(), None)
+    if timePeriod == 'week':
+        # all expenditures within the previous week
+        weekStart = today - timedelta(days=today.weekday())
+        weekEnd = today + timedelta(days = 1)
+        return (weekStart.date(), weekEnd.date())
+    if timePeriod == 'month':
+        # all expenditures within the previous month
+        return getTimePeriodStartAndEnd('monthly', today.date())
+    return None
+
+def getAverageWindows(today):
+    '''Return the start date and number of days, weeks and months of the 12, 6 and 3 month history windows.'''
+
+    firstDayThisMonth = today.replace(day=1)
+    firstDayNextMonth = (firstDayThisMonth + timedelta(days=32)).replace(day=1)
+    firstDayTwelveMonthsAgo = firstDayNextMonth - relativedelta(years=1)
+    sixMonthsAgo = today + relativedelta(months=-6)
+    threeMonthsAgo = today + relativedelta(months=-3)
+    return [
+        (firstDayTwelveMonthsAgo, [365, 52, 12]),
+        (sixMonthsAgo, [180, 24, 6]),
+        (threeMonthsAgo, [90, 12, 3]),
+    ]
+
+def loadCategories(selectedCategories):
+    '''Load the selected categories and their spending limits in one query, keeping the selection order.'''
+
+    categoriesById = Category.objects.select_related('spendingLimit').in_bulk([int(id) for id in selectedCategories])
+    return [categoriesById[int(id)] for id in selectedCategories if int(id) in categoriesById]
+
+def bucketSpending(categories, windows):
+    '''Sum the daily spending rollup of the given categories into every (start, end) window at once.
+    Returns one {categoryId: total} dictionary per window, using a single query.'''
+
+    totals = [defaultdict(Decimal) for _ in windows]
+    activeWindows = [(index, _toDate(window[0]), _toDate(window[1])) for index, window in enumerate(windows) if window]
+    if not categories or not activeWindows:
+        return totals
+
+    earliest = min(start for _, start, _ in activeWindows)
+    rows = CategoryDailySpending.objects.filter(
+        category__in=categories, date__gte=earliest
+    ).values_list('category_id', 'date', 'total')
+    for categoryId, day, total in rows:
+        for index, start, end in activeWindows:
+            if day >= start and (end is None or day < end):
+                totals[index][categoryId] += total
+    return totals
+
+def budgetPercentage(categorySpend, budgetCalculated):
+    '''Return the percentage of the budget used, capped at 100%.'''
+
+    amount = categorySpend/float(budgetCalculated)*100
+    if amount < 100:
+        return round(amount,2)
+    return 100
+
+def averageSpend(categorySpend, timePeriod, numberOfDaysWeeksMonthsArray):
+    '''Return the average spending per day, week or month over a history window.'''
+
+    if timePeriod == 'day':
+        return categorySpend/numberOfDaysWeeksMonthsArray[0]
+    if timePeriod == 'week':
+        return categorySpend/numberOfDaysWeeksMonthsArray[1]
+    if timePeriod == 'month':
+        return categorySpend/numberOfDaysWeeksMonthsArray[2]
+    return categorySpend
+
+def createReportArrays(selectedCategories, timePeriod, today=None):
+    '''Create the labels and data of the current period graph together with the 12, 6 and 3 month average
+    graphs. Categories are loaded and the rollup is bucketed once, whatever the number of windows.'''
+
+    if today is None:
+        today = datetime.now()
+    categories = loadCategories(selectedCategories)
+    averageWindows = getAverageWindows(today)
+    windows = [getCurrentWindow(timePeriod, today)] + [(start, None) for start, _ in averageWindows]
+    currentTotals, *averageTotals = bucketSpending(categories, windows)
 
-    today = datetime.now()
     names = []
-    data =[]
-    filteredCategories=''
-    for selected in categories:
-        category = Category.objects.get(id=selected)
-        budgetCalculated = category.spendingLimit.getNumber()
-
-        categorySpend = 0.00
+    data = []
+    averageData = [[] for _ in averageWindows]
+    for category, budgetCalculated in zip(categories, convertBudgets(categories, timePeriod)):
         names.append(category.name)
+        data.append(budgetPercentage(float(currentTotals[category.id]), budgetCalculated))
+        for index, (_, numberOfDaysWeeksMonthsArray) in enumerate(averageWindows):
+            categorySpend = averageSpend(float(averageTotals[index][category.id]), timePeriod, numberOfDaysWeeksMonthsArray)
+            averageData[index].append(budgetPercentage(categorySpend, budgetCalculated))
+
+    return {'labels': names, 'data': data, 'averages': averageData}
 
-        if timePeriod == 'day':
-            # filtering all expenditures within the previous day
-            budgetCalculated = convertBudgetToDaily(category)
-            yesterday = today - timedelta(days=1)
-            filteredCategories = category.expenditures.filter(date__gte=yesterday)
-
-        if timePeriod == 'week':
-            # filtering all expenditures within the previous week
-            budgetCalculated = convertBudgetToWeekly(category)
-            weekStart = today
-            weekStart -= timedelta(days=weekStart.weekday())
-            weekEnd = today + timedelta(days = 1)
-            filteredCategories = category.expenditures.filter(date__gte=weekStart, date__lt=weekEnd)
-
-        if timePeriod == 'month':
-            # filtering all expenditures within the previous month
-            budgetCalculated = convertBudgetToMonthly(category)
-            filteredCategories = category.expenditures.filter(date__month=today.month, date__year=today.year)
-
-        for expense in filteredCategories:
-            categorySpend += float(expense.amount)
-
-        # adding the percentage each category's used budget, capped at 100%
-        amount = categorySpend/float(budgetCalculated)*100
-        if amount < 100:
-            data.append(round(amount,2))
-        else:
-            data.append(100)
-
-    returnedArrays = []
-    returnedArrays.append(names)
-    returnedArrays.append(data)
-    return returnedArrays
+def createDataAndLabelArrays(categories, timePeriod):
+    '''Create 2 arrays (graph data points as well as their labels). The data consists of the expenditures
+    within the last 'day', 'week', or 'month', according to the user's choice.'''
+
+    selected = loadCategories(categories)
+    totals, = bucketSpending(selected, [getCurrentWindow(timePeriod, datetime.now())])
+    names = [category.name for category in selected]
+    budgets = convertBudgets(selected, timePeriod)
+    data = [budgetPercentage(float(totals[category.id]), budget) for category, budget in zip(selected, budgets)]
+    return [names, data]
 
 
 def createDataAverageArrays(categories, timePeriod, pastMonthsFilterApplied, numberOfDaysWeeksMonthsArray):
     '''Generate a single array. Data calculations are made according to user's choice of whether they want 
     a mean analysis of 'daily', 'weekly', or 'monthly' ependitures.'''
 
+    selected = loadCategories(categories)
+    totals, = bucketSpending(selected, [(pastMonthsFilterApplied, None)])
     data = []
-    filteredCategories=''
-
-    for selected in categories:
-        category = Category.objects.get(id=selected)
-        budgetCalculated = category.spendingLimit.getNumber()
-
-        categorySpend = 0.00
-        # category expenditures are filtered and then their total is calculated
-        filteredCategories = category.expenditures.filter(date__gte=pastMonthsFilterApplied)
-        for expense in filteredCategories:
-            categorySpend += float(expense.amount)
-
-        if timePeriod == 'day':
-            # average spending per day is calculated
-            budgetCalculated = convertBudgetToDaily(category)
-            days = numberOfDaysWeeksMonthsArray[0]
-            categorySpend = categorySpend/days
-
-        if timePeriod == 'week':
-            # average spending per week is calculated
-            budgetCalculated = convertBudgetToWeekly(category)
-            # for the filtered smaller graphs, the average spending per week is calculated
-            weeks = numberOfDaysWeeksMonthsArray[1]
-            categorySpend = categorySpend/weeks
-
-        if timePeriod == 'month':
-            # average spending per month is calculated
-            budgetCalculated = convertBudgetToMonthly(category)
-            # for the filtered smaller graphs, the average spending per month is calculated
-            months = numberOfDaysWeeksMonthsArray[2]
-            categorySpend = categorySpend/months
-
-        # capping the maximum data to 100%
-        amount = categorySpend/float(budgetCalculated)*100
-        if amount < 100:
-            data.append(round(amount,2))
-        else:
-            data.append(100)
-
-    return data
\ No newline at end of file
+    for category, budget in zip(selected, convertBudgets(selected, timePeriod)):
+        categorySpend = averageSpend(float(totals[category.id]), timePeriod, numberOfDaysWeeksMonthsArray)
+        data.append(budgetPercentage(categorySpend, budget))
+    return data
+
+def _toDate(value):
+    return value.date() if isinstance(value, datetime) else value
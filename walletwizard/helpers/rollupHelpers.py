@@ -0,0 +1,103 @@
+'''Helper file for maintaining the per category, per day spending rollup.'''
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Sum
+from walletwizard.models import Category, CategoryDailySpending, Expenditure
+
+CategoryExpenditure = Category.expenditures.through
+
+def refreshDailySpending(categoryIds, dates):
+    '''Recompute the rollup rows of the given categories on the given days from their expenditures.'''
+
+    categoryIds = set(categoryIds)
+    dates = set(dates)
+    if not categoryIds or not dates:
+        return
+    with transaction.atomic():
+        # refreshes of the same category wait for each other, so their delete and insert never
+        # interleave into duplicate rows; locked in id order so two refreshes cannot deadlock
+        list(Category.objects.select_for_update().filter(id__in=categoryIds).order_by('id').values_list('id', flat=True))
+        CategoryDailySpending.objects.filter(category_id__in=categoryIds, date__in=dates).delete()
+        rows = CategoryExpenditure.objects.filter(
+            category_id__in=categoryIds, expenditure__date__in=dates
+        ).values('category_id', 'expenditure__date').annotate(
+            total=Sum('expenditure__amount'), count=Count('expenditure_id')
+        ).order_by()
+        CategoryDailySpending.objects.bulk_create([
+            CategoryDailySpending(
+                category_id=row['category_id'],
+                date=row['expenditure__date'],
+                total=row['total'],
+                count=row['count'],
+            ) for row in rows
+        ])
+
+def rebuildDailySpending():
+    '''Recompute the whole rollup from the expenditures table.'''
+
+    with transaction.atomic():
+        CategoryDailySpending.objects.all().delete()
+        rows = CategoryExpenditure.objects.values('category_id', 'expenditure__date').annotate(
+            total=Sum('expenditure__amount'), count=Count('expenditure_id')
+        ).order_by()
+        CategoryDailySpending.objects.bulk_create([
+            CategoryDailySpending(
+                category_id=row['category_id'],
+                date=row['expenditure__date'],
+                total=row['total'],
+                count=row['count'],
+            ) for row in rows.iterator()
+        ], batch_size=1000)
+
+def computeTotalSpentFromRollup(categoryId, start=None, end=None):
+    '''Sum a category's rollup rows dated within [start, end).'''
+
+    rollup = CategoryDailySpending.objects.filter(category_id=categoryId)
+    if start is not None:
+        rollup = rollup.filter(date__gte=start)
+    if end is not None:
+        rollup = rollup.filter(date__lt=end)
+    total = rollup.aggregate(total=Sum('total'))['total']
+    return total if total is not None else Decimal('0.00')
+
+# Signal receivers keeping the rollup in step with expenditure changes.
+
+def expenditurePreSave(sender, instance, raw=False, **kwargs):
+    instance._previousDate = None
+    if instance.pk and not raw:
+        instance._previousDate = Expenditure.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+def expenditurePostSave(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    categoryIds = CategoryExpenditure.objects.filter(expenditure_id=instance.pk).values_list('category_id', flat=True)
+    refreshDailySpending(categoryIds, [instance.date, getattr(instance, '_previousDate', None) or instance.date])
+
+def expenditurePreDelete(sender, instance, **kwargs):
+    instance._rollupCategoryIds = list(
+        CategoryExpenditure.objects.filter(expenditure_id=instance.pk).values_list('category_id', flat=True)
+    )
+
+def expenditurePostDelete(sender, instance, **kwargs):
+    refreshDailySpending(getattr(instance, '_rollupCategoryIds', []), [instance.date])
+
+def categoryExpendituresChanged(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._rollupClearedIds = _relatedIds(instance, reverse)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_rollupClearedIds', set())
+    if reverse:
+        categoryIds = pk_set
+        dates = [instance.date]
+    else:
+        categoryIds = [instance.pk]
+        dates = Expenditure.objects.filter(pk__in=pk_set).values_list('date', flat=True).distinct()
+    refreshDailySpending(categoryIds, dates)
+
+def _relatedIds(instance, reverse):
+    if reverse:
+        return set(CategoryExpenditure.objects.filter(expenditure_id=instance.pk).values_list('category_id', flat=True))
+    return set(CategoryExpenditure.objects.filter(category_id=instance.pk).values_list('expenditure_id', flat=True))
@@ -0,0 +1,60 @@
+'''Helper file for aggregating spending on the database side.'''
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.models import Q, Sum
+
+TIME_PERIODS = ['daily', 'weekly', 'monthly', 'yearly']
+
+def getTimePeriodStartAndEnd(timePeriod, today=None):
+    '''Return the [start, end) date range covering the current day, week, month or year.'''
+
+    if today is None:
+        today = date.today()
+    if timePeriod == 'daily':
+        start = today
+        end = today + timedelta(days=1)
+    elif timePeriod == 'weekly':
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=7)
+    elif timePeriod == 'monthly':
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    elif timePeriod == 'yearly':
+        start = today.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    else:
+        return None
+    return start, end
+
+def getCategorySpentInTimePeriodFilter(today=None, dateField='expenditures__date'):
+    '''Return a filter selecting each category's spending that falls in its spending limit's current time period.
+    Used to annotate many categories with their progress in a single grouped query.'''
+
+    spentFilter = Q()
+    for timePeriod in TIME_PERIODS:
+        start, end = getTimePeriodStartAndEnd(timePeriod, today)
+        spentFilter |= Q(**{
+            'spendingLimit__timePeriod': timePeriod,
+            f'{dateField}__gte': start,
+            f'{dateField}__lt': end,
+        })
+    return spentFilter
+
+def computeTotalSpent(expenditures, start=None, end=None, amountField='amount'):
+    '''Sum the amounts of the given expenditures (or daily spending rollup rows, summing their
+    `total`) dated within [start, end) in a single query.'''
+
+    if start is not None:
+        expenditures = expenditures.filter(date__gte=start)
+    if end is not None:
+        expenditures = expenditures.filter(date__lt=end)
+    total = expenditures.aggregate(total=Sum(amountField))['total']
+    return total if total is not None else Decimal('0.00')
+
+def computeTotalSpentInTimePeriod(timePeriod, expenditures, amountField='amount'):
+    '''Return the exact total spent on the given expenditures in the current time period.'''
+
+    window = getTimePeriodStartAndEnd(timePeriod)
+    if window is None:
+        return Decimal('0.00')
+    return computeTotalSpent(expenditures, *window, amountField=amountField)
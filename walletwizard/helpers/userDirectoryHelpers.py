@@ -0,0 +1,46 @@
+'''Helper file for listing and searching the users of the app.'''
+import sys
+from django.core.paginator import Paginator
+from django.db.models.functions import Lower
+from walletwizard.models import User
+
+USER_DIRECTORY_PAGE_SIZE = 10
+SEARCH_PAGE_SIZE = 10
+SURROGATES_START = 0xD800
+SURROGATES_END = 0xDFFF
+
+def getUserDirectory():
+    '''Return every user with their house loaded in the same query, for listing.'''
+    return User.objects.select_related('house')
+
+def getUserDirectoryPage(pageNumber, perPage=USER_DIRECTORY_PAGE_SIZE):
+    return Paginator(getUserDirectory(), perPage).get_page(pageNumber)
+
+def getPrefixUpperBound(prefix):
+    '''Return the first string that sorts after every string starting with the prefix, or None if there is none.'''
+    # the last characters that cannot be incremented are dropped, a prefix of only those has no bound
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    codePoint = ord(prefix[-1]) + 1
+    if SURROGATES_START <= codePoint <= SURROGATES_END:
+        # surrogates cannot be stored, the next character that can follows them
+        codePoint = SURROGATES_END + 1
+    return prefix[:-1] + chr(codePoint)
+
+def searchUserDirectory(prefix):
+    '''Return the users whose username starts with the prefix, ignoring case, in username order.'''
+    if not prefix:
+        return User.objects.none()
+    prefix = prefix.lower()
+    # a range on the lowercased username is served by user_username_lower_idx, unlike istartswith
+    users = getUserDirectory().annotate(lowerUsername=Lower('username')).filter(lowerUsername__gte=prefix)
+    upperBound = getPrefixUpperBound(prefix)
+    if upperBound is not None:
+        users = users.filter(lowerUsername__lt=upperBound)
+    return users.order_by('lowerUsername')
+
+def searchUserDirectoryPage(query, perPage=SEARCH_PAGE_SIZE):
+    '''Return the first users matching the query and whether there are more, without counting them.'''
+    users = list(searchUserDirectory(query)[:perPage + 1])
+    return users[:perPage], len(users) > perPage
@@ -0,0 +1,143 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from walletwizard.models import *
+from walletwizard.helpers.dashboardHelpers import DashboardSummary
+from walletwizard.helpers.modelHelpers import allocateBulkInsertIds
+from walletwizard.helpers.rollupHelpers import rebuildDailySpending
+from walletwizard.helpers.spendingHelpers import computeTotalSpentInTimePeriod
+
+class Command(BaseCommand):
+    USERNAME = 'benchmarkuser'
+    CATEGORY_COUNT = 10
+    NOTIFICATION_COUNT = 10000
+    BATCH_SIZE = 5000
+    INDEXED_MODELS = [Notification]
+
+    help = "Prints the query plans and timings of the hot queries with and without the composite indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expenditures', type=int, default=1000000,
+            help='Number of expenditures the benchmark user should have (seeded if missing).')
+        parser.add_argument('--repeat', type=int, default=5,
+            help='Number of times each hot path is timed.')
+        parser.add_argument('--seed', type=int, default=0,
+            help='Random seed used when generating benchmark data.')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        user = self._seedBenchmarkData(options['expenditures'])
+
+        with transaction.atomic():
+            # Drop the indexes inside a transaction that is rolled back, so the database is left untouched
+            schemaEditor = connection.schema_editor()
+            with connection.cursor() as cursor:
+                for model in Command.INDEXED_MODELS:
+                    for index in model._meta.indexes:
+                        cursor.execute(str(index.remove_sql(model, schemaEditor)))
+            self._analyze()
+            self._report('Before (without composite indexes)', user, options['repeat'])
+            transaction.set_rollback(True)
+
+        self._analyze()
+        self._report('After (with composite indexes)', user, options['repeat'])
+
+    '''Functions to run and explain the hot paths.'''
+
+    def _hotPaths(self, user):
+        category = user.categories.select_related('spendingLimit').first()
+        return [
+            ('Category total this year', lambda: computeTotalSpentInTimePeriod('yearly', category.dailySpendings, 'total')),
+            ('User total this month', lambda: user.totalSpentThisMonth()),
+            ('Dashboard summary', lambda: DashboardSummary(user)),
+            ('Unread notification count', lambda: Notification.objects.filter(toUser=user, isSeen=False).count()),
+            ('Latest unread notifications', lambda: list(Notification.objects.filter(toUser=user, isSeen=False)[:3])),
+        ]
+
+    def _report(self, heading, user, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        for name, hotPath in self._hotPaths(user):
+            with CaptureQueriesContext(connection) as context:
+                hotPath()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                hotPath()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(self.style.SUCCESS(f"{name}: best of {repeat} {min(timings) * 1000:.2f} ms"))
+            for query in context.captured_queries:
+                self.stdout.write(f"  {query['sql']}")
+                for row in self._explain(query['sql']):
+                    self.stdout.write(f"    {row}")
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    '''Functions to seed the benchmark data set.'''
+
+    def _seedBenchmarkData(self, expenditureCount):
+        user = User.objects.filter(username=Command.USERNAME).first()
+        if user is None:
+            user = User.objects.create_user(
+                username=Command.USERNAME,
+                firstName='Benchmark',
+                lastName='User',
+                email='benchmark.user@example.org',
+                password='Password123',
+            )
+            for i in range(Command.CATEGORY_COUNT):
+                spendingLimit = SpendingLimit.objects.create(
+                    timePeriod=random.choice(SpendingLimit.TIME_CHOICES)[0], amount=Decimal(1000)
+                )
+                category = Category.objects.create(name=f'Benchmark {i}', spendingLimit=spendingLimit)
+                category.users.add(user)
+                user.categories.add(category)
+            self._seedNotifications(user)
+
+        existing = Expenditure.objects.filter(expenditures__in=user.categories.all()).count()
+        if existing < expenditureCount:
+            self._seedExpenditures(user, expenditureCount - existing)
+        return user
+
+    def _seedExpenditures(self, user, count):
+        categoryIds = list(user.categories.values_list('id', flat=True))
+        CategoryExpenditure = Category.expenditures.through
+        today = date.today()
+        created = 0
+        while created < count:
+            batchSize = min(Command.BATCH_SIZE, count - created)
+            expenditures = Expenditure.objects.bulk_create(allocateBulkInsertIds([
+                Expenditure(
+                    title='Benchmark expenditure',
+                    amount=Decimal(random.randrange(1, 10000)) / 100,
+                    date=today - timedelta(days=random.randrange(0, 3650)),
+                ) for _ in range(batchSize)
+            ]))
+            CategoryExpenditure.objects.bulk_create([
+                CategoryExpenditure(category_id=random.choice(categoryIds), expenditure_id=expenditure.pk)
+                for expenditure in expenditures
+            ])
+            created += batchSize
+            self.stdout.write(f"Seeded {created}/{count} expenditures")
+        rebuildDailySpending()
+
+    def _seedNotifications(self, user):
+        Notification.objects.bulk_create([
+            Notification(
+                toUser=user,
+                title='Benchmark notification',
+                message='Benchmark notification',
+                isSeen=random.random() < 0.9,
+                type='basic',
+            ) for _ in range(Command.NOTIFICATION_COUNT)
+        ], batch_size=Command.BATCH_SIZE)
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from walletwizard.models import *
+from walletwizard.helpers.benchmarkHelpers import BENCHMARK_SIZES, benchmarkUrls, seedBenchmarkData
+
+class Command(BaseCommand):
+    USERNAME = 'benchmarkurlsuser'
+
+    help = "Prints the query count, SQL time and wall time of every page at growing data sizes, and fails if a page's query count grows."
+
+    def handle(self, *args, **options):
+        # the test client is only allowed to request the app's pages inside a test environment
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                # the benchmark data is created inside a transaction that is rolled back
+                results = self._runBenchmarks()
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+        self._report(results)
+        grown = self._findGrownUrls(results)
+        if grown:
+            raise CommandError(f"The query count of these pages grows with the data size: {', '.join(grown)}")
+
+    '''Functions to run and report the benchmarks.'''
+
+    def _runBenchmarks(self):
+        user = User.objects.create_user(
+            username=Command.USERNAME,
+            firstName='Benchmark',
+            lastName='User',
+            email='benchmark.urls@example.org',
+            password='Password123',
+        )
+        Points.objects.create(user=user, count=50)
+        client = Client()
+        client.force_login(user)
+        results = {}
+        for size, sizes in BENCHMARK_SIZES.items():
+            seedBenchmarkData(user, **sizes)
+            results[size] = benchmarkUrls(client, user)
+        return results
+
+    def _report(self, results):
+        sizes = list(results)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'url':<20}" + ''.join(f"{size + ' queries':>16}{'sql ms':>10}{'wall ms':>10}" for size in sizes)
+        ))
+        for name in results[sizes[0]]:
+            row = f"{name:<20}"
+            for size in sizes:
+                result = results[size][name]
+                row += f"{result['queries']:>16}{result['sqlTime'] * 1000:>10.2f}{result['wallTime'] * 1000:>10.2f}"
+            self.stdout.write(row)
+
+    def _findGrownUrls(self, results):
+        sizes = list(results)
+        return [
+            name for name in results[sizes[0]]
+            if any(results[larger][name]['queries'] > results[smaller][name]['queries'] for smaller, larger in zip(sizes, sizes[1:]))
+        ]
@@ -0,0 +1,23 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from walletwizard.helpers.receiptHelpers import RECEIPT_COLLECTION_BATCH_SIZE, RECEIPT_COLLECTION_GRACE_PERIOD, collectReceiptFiles
+
+class Command(BaseCommand):
+    help = "Deletes the stored receipt files that no expenditure has referred to for a while, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECEIPT_COLLECTION_BATCH_SIZE)
+        parser.add_argument(
+            '--grace-period', type=int, default=int(RECEIPT_COLLECTION_GRACE_PERIOD.total_seconds() // 60),
+            help="Minutes a file must have gone without references before it is deleted.",
+        )
+
+    def handle(self, *args, **options):
+        gracePeriod = timedelta(minutes=options['grace_period'])
+        collectedFiles = 0
+        while True:
+            batchFiles = collectReceiptFiles(options['batch_size'], gracePeriod)
+            collectedFiles += batchFiles
+            if batchFiles < options['batch_size']:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Number of deleted receipt files: {collectedFiles}"))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from walletwizard.helpers.pointsHelpers import compactHousePoints
+
+class Command(BaseCommand):
+    help = "Folds the pending points ledger entries into the points of each house."
+
+    def handle(self, *args, **options):
+        compactedEntries = compactHousePoints()
+        self.stdout.write(self.style.SUCCESS(f"Number of compacted ledger entries: {compactedEntries}"))
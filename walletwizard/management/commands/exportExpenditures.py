@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from walletwizard.models import User
+from walletwizard.helpers.exportHelpers import EXPORT_FORMATS, streamExpenditures
+
+class Command(BaseCommand):
+    help = "Streams all of a user's expenditures as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Username of the user whose expenditures are exported.')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv',
+            help='Format of the export.')
+        parser.add_argument('--output', default=None,
+            help='File to write the export to (defaults to standard output).')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        chunks = streamExpenditures(user, options['format'])
+        if options['output'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        else:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(chunks)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from walletwizard.models import User, Category
+from walletwizard.helpers.importHelpers import IMPORT_FORMATS, getImportFormat, parseRows, importExpenditures
+
+class Command(BaseCommand):
+    help = "Imports expenditures into a user's category from a CSV file or an OFX bank statement."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Username of the user the expenditures belong to.')
+        parser.add_argument('categoryId', type=int, help='Id of the category to import the expenditures into.')
+        parser.add_argument('path', help='Path of the CSV or OFX file.')
+        parser.add_argument('--format', choices=sorted(set(IMPORT_FORMATS.values())), default=None,
+            help='Format of the file (guessed from its extension by default).')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+        category = Category.objects.filter(id=options['categoryId']).first()
+        if category is None:
+            raise CommandError(f"Category {options['categoryId']} does not exist.")
+        importFormat = options['format'] or getImportFormat(options['path'])
+        if importFormat is None:
+            raise CommandError('Could not guess the format of the file, please pass --format.')
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as file:
+            result = importExpenditures(user, category, parseRows(file, importFormat))
+
+        for rowNumber, error in result.errors:
+            self.stderr.write(f"Row {rowNumber}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Number of imported expenditures: {result.createdCount}"))
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from walletwizard.helpers.receiptHelpers import RECEIPT_JOB_BATCH_SIZE, processReceiptJobs, deleteFailedReceiptJobs
+
+class Command(BaseCommand):
+    help = "Creates the thumbnails and web sized versions of the queued receipt uploads, and deletes the jobs that failed over a week ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECEIPT_JOB_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Keep waiting for new receipts instead of exiting once the queue is empty.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to wait between polls of an empty queue when looping.")
+
+    def handle(self, *args, **options):
+        processedJobs = 0
+        while True:
+            deleteFailedReceiptJobs()
+            batchJobs = processReceiptJobs(options['batch_size'])
+            processedJobs += batchJobs
+            if batchJobs:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Number of processed receipts: {processedJobs}"))
@@ -0,0 +1,163 @@
+import time
+from datetime import date, datetime
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from walletwizard.models import *
+from walletwizard.helpers.followHelpers import refreshFollowCounts
+from walletwizard.helpers.receiptHelpers import changeReceiptReferences
+
+class Command(BaseCommand):
+    SEEDED_EMAIL_DOMAIN = '@example.org'
+
+    help = "Deletes the app's data with set-based deletes, optionally only data older than a date or only seeded users."
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument('--before', type=date.fromisoformat, default=None,
+            help='Only delete expenditures, notifications and compacted points ledger entries older than this date (YYYY-MM-DD).')
+        scope.add_argument('--seeded-only', action='store_true',
+            help=f'Only delete the users created by the seed command (emails ending in {Command.SEEDED_EMAIL_DOMAIN}) and their data.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            if options['before'] is not None:
+                self.purgeBefore(options['before'])
+            elif options['seeded_only']:
+                self.purgeSeededUsers()
+            else:
+                self.purgeEverything()
+        # the raw deletes send no signals, so the cached notification figures of every user are
+        # dropped, once the purge is committed so no request caches the purged rows again
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(f"Purge finished in {time.perf_counter() - started:.1f}s"))
+
+    '''Functions to purge groups of data, children before the rows they reference.'''
+
+    def purgeEverything(self):
+        models = [
+            CategoryDailySpending,
+            Category.expenditures.through,
+            Category.users.through,
+            User.categories.through,
+            User.followers.through,
+            User.groups.through,
+            User.user_permissions.through,
+            ShareCategoryNotification,
+            FollowRequestNotification,
+            Notification,
+            PointsLedgerEntry,
+            Points,
+            LogEntry,
+            ReceiptJob,
+            ReceiptBlob,
+            Expenditure,
+            Category,
+            User,
+            SpendingLimit,
+        ]
+        for model in models:
+            count = model.objects.count()
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sql_flush(no_style(), [model._meta.db_table], allow_cascade=True):
+                    cursor.execute(sql)
+            self._reportDeleted(model, count)
+        resetHouses = House.objects.update(points=0, memberCount=0)
+        self.stdout.write(self.style.SUCCESS(f"Number of reset houses: {resetHouses}"))
+
+    def purgeBefore(self, before):
+        beforeStart = timezone.make_aware(datetime.combine(before, datetime.min.time()))
+        CategoryExpenditure = Category.expenditures.through
+        self._delete(CategoryExpenditure.objects.filter(expenditure__date__lt=before))
+        # every expenditure of these days is deleted, so their rollup rows are empty
+        self._delete(CategoryDailySpending.objects.filter(date__lt=before))
+        self._delete(ReceiptJob.objects.filter(expenditure__date__lt=before))
+        self._deleteExpenditures(Expenditure.objects.filter(date__lt=before))
+        self._deleteNotifications(Q(createdAt__lt=beforeStart))
+        # pending entries still have to be folded into their house's points
+        self._delete(PointsLedgerEntry.objects.filter(createdAt__lt=beforeStart, isCompacted=True))
+
+    def purgeSeededUsers(self):
+        seededUsers = User.objects.filter(email__endswith=Command.SEEDED_EMAIL_DOMAIN)
+        otherUsers = User.objects.exclude(email__endswith=Command.SEEDED_EMAIL_DOMAIN)
+        # categories shared with a user who is not seeded are kept, only the seeded users leave them
+        categories = Category.objects.filter(users__in=seededUsers).exclude(users__in=otherUsers)
+        expenditures = Expenditure.objects.filter(expenditures__in=categories).exclude(
+            expenditures__in=Category.objects.exclude(id__in=categories)
+        )
+
+        self._updateHouses(seededUsers)
+        self._delete(CategoryDailySpending.objects.filter(category__in=categories))
+        self._delete(ReceiptJob.objects.filter(expenditure__in=expenditures))
+        self._deleteExpenditures(expenditures)
+        self._delete(Category.expenditures.through.objects.filter(category__in=categories))
+        self._deleteNotifications(Q(toUser__in=seededUsers), seededUsers, categories)
+        self._delete(Points.objects.filter(user__in=seededUsers))
+        updatedEntries = PointsLedgerEntry.objects.filter(user__in=seededUsers).update(user=None)
+        self.stdout.write(f"Detached {updatedEntries} points ledger entries from their users")
+        self._delete(User.followers.through.objects.filter(Q(from_user__in=seededUsers) | Q(to_user__in=seededUsers)))
+        self._delete(User.groups.through.objects.filter(user__in=seededUsers))
+        self._delete(User.user_permissions.through.objects.filter(user__in=seededUsers))
+        self._delete(LogEntry.objects.filter(user__in=seededUsers))
+        self._delete(SpendingLimit.objects.filter(
+            Q(id__in=categories.values('spendingLimit')) | Q(id__in=seededUsers.values('overallSpendingLimit'))
+        ))
+        self._delete(User.categories.through.objects.filter(Q(user__in=seededUsers) | Q(category__in=categories)))
+        self._delete(categories)
+        # the queries above select the categories through these rows, so they go last
+        self._delete(Category.users.through.objects.filter(user__in=seededUsers))
+        self._delete(seededUsers)
+        # the users left may have lost followers or followees
+        refreshFollowCounts()
+
+    '''Helper functions to purge data for purge.'''
+
+    def _delete(self, queryset):
+        # a single DELETE statement: the per object signals and cascades of QuerySet.delete() are
+        # what made deleting a large data set take hours, and every dependant is deleted explicitly
+        deleted = queryset._raw_delete(queryset.db)
+        self._reportDeleted(queryset.model, deleted)
+
+    def _deleteExpenditures(self, expenditures):
+        # distinct on the id, an expenditure is joined once per category holding it
+        receiptFiles = [
+            name for _, *names in expenditures.values_list('id', 'receipt', 'receiptThumbnail', 'receiptWeb').distinct()
+            for name in names if name
+        ]
+        self._delete(expenditures)
+        # the receipt files are shared, the collector deletes those no longer referenced
+        changeReceiptReferences(removedNames=receiptFiles)
+
+    def _deleteNotifications(self, condition, users=None, categories=None):
+        shareCondition = followCondition = condition
+        if users is not None:
+            shareCondition = condition | Q(fromUser__in=users) | Q(sharedCategory__in=categories)
+            followCondition = condition | Q(fromUser__in=users)
+        self._delete(ShareCategoryNotification.objects.filter(shareCondition))
+        self._delete(FollowRequestNotification.objects.filter(followCondition))
+        # also removes the base rows of the share and follow notifications deleted above
+        self._delete(Notification.objects.filter(
+            condition | Q(
+                type__in=['category', 'follow'],
+                sharecategorynotification__isnull=True,
+                followrequestnotification__isnull=True,
+            )
+        ))
+
+    def _updateHouses(self, users):
+        houses = users.filter(house__isnull=False).values('house').annotate(
+            members=Count('id', distinct=True), totalPoints=Sum('points__count')
+        ).order_by()
+        for house in houses:
+            House.objects.filter(id=house['house']).update(
+                points=F('points') - (house['totalPoints'] or 0), memberCount=F('memberCount') - house['members']
+            )
+        self.stdout.write(f"Updated the points and members of {len(houses)} houses")
+
+    def _reportDeleted(self, model, count):
+        self.stdout.write(f"Deleted {count} rows from {model._meta.db_table}")
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from walletwizard.helpers.leaderboardHelpers import refreshLeaderboardRanks
+
+class Command(BaseCommand):
+    help = "Stores each user's current position in the leaderboard, shown as their rank on the scores page."
+
+    def handle(self, *args, **options):
+        rankedUsers = refreshLeaderboardRanks()
+        self.stdout.write(self.style.SUCCESS(f"Number of ranked users: {rankedUsers}"))
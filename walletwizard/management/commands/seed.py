@@ -1,11 +1,19 @@
 import decimal
 import random
 import datetime
+import time
+from datetime import timedelta
 from faker import Faker
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import F, Max
 from dateutil.relativedelta import relativedelta
 from walletwizard.models import *
 from walletwizard.helpers.seedingHelper import *
+from walletwizard.helpers.avatarHelpers import setGravatarUrls
+from walletwizard.helpers.followHelpers import refreshFollowCounts
 
 class Command(BaseCommand):
     PASSWORD = "Password123"
@@ -14,13 +22,37 @@ class Command(BaseCommand):
     USER_COUNT = 10
     NOTIFICATION_COUNT = 5
 
+    SCALE_USER_BATCH_SIZE = 1000
+    SCALE_POOL_SIZE = 1000
+
     help = "Seeds the database for testing and development."
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=None,
+            help='Generate this many additional load-test users, with their categories, expenditures and notifications, using batched bulk inserts.')
+        parser.add_argument('--categories-per-user', type=int, default=3,
+            help='Number of categories generated for each user in --scale mode.')
+        parser.add_argument('--expenditures-per-category', type=int, default=20,
+            help='Number of expenditures generated for each category in --scale mode.')
+        parser.add_argument('--notifications-per-user', type=int, default=Command.NOTIFICATION_COUNT,
+            help='Number of notifications generated for each user in --scale mode.')
+        parser.add_argument('--followers-per-user', type=int, default=5,
+            help='Maximum number of followers generated for each user in --scale mode.')
+        parser.add_argument('--seed', type=int, default=None,
+            help='Random seed, so the generated data is reproducible.')
+
     def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+            Faker.seed(options['seed'])
+        if options['scale'] is not None:
+            self.seedAtScale(options)
+            return
+
         self.seedSpendingLimits()
         self.seedExpenditures()
         user = self.seedBaseUser()
@@ -114,6 +146,155 @@ class Command(BaseCommand):
             notificationsCreated += Command.NOTIFICATION_COUNT
         self.stdout.write(self.style.SUCCESS(f"Number of created notifications: {notificationsCreated}"))
 
+    '''Functions to seed a load-test data set for seeder, in batches of users.'''
+
+    def seedAtScale(self, options):
+        started = time.perf_counter()
+        userCount = options['scale']
+        self.password = make_password(Command.PASSWORD)
+        self.houseIds = list(House.objects.values_list('id', flat=True))
+        self.housePoints = {houseId: 0 for houseId in self.houseIds}
+        self.houseMembers = {houseId: 0 for houseId in self.houseIds}
+        self.firstNames = [self.faker.first_name() for _ in range(Command.SCALE_POOL_SIZE)]
+        self.lastNames = [self.faker.last_name() for _ in range(Command.SCALE_POOL_SIZE)]
+        self.sentences = [self.faker.sentence() for _ in range(Command.SCALE_POOL_SIZE)]
+        # ids are allocated up front, so rows can be linked without reading them back
+        self.nextIds = {model: (model.objects.aggregate(maxId=Max('id'))['maxId'] or 0) + 1
+            for model in [User, SpendingLimit, Category, Expenditure]}
+        self.firstUserId = self.nextIds[User]
+
+        created = 0
+        while created < userCount:
+            batchSize = min(Command.SCALE_USER_BATCH_SIZE, userCount - created)
+            with transaction.atomic():
+                self._seedUserBatch(batchSize, options)
+            created += batchSize
+            self.stdout.write(f"Seeded {created}/{userCount} users")
+
+        for houseId in self.houseIds:
+            House.objects.filter(id=houseId).update(
+                points=F('points') + self.housePoints[houseId],
+                memberCount=F('memberCount') + self.houseMembers[houseId],
+            )
+        self._resetSequences()
+        # the followers were bulk created without signals, so the follow counts are recounted
+        refreshFollowCounts()
+        self.stdout.write(self.style.SUCCESS(f"Number of created users: {userCount} in {time.perf_counter() - started:.1f}s"))
+
+    def _seedUserBatch(self, batchSize, options):
+        categoriesPerUser = options['categories_per_user']
+        userIds = self._allocateIds(User, batchSize)
+        users = []
+        points = []
+        for userId in userIds:
+            houseId = random.choice(self.houseIds)
+            count = random.randrange(5, 500)
+            # bulk_create skips the pre_save signal that stores the gravatar URLs
+            users.append(setGravatarUrls(User(
+                id=userId,
+                username=f'loaduser{userId}',
+                firstName=random.choice(self.firstNames),
+                lastName=random.choice(self.lastNames),
+                email=f'loaduser{userId}@example.org',
+                password=self.password,
+                house_id=houseId,
+            )))
+            points.append(Points(user_id=userId, count=count))
+            self.housePoints[houseId] += count
+            self.houseMembers[houseId] += 1
+        User.objects.bulk_create(users)
+        Points.objects.bulk_create(points)
+
+        categoryIds = self._allocateIds(Category, batchSize * categoriesPerUser)
+        spendingLimitIds = self._allocateIds(SpendingLimit, len(categoryIds))
+        SpendingLimit.objects.bulk_create([
+            SpendingLimit(
+                id=spendingLimitId,
+                timePeriod=random.choice(SpendingLimit.TIME_CHOICES)[0],
+                amount=decimal.Decimal(random.randrange(1000, 100000))/100,
+            ) for spendingLimitId in spendingLimitIds
+        ])
+        Category.objects.bulk_create([
+            Category(
+                id=categoryId,
+                name=random.choice(catergories),
+                description=random.choice(self.sentences),
+                spendingLimit_id=spendingLimitId,
+            ) for categoryId, spendingLimitId in zip(categoryIds, spendingLimitIds)
+        ])
+        owners = [userId for userId in userIds for _ in range(categoriesPerUser)]
+        Category.users.through.objects.bulk_create([
+            Category.users.through(category_id=categoryId, user_id=userId)
+            for categoryId, userId in zip(categoryIds, owners)
+        ])
+        User.categories.through.objects.bulk_create([
+            User.categories.through(user_id=userId, category_id=categoryId)
+            for categoryId, userId in zip(categoryIds, owners)
+        ])
+
+        self._seedExpendituresAtScale(categoryIds, options['expenditures_per_category'])
+        self._seedNotificationsAtScale(userIds, options['notifications_per_user'])
+        self._seedFollowersAtScale(userIds, options['followers_per_user'])
+
+    def _seedExpendituresAtScale(self, categoryIds, expendituresPerCategory):
+        today = datetime.now().date()
+        expenditureIds = iter(self._allocateIds(Expenditure, len(categoryIds) * expendituresPerCategory))
+        newExpenditures = []
+        links = []
+        # the categories are new, so their daily spending rollup is built here instead of by the signals
+        dailySpendings = {}
+        for categoryId in categoryIds:
+            for _ in range(expendituresPerCategory):
+                expenditureId = next(expenditureIds)
+                newExpenditures.append(Expenditure(
+                    id=expenditureId,
+                    title=random.choice(expenditures),
+                    description=random.choice(self.sentences),
+                    date=today - timedelta(days=random.randrange(0, 1095)),
+                    amount=decimal.Decimal(random.randrange(1, 10000))/100,
+                ))
+                links.append(Category.expenditures.through(category_id=categoryId, expenditure_id=expenditureId))
+                dailySpending = dailySpendings.setdefault(
+                    (categoryId, newExpenditures[-1].date),
+                    CategoryDailySpending(category_id=categoryId, date=newExpenditures[-1].date, total=0, count=0),
+                )
+                dailySpending.total += newExpenditures[-1].amount
+                dailySpending.count += 1
+        Expenditure.objects.bulk_create(newExpenditures)
+        Category.expenditures.through.objects.bulk_create(links)
+        CategoryDailySpending.objects.bulk_create(dailySpendings.values())
+
+    def _seedNotificationsAtScale(self, userIds, notificationsPerUser):
+        Notification.objects.bulk_create([
+            Notification(
+                toUser_id=userId,
+                title=notificationTitles[i % len(notificationTitles)],
+                message=notificationMessages[i % len(notificationMessages)],
+                isSeen=random.choice([True, False]),
+                type='basic',
+            ) for userId in userIds for i in range(notificationsPerUser)
+        ])
+
+    def _seedFollowersAtScale(self, userIds, followersPerUser):
+        follows = []
+        for userId in userIds:
+            # followers are drawn from the load-test users created so far
+            candidates = range(self.firstUserId, userId)
+            for followerId in random.sample(candidates, min(followersPerUser, len(candidates))):
+                follows.append(User.followers.through(from_user_id=userId, to_user_id=followerId))
+        User.followers.through.objects.bulk_create(follows)
+
+    def _allocateIds(self, model, count):
+        firstId = self.nextIds[model]
+        self.nextIds[model] += count
+        return range(firstId, firstId + count)
+
+    def _resetSequences(self):
+        # rows were inserted with explicit ids, so move the backends' sequences past them
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, SpendingLimit, Category, Expenditure]):
+                cursor.execute(sql)
+
     '''Functions to create individual objects for seeder.'''
 
     def _createUserAndRequiredObjects(self, firstName, lastName, house, username=''):
@@ -152,10 +333,8 @@ class Command(BaseCommand):
         user.categories.add(category)
         category.users.add(user)
         user.save()
-        sampleSize = random.randint(0, Expenditure.objects.count())
-        expendituresToAdd = random.sample(list(Expenditure.objects.all()), sampleSize)
-        for expenditure in expendituresToAdd:
-            category.expenditures.add(expenditure)
+        expenditureIds = list(Expenditure.objects.values_list('id', flat=True))
+        category.expenditures.add(*random.sample(expenditureIds, random.randint(0, len(expenditureIds))))
         category.save()
 
     def _createExpenditure(self, dayDifference, title):
@@ -188,10 +367,7 @@ class Command(BaseCommand):
     '''Helper functions to create user for seeder.'''
 
     def _updateFollowers(self, user):
-        for followee in random.sample(list(User.objects.all()), User.objects.count()):
-            if user != followee:
-                user.followers.add(followee)
-        user.save()
+        user.followers.add(*User.objects.exclude(id=user.id))
 
     def _email(self, firstName, lastName):
         email = f'{firstName}.{lastName}@example.org'
@@ -0,0 +1,16 @@
+from ..helpers.notificationsHelpers import notificationDispatcher, discardDispatchedNotifications
+
+class NotificationDispatchMiddleware:
+    '''Write every notification created while handling a request in bulk once the view has returned.
+    A view that fails (its exception has already been turned into a 5xx response here) has its
+    notifications dropped.'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with notificationDispatcher():
+            response = self.get_response(request)
+            if response.status_code >= 500:
+                discardDispatchedNotifications()
+        return response
@@ -0,0 +1,53 @@
+import json
+import logging
+import random
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from ..helpers.profilingHelpers import profileRequest
+
+logger = logging.getLogger('walletwizard.profiling')
+
+class RequestProfilingMiddleware:
+    '''Profile a sample of requests, reporting their SQL, context processor and template times
+    in a Server-Timing response header and a JSON log line.'''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sampleRate = settings.REQUEST_PROFILING['SAMPLE_RATE']
+        self.duplicateQueryLimit = settings.REQUEST_PROFILING['DUPLICATE_QUERY_LIMIT']
+        if self.sampleRate <= 0:
+            # removes the middleware from the stack, so leaving it configured costs nothing
+            raise MiddlewareNotUsed()
+
+    def __call__(self, request):
+        if random.random() >= self.sampleRate:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with profileRequest() as profile:
+            response = self.get_response(request)
+        totalTime = time.perf_counter() - start
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={profile.sqlTime * 1000:.2f};desc="{profile.queryCount} queries"',
+            f'contextProcessors;dur={profile.contextProcessorTime() * 1000:.2f}',
+            f'templates;dur={profile.templateTime * 1000:.2f}',
+            f'total;dur={totalTime * 1000:.2f}',
+        ])
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'totalMs': round(totalTime * 1000, 2),
+            'queryCount': profile.queryCount,
+            'sqlMs': round(profile.sqlTime * 1000, 2),
+            'duplicateQueries': [
+                {'sql': sql, 'count': count} for sql, count in profile.duplicateQueries(self.duplicateQueryLimit)
+            ],
+            'contextProcessorMs': {
+                name: round(duration * 1000, 2) for name, duration in profile.contextProcessorTimes.items()
+            },
+            'templateMs': round(profile.templateTime * 1000, 2),
+        }))
+        return response
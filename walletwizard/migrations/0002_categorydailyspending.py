@@ -0,0 +1,49 @@
+# Generated by Django 3.2.5 on 2026-10-18 16:17
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def buildDailySpending(apps, schema_editor):
+    Category = apps.get_model('walletwizard', 'Category')
+    CategoryDailySpending = apps.get_model('walletwizard', 'CategoryDailySpending')
+    rows = Category.expenditures.through.objects.values('category_id', 'expenditure__date').annotate(
+        total=Sum('expenditure__amount'), count=Count('expenditure_id')
+    ).order_by()
+    CategoryDailySpending.objects.bulk_create([
+        CategoryDailySpending(
+            category_id=row['category_id'],
+            date=row['expenditure__date'],
+            total=row['total'],
+            count=row['count'],
+        ) for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryDailySpending',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dailySpendings', to='walletwizard.category')),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categorydailyspending',
+            constraint=models.UniqueConstraint(fields=('category', 'date'), name='unique_category_daily_spending'),
+        ),
+        migrations.RunPython(buildDailySpending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.5 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0002_categorydailyspending'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['toUser', 'isSeen', '-createdAt'], name='notification_user_seen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('isSeen', False)), fields=['toUser', '-createdAt'], name='notification_user_unseen_idx'),
+        ),
+    ]
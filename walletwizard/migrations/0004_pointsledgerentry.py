@@ -0,0 +1,33 @@
+# Generated by Django 3.2.5 on 2026-10-18 16:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0003_expenditure_notification_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('isCompacted', models.BooleanField(default=False)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('house', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pointsLedgerEntries', to='walletwizard.house')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-createdAt'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pointsledgerentry',
+            index=models.Index(condition=models.Q(('isCompacted', False)), fields=['house'], name='points_ledger_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:03
+
+from django.db import migrations, models
+import django.db.models.functions.text
+from walletwizard.helpers.avatarHelpers import setGravatarUrls
+
+BATCH_SIZE = 1000
+
+def storeGravatarUrls(apps, schema_editor):
+    User = apps.get_model('walletwizard', 'User')
+    users = []
+    for user in User.objects.only('id', 'email').iterator(chunk_size=BATCH_SIZE):
+        users.append(setGravatarUrls(user))
+        if len(users) == BATCH_SIZE:
+            User.objects.bulk_update(users, ['gravatarUrl', 'miniGravatarUrl'])
+            users = []
+    User.objects.bulk_update(users, ['gravatarUrl', 'miniGravatarUrl'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0005_user_username_lower_idx'),
+    ]
+
+    # Django 3.2.5 cannot remake a SQLite table that has an expression index, so the
+    # username index is dropped while the fields are added and created again afterwards
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_username_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='gravatarUrl',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='miniGravatarUrl',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+        ),
+        migrations.RunPython(storeGravatarUrls, migrations.RunPython.noop),
+    ]
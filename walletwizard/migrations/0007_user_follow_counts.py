@@ -0,0 +1,48 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.functions.text
+
+def countFollows(apps, schema_editor):
+    User = apps.get_model('walletwizard', 'User')
+    UserFollower = User.followers.through
+
+    def countBy(field):
+        counts = UserFollower.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+            count=Count('id')
+        ).values('count')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    User.objects.update(followersCount=countBy('from_user'), followeesCount=countBy('to_user'))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0006_user_gravatar_urls'),
+    ]
+
+    # Django 3.2.5 cannot remake a SQLite table that has an expression index, so the
+    # username index is dropped while the fields are added and created again afterwards
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_username_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='followeesCount',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='followersCount',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+        ),
+        migrations.RunPython(countFollows, migrations.RunPython.noop),
+    ]
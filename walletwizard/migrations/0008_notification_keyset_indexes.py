@@ -0,0 +1,29 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0007_user_follow_counts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_user_seen_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_user_unseen_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('isSeen', False)), fields=['toUser', '-createdAt', '-id'], name='notification_unread_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('isSeen', True)), fields=['toUser', '-createdAt', '-id'], name='notification_read_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+def queueExistingReceipts(apps, schema_editor):
+    Expenditure = apps.get_model('walletwizard', 'Expenditure')
+    ReceiptJob = apps.get_model('walletwizard', 'ReceiptJob')
+    expenditureIds = Expenditure.objects.exclude(receipt='').exclude(receipt=None).values_list('id', flat=True)
+    ReceiptJob.objects.bulk_create(
+        (ReceiptJob(expenditure_id=expenditureId) for expenditureId in expenditureIds.iterator()),
+        batch_size=BATCH_SIZE,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0008_notification_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenditure',
+            name='receiptHash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='expenditure',
+            name='receiptThumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='receipts/thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='expenditure',
+            name='receiptWeb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='receipts/web/'),
+        ),
+        migrations.CreateModel(
+            name='ReceiptJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('lastError', models.CharField(blank=True, max_length=250)),
+                ('claimedAt', models.DateTimeField(blank=True, null=True)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('expenditure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receiptJobs', to='walletwizard.expenditure')),
+            ],
+            options={
+                'ordering': ['createdAt'],
+            },
+        ),
+        migrations.RunPython(queueExistingReceipts, migrations.RunPython.noop),
+    ]
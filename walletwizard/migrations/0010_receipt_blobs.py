@@ -0,0 +1,58 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:20
+
+from collections import Counter
+from django.db import migrations, models
+import walletwizard.storage.receiptStorage
+
+RECEIPT_FIELDS = ['receipt', 'receiptThumbnail', 'receiptWeb']
+BATCH_SIZE = 1000
+
+def countReceiptReferences(apps, schema_editor):
+    Expenditure = apps.get_model('walletwizard', 'Expenditure')
+    ReceiptBlob = apps.get_model('walletwizard', 'ReceiptBlob')
+    referenceCounts = Counter()
+    for names in Expenditure.objects.values_list(*RECEIPT_FIELDS).iterator():
+        referenceCounts.update(name for name in names if name)
+    ReceiptBlob.objects.bulk_create(
+        [ReceiptBlob(name=name, referenceCount=count) for name, count in referenceCounts.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0009_receipt_pipeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('referenceCount', models.IntegerField(default=0)),
+                ('unreferencedAt', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='expenditure',
+            name='receipt',
+            field=models.ImageField(blank=True, null=True, storage=walletwizard.storage.receiptStorage.ContentAddressedStorage(), upload_to='receipts/'),
+        ),
+        migrations.AlterField(
+            model_name='expenditure',
+            name='receiptThumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=walletwizard.storage.receiptStorage.ContentAddressedStorage(), upload_to='receipts/thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='expenditure',
+            name='receiptWeb',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=walletwizard.storage.receiptStorage.ContentAddressedStorage(), upload_to='receipts/web/'),
+        ),
+        migrations.AddIndex(
+            model_name='receiptblob',
+            index=models.Index(condition=models.Q(('referenceCount__lte', 0)), fields=['unreferencedAt'], name='receipt_blob_unreferenced_idx'),
+        ),
+        migrations.RunPython(countReceiptReferences, migrations.RunPython.noop),
+    ]
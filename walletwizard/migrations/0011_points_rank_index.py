@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0010_receipt_blobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='points',
+            index=models.Index(fields=['-count', 'id'], name='points_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.5 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('walletwizard', '0011_points_rank_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='points',
+            name='rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
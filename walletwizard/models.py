@@ -3,8 +3,12 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.core.validators import MinValueValidator
-from libgravatar import Gravatar
-from .helpers.modelHelpers import computeTotalSpendingLimitByMonth, computeTotalSpentInTimePeriod
+from django.db.models.functions import Lower
+from .helpers.modelHelpers import computeTotalSpendingLimitByMonth
+from .helpers.dashboardHelpers import DashboardSummary
+from .helpers.avatarHelpers import GRAVATAR_SIZE, MINI_GRAVATAR_SIZE, getGravatarUrl
+from .storage.receiptStorage import receiptStorage
+from .helpers.spendingHelpers import computeTotalSpentInTimePeriod, computeTotalSpent, getTimePeriodStartAndEnd
 from datetime import datetime
 from django.utils import timezone
 from decimal import Decimal
@@ -39,7 +43,11 @@ class Expenditure(models.Model):
     description = models.CharField(max_length=250, blank=True)
     amount = models.DecimalField(max_digits=10, validators=[MinValueValidator(0.01)], decimal_places=2)
     date = models.DateField()
-    receipt = models.ImageField(upload_to='receipts/', blank=True, null=True)
+    receipt = models.ImageField(upload_to='receipts/', storage=receiptStorage, blank=True, null=True)
+    # Filled in by the receipt pipeline once the upload has been processed
+    receiptThumbnail = models.ImageField(upload_to='receipts/thumbnails/', storage=receiptStorage, blank=True, null=True, editable=False)
+    receiptWeb = models.ImageField(upload_to='receipts/web/', storage=receiptStorage, blank=True, null=True, editable=False)
+    receiptHash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
@@ -62,11 +70,12 @@ class Category(models.Model):
     updatedAt = models.DateTimeField(auto_now=True)
 
     def progressAsPercentage(self):
-        total = computeTotalSpentInTimePeriod(self.spendingLimit.timePeriod, self.expenditures)
-        return round(100*total/float(self.spendingLimit.amount), 2)
+        total = computeTotalSpentInTimePeriod(self.spendingLimit.timePeriod, self.dailySpendings, 'total')
+        return round(100*total/self.spendingLimit.amount, 2)
     
     def totalSpentInTimePeriod(self):
-        return Decimal(round(computeTotalSpentInTimePeriod(self.spendingLimit.timePeriod, self.expenditures), 2))
+        # summed from the daily spending rollup, whose (category, date) constraint indexes exactly this range
+        return round(computeTotalSpentInTimePeriod(self.spendingLimit.timePeriod, self.dailySpendings, 'total'), 2)
 
     def totalSpendingLimitByMonth(self):
         return Decimal(round(computeTotalSpendingLimitByMonth(self.spendingLimit.timePeriod, self.spendingLimit.amount), 2))
@@ -74,6 +83,24 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class CategoryDailySpending(models.Model):
+    '''Model for storing the total amount and number of expenditures of a category on a single day.'''
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='dailySpendings')
+    date = models.DateField()
+    total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        '''Model options.'''
+
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'date'], name='unique_category_daily_spending')
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f'{self.category}, {self.date}: £{self.total}'
+
 class House(models.Model):
     '''Model for storing and managing houses.'''
     points = models.IntegerField(default=0)
@@ -100,57 +127,54 @@ class User(AbstractUser):
     lastLogin = models.DateTimeField(default=timezone.now)
     house = models.ForeignKey(House, on_delete=models.CASCADE, blank=True, null=True)
     overallSpendingLimit = models.ForeignKey(SpendingLimit, on_delete=models.CASCADE, blank=True, null=True)
+    # computed from the email when the user is saved, so rendering a gravatar does no hashing
+    gravatarUrl = models.CharField(max_length=200, blank=True, editable=False)
+    miniGravatarUrl = models.CharField(max_length=200, blank=True, editable=False)
+    # kept up to date by the follow helpers whenever followers are added or removed
+    followersCount = models.IntegerField(default=0, editable=False)
+    followeesCount = models.IntegerField(default=0, editable=False)
     
     class Meta:
         '''Model options.'''
 
         ordering = ['username']
+        indexes = [
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+        ]
 
     def fullName(self):
         return f'{self.firstName} {self.lastName}'
     
-    def gravatar(self, size=120):
+    def gravatar(self, size=GRAVATAR_SIZE):
         '''Return a URL to the user's gravatar'''
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        if size == GRAVATAR_SIZE and self.gravatarUrl:
+            return self.gravatarUrl
+        return getGravatarUrl(self.email, size)
 
     def miniGravatar(self):
         '''Return a URL to a miniature version of the user's gravatar.'''
-        return self.gravatar(size=60)
+        return self.miniGravatarUrl or getGravatarUrl(self.email, MINI_GRAVATAR_SIZE)
 
     def isFollowing(self, user):
         '''Returns whether self follows the given user.'''
-        return user in self.followees.all()
+        return User.followers.through.objects.filter(from_user=user, to_user=self).exists()
 
     def followerCount(self):
         '''Return the number of followers of self.'''
-        return self.followers.count()
+        return self.followersCount
 
     def followeeCount(self):
         '''Return the number of followees of self.'''
-        return self.followees.count()
+        return self.followeesCount
 
     def progressAsPercentage(self):
         '''Return the user's total category progress as a percentage.'''
-        limit = 0.0
-        total = 0.0
-        for category in self.categories.all():
-            limit += float(category.spendingLimit.amount)
-            total += computeTotalSpentInTimePeriod(category.spendingLimit.timePeriod, category.expenditures)
-        if limit == 0:
-            return 0.00
-        else:
-            return round(100 * total/limit, 2)
+        return DashboardSummary(self).progressAsPercentage()
     
     def totalSpentThisMonth(self):
         '''Return the total amount spent by the user this month.'''
-        total = 0.0
-        today = datetime.now()
-        for category in self.categories.all():
-            for expense in category.expenditures.filter(date__month=today.month):
-                total += float(expense.amount)
-        return round(total, 2)
+        dailySpendings = CategoryDailySpending.objects.filter(category__in=self.categories.all())
+        return round(computeTotalSpent(dailySpendings, *getTimePeriodStartAndEnd('monthly'), 'total'), 2)
 
 class Notification(models.Model):
     '''Model for storing and managing user notifications.'''
@@ -170,6 +194,13 @@ class Notification(models.Model):
         '''Model options.'''
 
         ordering = ['-createdAt']
+        indexes = [
+            # one index per list (the id breaks ties between notifications created at the same time),
+            # so the keyset pages of the notifications page are read straight from an index. They are
+            # partial because the boolean is filtered as a bare column, which a plain index cannot serve
+            models.Index(fields=['toUser', '-createdAt', '-id'], name='notification_unread_keyset_idx', condition=models.Q(isSeen=False)),
+            models.Index(fields=['toUser', '-createdAt', '-id'], name='notification_read_keyset_idx', condition=models.Q(isSeen=True)),
+        ]
 
     def __str__(self):
         return self.message
@@ -187,8 +218,65 @@ class Points(models.Model):
     '''Model for storing and managing user points.'''
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    # the position in the leaderboard when the ranks were last refreshed, None until then
+    rank = models.PositiveIntegerField(blank=True, null=True)
     
     class Meta:
         '''Model options.'''
 
-        ordering = ['-count']
\ No newline at end of file
+        ordering = ['-count']
+        indexes = [
+            # the leaderboard order, read from a cursor onwards and by the rank refresh
+            models.Index(fields=['-count', 'id'], name='points_rank_idx'),
+        ]
+
+class PointsLedgerEntry(models.Model):
+    '''Model for storing every change in a user's points, appended once per award or penalty.'''
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    house = models.ForeignKey(House, on_delete=models.CASCADE, blank=True, null=True, related_name='pointsLedgerEntries')
+    amount = models.IntegerField()
+    isCompacted = models.BooleanField(default=False)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        '''Model options.'''
+
+        ordering = ['-createdAt']
+        indexes = [
+            models.Index(fields=['house'], name='points_ledger_pending_idx', condition=models.Q(isCompacted=False)),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.amount} points'
+
+class ReceiptJob(models.Model):
+    '''Model for queueing an uploaded receipt to be processed outside of the request.'''
+    expenditure = models.ForeignKey(Expenditure, on_delete=models.CASCADE, related_name='receiptJobs')
+    attempts = models.PositiveIntegerField(default=0)
+    lastError = models.CharField(max_length=250, blank=True)
+    claimedAt = models.DateTimeField(blank=True, null=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        '''Model options.'''
+
+        ordering = ['createdAt']
+
+    def __str__(self):
+        return f'Receipt of {self.expenditure}'
+
+class ReceiptBlob(models.Model):
+    '''Model for counting the expenditures that refer to each stored receipt file.'''
+    name = models.CharField(max_length=100, unique=True)
+    referenceCount = models.IntegerField(default=0)
+    unreferencedAt = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        '''Model options.'''
+
+        indexes = [
+            models.Index(fields=['unreferencedAt'], name='receipt_blob_unreferenced_idx', condition=models.Q(referenceCount__lte=0)),
+        ]
+
+    def __str__(self):
+        return f'{self.name}: {self.referenceCount} references'
@@ -0,0 +1,41 @@
+import hashlib
+import posixpath
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+def getContentHash(file):
+    '''Return the SHA-256 of the file's content, read in chunks so large scans are never loaded whole.'''
+    digest = hashlib.sha256()
+    for chunk in file.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    '''File system storage naming every file after the SHA-256 of its content, so identical
+    uploads (from the same user or not) are stored once. Files are shared, so they must only be
+    deleted once nothing refers to them, which is left to the receipt collector.'''
+
+    def _save(self, name, content):
+        contentHash = getContentHash(content)
+        directory, fileName = posixpath.split(name)
+        extension = posixpath.splitext(fileName)[1].lower()
+        # sharded by the first two characters so no directory grows too large
+        name = posixpath.join(directory, contentHash[:2], f'{contentHash}{extension}')
+        self.claimFile(name)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+    def claimFile(self, name):
+        '''Restart the grace period of the file if nothing refers to it, so the collector keeps it
+        for the upload about to reuse it. The update waits for a collector holding the row, so a
+        file being deleted is gone by the time its existence is checked and is written again.'''
+        # imported here as the models import this module for their fields
+        from walletwizard.models import ReceiptBlob
+        ReceiptBlob.objects.filter(name=name, referenceCount__lte=0).update(unreferencedAt=timezone.now())
+
+receiptStorage = ContentAddressedStorage()
@@ -0,0 +1,68 @@
+'''Query count benchmarks for the pages of the app.'''
+from django.core.cache import cache
+from django.test import Client, TestCase
+from walletwizard.models import User
+from walletwizard.helpers.benchmarkHelpers import *
+
+class UrlBenchmarksTest(TestCase):
+    '''Drives every page at a small and a large data size and compares their query counts.'''
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+    # pages whose query count is known to grow with the data, mapped to the most queries they may
+    # run with the large data set, remove a page once it is fixed
+    KNOWN_GROWING_URLS = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        # seeded and measured once for the class, the tests only read the results
+        cache.clear()
+        user = User.objects.get(id=1)
+        client = Client()
+        client.force_login(user)
+        seedBenchmarkData(user, **BENCHMARK_SIZES['small'])
+        cls.small = benchmarkUrls(client, user)
+        seedBenchmarkData(user, **BENCHMARK_SIZES['large'])
+        cls.large = benchmarkUrls(client, user)
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.client.force_login(self.user)
+
+    def testEveryPageLoads(self):
+        for name, result in self.large.items():
+            with self.subTest(url=name):
+                self.assertEqual(result['status'], 200)
+
+    def testReportsArePostedWithAValidForm(self):
+        name, url, postData = next(entry for entry in getBenchmarkUrls(self.user) if entry[0] == 'reportsPost')
+        response = self.client.post(url, postData)
+        self.assertEqual(len(postData['selectedCategory']), BENCHMARK_SIZES['large']['categoriesPerUser'])
+        self.assertContains(response, 'An overview of your spending within the last month.')
+
+    def testQueryCountsDoNotGrowWithDataSize(self):
+        for name in self.small:
+            with self.subTest(url=name):
+                if name in UrlBenchmarksTest.KNOWN_GROWING_URLS:
+                    maxQueries = UrlBenchmarksTest.KNOWN_GROWING_URLS[name]
+                    self.assertLessEqual(
+                        self.large[name]['queries'], maxQueries,
+                        f"{name} ran {self.large[name]['queries']} queries with the large data set, over its bound of {maxQueries}"
+                    )
+                    continue
+                self.assertLessEqual(
+                    self.large[name]['queries'], self.small[name]['queries'],
+                    f"{name} ran {self.small[name]['queries']} queries with the small data set and "
+                    f"{self.large[name]['queries']} with the large one"
+                )
+
+    def testKnownGrowingUrlsStillGrow(self):
+        for name in UrlBenchmarksTest.KNOWN_GROWING_URLS:
+            with self.subTest(url=name):
+                self.assertGreater(self.large[name]['queries'], self.small[name]['queries'])
+
+    def testTimingsAreRecorded(self):
+        for name, result in self.large.items():
+            with self.subTest(url=name):
+                self.assertGreater(result['wallTime'], 0)
+                self.assertGreater(result['sqlTime'], 0)
+                self.assertLessEqual(result['sqlTime'], result['wallTime'])
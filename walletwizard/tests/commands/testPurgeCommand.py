@@ -0,0 +1,109 @@
+'''Tests for the purge management command.'''
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from walletwizard.helpers.notificationsHelpers import getCachedNotificationSummary
+from walletwizard.models import *
+
+class PurgeCommandTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.house = House.objects.get(id=1)
+        self.seededUser = User.objects.create_user(
+            username='seededuser',
+            email='seeded.user@example.org',
+            firstName='Seeded',
+            lastName='User',
+            password='Password123',
+            house=self.house,
+        )
+        Points.objects.create(user=self.seededUser, count=40)
+        House.objects.filter(id=self.house.id).update(points=100, memberCount=3)
+        self.seededCategory = Category.objects.create(
+            name='seeded', spendingLimit=SpendingLimit.objects.create(amount=100, timePeriod='weekly')
+        )
+        self.seededCategory.users.add(self.seededUser)
+        self.seededUser.categories.add(self.seededCategory)
+        self.seededExpenditure = Expenditure.objects.create(title='seeded', amount=Decimal('5.00'), date=date.today())
+        self.seededCategory.expenditures.add(self.seededExpenditure)
+        self.seededUser.followers.add(self.user)
+        ShareCategoryNotification.objects.create(
+            toUser=self.user, fromUser=self.seededUser, sharedCategory=self.seededCategory,
+            title='shared', message='shared', type='category',
+        )
+
+    def testPurgeSeededOnlyKeepsOtherUsers(self):
+        notificationsBefore = Notification.objects.filter(toUser=self.user).count()
+        self._purge('--seeded-only')
+        self.assertFalse(User.objects.filter(id=self.seededUser.id).exists())
+        self.assertFalse(Category.objects.filter(id=self.seededCategory.id).exists())
+        self.assertFalse(Expenditure.objects.filter(id=self.seededExpenditure.id).exists())
+        self.assertFalse(CategoryDailySpending.objects.filter(category_id=self.seededCategory.id).exists())
+        self.assertTrue(User.objects.filter(id=self.user.id).exists())
+        self.assertEqual(Notification.objects.filter(toUser=self.user).count(), notificationsBefore - 1)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.points, 60)
+        self.assertEqual(self.house.memberCount, 2)
+
+    def testPurgeBeforeDeletesOnlyOlderData(self):
+        old = Expenditure.objects.create(title='old', amount=Decimal('5.00'), date=date.today() - timedelta(days=30))
+        self.seededCategory.expenditures.add(old)
+        self._purge('--before', (date.today() - timedelta(days=1)).isoformat())
+        self.assertFalse(Expenditure.objects.filter(id=old.id).exists())
+        self.assertTrue(Expenditure.objects.filter(id=self.seededExpenditure.id).exists())
+        self.assertFalse(CategoryDailySpending.objects.filter(date=old.date).exists())
+        self.assertTrue(CategoryDailySpending.objects.filter(date=self.seededExpenditure.date).exists())
+
+    def testPurgeDeletesTheReceiptJobsOfPurgedExpenditures(self):
+        old = Expenditure.objects.create(title='old', amount=Decimal('5.00'), date=date.today() - timedelta(days=30))
+        self.seededCategory.expenditures.add(old)
+        oldJob = ReceiptJob.objects.create(expenditure=old, attempts=3, lastError='broken')
+        currentJob = ReceiptJob.objects.create(expenditure=self.seededExpenditure)
+        self._purge('--before', (date.today() - timedelta(days=1)).isoformat())
+        self.assertFalse(ReceiptJob.objects.filter(id=oldJob.id).exists())
+        self.assertTrue(ReceiptJob.objects.filter(id=currentJob.id).exists())
+        self._purge('--seeded-only')
+        self.assertFalse(ReceiptJob.objects.exists())
+
+    def testPurgeReleasesTheReceiptFilesOfPurgedExpenditures(self):
+        old = Expenditure.objects.create(title='old', amount=Decimal('5.00'), date=date.today() - timedelta(days=30))
+        self.seededCategory.expenditures.add(old)
+        ReceiptBlob.objects.create(name='receipts/ab/shared.jpg', referenceCount=2)
+        ReceiptBlob.objects.create(name='receipts/ab/thumbnail.jpg', referenceCount=1)
+        Expenditure.objects.filter(id__in=[old.id, self.seededExpenditure.id]).update(receipt='receipts/ab/shared.jpg')
+        Expenditure.objects.filter(id=old.id).update(receiptThumbnail='receipts/ab/thumbnail.jpg')
+        self._purge('--before', (date.today() - timedelta(days=1)).isoformat())
+        self.assertEqual(ReceiptBlob.objects.get(name='receipts/ab/shared.jpg').referenceCount, 1)
+        thumbnail = ReceiptBlob.objects.get(name='receipts/ab/thumbnail.jpg')
+        self.assertEqual(thumbnail.referenceCount, 0)
+        self.assertIsNotNone(thumbnail.unreferencedAt)
+        self._purge('--seeded-only')
+        self.assertEqual(ReceiptBlob.objects.get(name='receipts/ab/shared.jpg').referenceCount, 0)
+
+    def testPurgeEverythingResetsHouses(self):
+        ReceiptJob.objects.create(expenditure=self.seededExpenditure)
+        ReceiptBlob.objects.create(name='receipts/ab/abc.jpg', referenceCount=1)
+        self._purge()
+        self.assertFalse(ReceiptJob.objects.exists())
+        self.assertFalse(ReceiptBlob.objects.exists())
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Expenditure.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertFalse(House.objects.exclude(points=0, memberCount=0).exists())
+
+    def testPurgeClearsTheCachedNotificationFigures(self):
+        unreadBefore = getCachedNotificationSummary(self.user)['unreadNotificationCount']
+        self._purge('--seeded-only')
+        self.assertEqual(getCachedNotificationSummary(self.user)['unreadNotificationCount'], unreadBefore - 1)
+
+    def _purge(self, *args):
+        call_command('purge', *args, stdout=StringIO())
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('PRAGMA foreign_key_check')
+                self.assertEqual(cursor.fetchall(), [])
@@ -0,0 +1,45 @@
+'''Tests for the follow helper functions.'''
+from django.test import TestCase
+from walletwizard.models import User
+from walletwizard.helpers.followHelpers import *
+from walletwizard.tests.testHelpers import createUsers
+
+class FollowHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.others = createUsers(4)
+
+    def testFollowAndUnfollowUpdateCounts(self):
+        follow(self.user, self.others[0])
+        follow(self.user, self.others[1])
+        unfollow(self.user, self.others[1])
+        self.user.refresh_from_db()
+        self.others[0].refresh_from_db()
+        self.others[1].refresh_from_db()
+        self.assertEqual(self.user.followeeCount(), 1)
+        self.assertEqual(self.others[0].followerCount(), 1)
+        self.assertEqual(self.others[1].followerCount(), 0)
+        self.assertTrue(self.user.isFollowing(self.others[0]))
+        self.assertFalse(self.user.isFollowing(self.others[1]))
+
+    def testGetFollowedUserIdsRunsOneQuery(self):
+        follow(self.user, self.others[0])
+        follow(self.user, self.others[2])
+        # a follow the other way round is not counted
+        follow(self.others[1], self.user)
+        with self.assertNumQueries(1):
+            followedIds = getFollowedUserIds(self.user, self.others)
+        self.assertEqual(followedIds, {self.others[0].id, self.others[2].id})
+        self.assertEqual(getFollowedUserIds(self.user, [self.others[2].id]), {self.others[2].id})
+
+    def testRefreshFollowCountsRecountsBulkChanges(self):
+        UserFollower.objects.bulk_create([
+            UserFollower(from_user_id=other.id, to_user_id=self.user.id) for other in self.others
+        ])
+        refreshFollowCounts()
+        self.user.refresh_from_db()
+        self.others[3].refresh_from_db()
+        self.assertEqual(self.user.followeeCount(), 4)
+        self.assertEqual(self.others[3].followerCount(), 1)
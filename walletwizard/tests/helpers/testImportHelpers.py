@@ -0,0 +1,88 @@
+'''Tests for the expenditure import helper functions.'''
+from io import StringIO
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from walletwizard.models import User, Category, CategoryDailySpending, Expenditure, Notification
+from walletwizard.helpers.importHelpers import *
+
+OFX_STATEMENT = '''OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20220105120000<TRNAMT>-12.50<NAME>Coffee shop<MEMO>Flat white
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20220106<TRNAMT>100.00<NAME>Salary
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20220107<TRNAMT>-3.20<NAME>Bus
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+'''
+
+class ImportHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.category = Category.objects.get(id=1)
+
+    def testGetImportFormat(self):
+        self.assertEqual(getImportFormat('statement.CSV'), 'csv')
+        self.assertEqual(getImportFormat('statement.qfx'), 'ofx')
+        self.assertIsNone(getImportFormat('statement.pdf'))
+
+    def testParseCsvRows(self):
+        rows = list(parseCsvRows(StringIO('Title,Amount,Date\nlunch,4.50,2022-01-02\n')))
+        self.assertEqual(rows, [{'title': 'lunch', 'description': '', 'amount': '4.50', 'date': '2022-01-02'}])
+
+    def testParseOfxRowsSkipsCredits(self):
+        rows = list(parseOfxRows(StringIO(OFX_STATEMENT)))
+        self.assertEqual([row['title'] for row in rows], ['Coffee shop', 'Bus'])
+        self.assertEqual(rows[0]['amount'], '12.50')
+        self.assertEqual(rows[0]['date'], '2022-01-05')
+        self.assertEqual(rows[0]['description'], 'Flat white')
+
+    def testImportCreatesValidRowsAndReportsInvalidOnes(self):
+        rows = parseCsvRows(StringIO('title,amount,date\nlunch,4.50,2022-01-02\n,1.00,2022-01-02\nbus,-2,2022-01-03\ndinner,10.00,2022-01-02\n'))
+        result = importExpenditures(self.user, self.category, rows)
+        self.assertEqual(result.createdCount, 2)
+        self.assertEqual([rowNumber for rowNumber, error in result.errors], [2, 3])
+        imported = self.category.expenditures.filter(date=date(2022, 1, 2))
+        self.assertEqual(sorted(imported.values_list('title', flat=True)), ['dinner', 'lunch'])
+        rollup = CategoryDailySpending.objects.get(category=self.category, date=date(2022, 1, 2))
+        self.assertEqual(rollup.total, Decimal('14.50'))
+
+    def testImportQueryCountDoesNotGrowWithRows(self):
+        # the first import also loads the category's spending limit
+        self._countImportQueries(1)
+        # both sizes fit in a single bulk insert batch on SQLite (999 variables per query)
+        self.assertEqual(self._countImportQueries(10), self._countImportQueries(90))
+
+    def testImportAwardsPointsOnce(self):
+        self.category.spendingLimit.amount = Decimal(100000)
+        self.category.spendingLimit.save()
+        today = date.today().isoformat()
+        notificationsBefore = Notification.objects.filter(toUser=self.user, title='Points Won!').count()
+        rows = [{'title': f'row{i}', 'description': '', 'amount': '0.50', 'date': today} for i in range(20)]
+        importExpenditures(self.user, self.category, rows)
+        self.assertEqual(Notification.objects.filter(toUser=self.user, title='Points Won!').count(), notificationsBefore + 1)
+
+    def testImportLinksOnlyTheRowsItInserted(self):
+        bulkCreate = Expenditure.objects.bulk_create
+        def bulkCreateWithConcurrentInsert(objs, *args, **kwargs):
+            created = bulkCreate(objs, *args, **kwargs)
+            # a row inserted by another request right after the import's own
+            Expenditure.objects.create(title='concurrent', amount=Decimal(1), date=date(2022, 1, 2))
+            return created
+        rows = [{'title': f'row{i}', 'description': '', 'amount': '1.00', 'date': '2022-01-02'} for i in range(3)]
+        with mock.patch.object(Expenditure.objects, 'bulk_create', side_effect=bulkCreateWithConcurrentInsert):
+            importExpenditures(self.user, self.category, rows)
+        imported = self.category.expenditures.filter(date=date(2022, 1, 2))
+        self.assertEqual(sorted(imported.values_list('title', flat=True)), ['row0', 'row1', 'row2'])
+
+    def _countImportQueries(self, rowCount):
+        rows = [{'title': f'row{i}', 'description': '', 'amount': '1.00', 'date': '2020-01-01'} for i in range(rowCount)]
+        with CaptureQueriesContext(connection) as context:
+            result = importExpenditures(self.user, self.category, rows)
+        self.assertEqual(result.createdCount, rowCount)
+        return len(context.captured_queries)
@@ -0,0 +1,56 @@
+'''Unit tests for the category limit budget of a user.'''
+from decimal import Decimal
+from django.test import TestCase
+from walletwizard.forms import OverallSpendingForm
+from walletwizard.helpers.limitBudgetHelpers import getCategoryLimitBudget
+from walletwizard.models import User, Category, SpendingLimit
+
+class LimitBudgetHelpersTest(TestCase):
+    '''Unit tests for the category limit budget of a user.'''
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        Category.objects.filter(users=self.user).delete()
+        self.otherUser = User.objects.create_user(
+            username='janedoe', email='janedoe@example.org', firstName='Jane', lastName='Doe', password='Password123'
+        )
+
+    def _createCategory(self, name, timePeriod, amount, users):
+        spendingLimit = SpendingLimit.objects.create(timePeriod=timePeriod, amount=Decimal(amount))
+        category = Category.objects.create(name=name, spendingLimit=spendingLimit)
+        category.users.add(*users)
+        return category
+
+    def testBudgetIsTheSumOfTheMonthlyLimits(self):
+        self._createCategory('Food', 'yearly', 120, [self.user])
+        self._createCategory('Travel', 'weekly', 10, [self.user])
+        self._createCategory('Rent', 'monthly', 500, [self.otherUser])
+        self.assertEqual(getCategoryLimitBudget(self.user), Decimal('53.48'))
+        self.assertEqual(getCategoryLimitBudget(self.otherUser), Decimal('500.00'))
+
+    def testBudgetCostsOneQueryHoweverManyCategories(self):
+        self._createCategory('Food', 'daily', 1, [self.user])
+        with self.assertNumQueries(1):
+            getCategoryLimitBudget(self.user)
+        for i in range(20):
+            self._createCategory(f'Category {i}', ['daily', 'weekly', 'monthly', 'yearly'][i % 4], 1, [self.user])
+        with self.assertNumQueries(1):
+            getCategoryLimitBudget(self.user)
+
+    def testOverallSpendingFormIsValidatedAgainstTheBudget(self):
+        self._createCategory('Food', 'monthly', 100, [self.user])
+        form = OverallSpendingForm(data={'timePeriod': 'monthly', 'amount': 99}, user=self.user)
+        self.assertFalse(form.is_valid())
+        form = OverallSpendingForm(data={'timePeriod': 'monthly', 'amount': 100}, user=self.user)
+        self.assertTrue(form.is_valid())
+
+
+    def testValidationSeesAChangedLimitAtOnce(self):
+        category = self._createCategory('Food', 'monthly', 100, [self.user])
+        OverallSpendingForm(data={'timePeriod': 'monthly', 'amount': 100}, user=self.user).is_valid()
+        category.spendingLimit.amount = Decimal(200)
+        category.spendingLimit.save()
+        form = OverallSpendingForm(data={'timePeriod': 'monthly', 'amount': 100}, user=self.user)
+        self.assertFalse(form.is_valid())
@@ -1,8 +1,10 @@
 ''''Tests for creating differnt types of notifcations functions'''
 
-from walletwizard.models import User, Notification, Category
+from walletwizard.models import User, Notification, Category, House, ShareCategoryNotification, FollowRequestNotification
 from django.test import TestCase
+from django.core.cache import cache
 from walletwizard.helpers.notificationsHelpers import *
+from walletwizard.helpers.pointsHelpers import updateUserPoints
 
 class NotificationHelperTest(TestCase):
     fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
@@ -19,6 +21,7 @@ class NotificationHelperTest(TestCase):
         )
         self.title = "Test Title"
         self.message = 'Test Message'
+        cache.clear()
 
     def testNewNotificationIsCreated(self):
         userNotificationBefore = Notification.objects.filter(toUser=self.user).count()
@@ -49,4 +52,84 @@ class NotificationHelperTest(TestCase):
         fromUser = self.secondUser
         createShareCategoryNotification(toUser, self.title, self.message, category, fromUser)
         userNotificationAfter = Notification.objects.filter(toUser=self.user).count()
-        self.assertEqual(userNotificationAfter, userNotificationBefore+1)
\ No newline at end of file
+        self.assertEqual(userNotificationAfter, userNotificationBefore+1)
+
+    def testNotificationSummaryIsCached(self):
+        summary = getCachedNotificationSummary(self.user)
+        unreadNotifications = Notification.objects.filter(toUser=self.user, isSeen=False)
+        self.assertEqual(summary['unreadNotificationCount'], unreadNotifications.count())
+        self.assertEqual(summary['latestNotifications'], list(unreadNotifications[:3]))
+        with self.assertNumQueries(0):
+            self.assertEqual(getCachedNotificationSummary(self.user), summary)
+
+    def testCreatingNotificationsClearsCache(self):
+        category = Category.objects.get(id=1)
+        countBefore = getCachedNotificationSummary(self.user)['unreadNotificationCount']
+        with self.captureOnCommitCallbacks(execute=True):
+            createBasicNotification(self.user, self.title, self.message)
+            createFollowRequestNotification(self.user, self.title, self.message, self.secondUser)
+            createShareCategoryNotification(self.user, self.title, self.message, category, self.secondUser)
+        self.assertEqual(getCachedNotificationSummary(self.user)['unreadNotificationCount'], countBefore+3)
+
+    def testCacheIsClearedOnlyOnceNotificationsAreCommitted(self):
+        countBefore = getCachedNotificationSummary(self.user)['unreadNotificationCount']
+        with self.captureOnCommitCallbacks() as callbacks:
+            createBasicNotification(self.user, self.title, self.message)
+            self.assertEqual(getCachedNotificationSummary(self.user)['unreadNotificationCount'], countBefore)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(getCachedNotificationSummary(self.user)['unreadNotificationCount'], countBefore+1)
+
+    def testHousePointsAreBroadcastToEveryMember(self):
+        house = self.user.house
+        member = User.objects.create_user(
+            username='member', email='member@example.org', firstName='Member', lastName='Doe', password='Password123', house=house
+        )
+        updateUserPoints(self.user, 5)
+        for toUser in [self.user, member]:
+            self.assertTrue(Notification.objects.filter(toUser=toUser, title='House points gained!').exists())
+
+    def testDispatcherWritesNotificationsAtTheEnd(self):
+        category = Category.objects.get(id=1)
+        countBefore = Notification.objects.filter(toUser=self.user).count()
+        with notificationDispatcher():
+            createBasicNotification(self.user, self.title, self.message)
+            createFollowRequestNotification(self.user, self.title, self.message, self.secondUser)
+            createShareCategoryNotification(self.user, self.title, self.message, category, self.secondUser)
+            self.assertEqual(Notification.objects.filter(toUser=self.user).count(), countBefore)
+        self.assertEqual(Notification.objects.filter(toUser=self.user).count(), countBefore+3)
+        self.assertEqual(FollowRequestNotification.objects.filter(toUser=self.user, fromUser=self.secondUser).count(), 1)
+        self.assertEqual(ShareCategoryNotification.objects.get(toUser=self.user, fromUser=self.secondUser).sharedCategory, category)
+
+    def testDispatcherWritesNothingIfBlockRaises(self):
+        countBefore = Notification.objects.count()
+        with self.assertRaises(ValueError):
+            with notificationDispatcher():
+                createBasicNotification(self.user, self.title, self.message)
+                raise ValueError()
+        self.assertEqual(Notification.objects.count(), countBefore)
+
+    def testDispatcherBulkCreatesBasicNotifications(self):
+        with self.assertNumQueries(3):
+            # savepoint, one bulk insert, savepoint release
+            with notificationDispatcher():
+                for i in range(10):
+                    createBasicNotification(self.user, self.title, self.message)
+        self.assertEqual(Notification.objects.filter(toUser=self.user, title=self.title).count(), 10)
+
+    def testBroadcastToHouseMembers(self):
+        house = House.objects.get(id=1)
+        for i in range(5):
+            User.objects.create_user(
+                username=f'member{i}',
+                email=f'member{i}@example.org',
+                firstName='Member',
+                lastName='Doe',
+                password='Password123',
+                house=house,
+            )
+        members = house.user_set.all()
+        with self.assertNumQueries(4):
+            broadcastBasicNotification(members, self.title, self.message)
+        for member in members:
+            self.assertTrue(Notification.objects.filter(toUser=member, title=self.title).exists())
@@ -0,0 +1,49 @@
+"""Unit tests for the keyset pagination helpers."""
+from django.test import TestCase
+from walletwizard.helpers.paginationHelpers import encodeCursor, decodeCursor, getKeysetPage
+from walletwizard.models import User, Notification
+
+class PaginationHelpersTest(TestCase):
+    """Unit tests for the keyset pagination helpers."""
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        Notification.objects.filter(toUser=self.user).delete()
+        for i in range(7):
+            Notification.objects.create(toUser=self.user, title='test'+str(i), message='test message', type='basic')
+        self.notifications = Notification.objects.filter(toUser=self.user)
+        self.newestFirst = list(self.notifications.order_by('-createdAt', '-id'))
+
+    def testCursorRoundTrips(self):
+        notification = self.newestFirst[0]
+        self.assertEqual(decodeCursor(encodeCursor(notification)), (notification.createdAt, notification.id))
+
+    def testDecodeCursorRejectsMalformedCursors(self):
+        for cursor in ['', 'abc', '1-x', '1-2-3', '9' * 30 + '-1', '1-' + '9' * 30]:
+            with self.assertRaises(ValueError):
+                decodeCursor(cursor)
+
+    def testFirstPage(self):
+        page = getKeysetPage(self.notifications, 3)
+        self.assertEqual(list(page), self.newestFirst[:3])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def testPagesAfterAndBeforeCursor(self):
+        secondPage = getKeysetPage(self.notifications, 3, after=getKeysetPage(self.notifications, 3).nextCursor)
+        self.assertEqual(list(secondPage), self.newestFirst[3:6])
+        lastPage = getKeysetPage(self.notifications, 3, after=secondPage.nextCursor)
+        self.assertEqual(list(lastPage), self.newestFirst[6:])
+        self.assertFalse(lastPage.has_next())
+        self.assertEqual(list(getKeysetPage(self.notifications, 3, before=lastPage.previousCursor)), self.newestFirst[3:6])
+        firstPage = getKeysetPage(self.notifications, 3, before=secondPage.previousCursor)
+        self.assertEqual(list(firstPage), self.newestFirst[:3])
+        self.assertFalse(firstPage.has_previous())
+
+    def testEmptyQueryset(self):
+        page = getKeysetPage(Notification.objects.none(), 3)
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next())
+        self.assertFalse(page.has_previous())
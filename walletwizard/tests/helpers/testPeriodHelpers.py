@@ -0,0 +1,46 @@
+"""Unit tests for the time period conversion helpers."""
+from decimal import Decimal
+from django.test import TestCase
+from walletwizard.helpers.periodHelpers import PERIODS, CONVERSION_MATRIX, getPeriod, convertAmount, convertAmounts
+from walletwizard.helpers.modelHelpers import computeTotalSpendingLimitByMonth
+
+class PeriodHelpersTest(TestCase):
+    """Unit tests for the time period conversion helpers."""
+
+    def testConversionsAgreeWithEachOther(self):
+        for fromPeriod in PERIODS:
+            self.assertEqual(CONVERSION_MATRIX[fromPeriod][fromPeriod], 1)
+            for viaPeriod in PERIODS:
+                for toPeriod in PERIODS:
+                    self.assertEqual(
+                        CONVERSION_MATRIX[fromPeriod][viaPeriod] * CONVERSION_MATRIX[viaPeriod][toPeriod],
+                        CONVERSION_MATRIX[fromPeriod][toPeriod]
+                    )
+
+    def testMonthIsAnAverageGregorianMonth(self):
+        self.assertEqual(convertAmount(Decimal(1), 'monthly', 'daily') * Decimal('30.436875'), Decimal(1))
+        self.assertEqual(convertAmount(Decimal(12), 'yearly', 'monthly'), Decimal(1))
+        self.assertEqual(convertAmount(Decimal(1), 'weekly', 'monthly'), Decimal('4.348125'))
+
+    def testAmountsConvertThereAndBack(self):
+        amount = Decimal('123.45')
+        for fromPeriod in PERIODS:
+            for toPeriod in PERIODS:
+                converted = convertAmount(amount, fromPeriod, toPeriod)
+                self.assertAlmostEqual(convertAmount(converted, toPeriod, fromPeriod), amount, places=20)
+
+    def testAmountsOfDifferentPeriodsConvertTogether(self):
+        amounts = [Decimal(10), Decimal(70), Decimal(12)]
+        converted = convertAmounts(amounts, ['daily', 'weekly', 'yearly'], 'monthly')
+        self.assertEqual(converted, [convertAmount(amount, period, 'monthly') for amount, period in zip(amounts, ['daily', 'weekly', 'yearly'])])
+        self.assertEqual(converted[2], Decimal(1))
+
+    def testReportTimeFramesNameTheSamePeriods(self):
+        self.assertEqual(getPeriod('week'), 'weekly')
+        self.assertEqual(convertAmount(Decimal(7), 'weekly', 'day'), Decimal(1))
+
+    def testUnknownPeriodIsRejected(self):
+        with self.assertRaises(ValueError):
+            convertAmount(Decimal(1), 'fortnightly', 'monthly')
+        self.assertEqual(computeTotalSpendingLimitByMonth('fortnightly', Decimal(1)), Decimal(0))
+
@@ -0,0 +1,82 @@
+'''Tests for the points and house points helper functions.'''
+from unittest import mock
+from django.test import TestCase
+from walletwizard.models import User, Points, House, PointsLedgerEntry
+from walletwizard.helpers.pointsHelpers import *
+
+class PointsHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.house = self.user.house
+        self.points = Points.objects.get(user=self.user)
+
+    def testUpdateUserPointsIncrementsBalance(self):
+        countBefore = self.points.count
+        updateUserPoints(self.user, 5)
+        self.points.refresh_from_db()
+        self.assertEqual(self.points.count, countBefore + 5)
+
+    def testUpdateUserPointsClampsAtZero(self):
+        updateUserPoints(self.user, -(self.points.count + 10))
+        self.points.refresh_from_db()
+        self.assertEqual(self.points.count, 0)
+
+    def testUpdateUserPointsAppendsLedgerEntry(self):
+        updateUserPoints(self.user, -3)
+        entry = PointsLedgerEntry.objects.get(user=self.user)
+        self.assertEqual(entry.house, self.house)
+        self.assertEqual(entry.amount, -3)
+        self.assertFalse(entry.isCompacted)
+
+    def testHousePointsIncludePendingEntries(self):
+        pointsBefore = self.house.points
+        updateUserPoints(self.user, 5)
+        updateUserPoints(self.user, 2)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.points, pointsBefore)
+        self.assertEqual(getHousesWithPoints().get(id=self.house.id).totalPoints, pointsBefore + 7)
+
+    def testCompactHousePointsFoldsPendingEntries(self):
+        pointsBefore = self.house.points
+        updateUserPoints(self.user, 5)
+        updateUserPoints(self.user, -2)
+        self.assertEqual(compactHousePoints(), 2)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.points, pointsBefore + 3)
+        self.assertEqual(getHousesWithPoints().get(id=self.house.id).totalPoints, pointsBefore + 3)
+        self.assertEqual(compactHousePoints(), 0)
+
+    def testCompactHousePointsMarksOnlyTheEntriesItAdded(self):
+        pointsBefore = self.house.points
+        for _ in range(COMPACTION_BATCH_SIZE + 1):
+            PointsLedgerEntry.objects.create(user=self.user, house=self.house, amount=1)
+        self.assertEqual(compactHousePoints(), COMPACTION_BATCH_SIZE + 1)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.points, pointsBefore + COMPACTION_BATCH_SIZE + 1)
+        self.assertFalse(PointsLedgerEntry.objects.filter(isCompacted=False).exists())
+
+    def testUsersWithoutAHouseHaveTheirChangesRecorded(self):
+        countBefore = self.points.count
+        self.user.house = None
+        self.user.save()
+        updateUserPoints(self.user, 5)
+        entry = PointsLedgerEntry.objects.get(user=self.user)
+        self.assertIsNone(entry.house)
+        self.assertEqual(entry.amount, 5)
+        self.points.refresh_from_db()
+        self.assertEqual(self.points.count, countBefore + 5)
+        self.assertEqual(compactHousePoints(), 1)
+
+    def testWritersCompactTheLedgerEveryInterval(self):
+        pointsBefore = self.house.points
+        interval = 3
+        with mock.patch('walletwizard.helpers.pointsHelpers.COMPACTION_INTERVAL', interval):
+            for _ in range(2 * interval):
+                updateUserPoints(self.user, 1)
+        pending = PointsLedgerEntry.objects.filter(isCompacted=False).count()
+        self.assertLess(pending, interval)
+        self.house.refresh_from_db()
+        self.assertEqual(self.house.points, pointsBefore + 2 * interval - pending)
+        self.assertEqual(getHousesWithPoints().get(id=self.house.id).totalPoints, pointsBefore + 2 * interval)
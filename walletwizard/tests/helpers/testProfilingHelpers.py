@@ -0,0 +1,36 @@
+'''Tests for the request profiling helper functions.'''
+from django.test import TestCase
+from django.template.loader import render_to_string
+from walletwizard.models import User
+from walletwizard.helpers.profilingHelpers import *
+
+class ProfilingHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def testFingerprintCollapsesWhitespaceAndInLists(self):
+        self.assertEqual(
+            getSqlFingerprint('SELECT *\n  FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            getSqlFingerprint('SELECT * FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    def testProfileRecordsQueries(self):
+        with profileRequest() as profile:
+            for userId in [1, 2, 1]:
+                User.objects.filter(id=userId).first()
+        self.assertEqual(profile.queryCount, 3)
+        self.assertEqual(len(profile.fingerprints), 1)
+        self.assertEqual(profile.duplicateQueries(5)[0][1], 3)
+        self.assertGreater(profile.sqlTime, 0)
+        self.assertIsNone(getActiveProfile())
+
+    def testProfileRecordsTemplateTime(self):
+        with profileRequest() as profile:
+            render_to_string('partials/users/pagination.html')
+        self.assertGreater(profile.templateTime, 0)
+
+    def testContextProcessorIsTimedOnlyWhileProfiling(self):
+        processor = profileContextProcessor(lambda request: {'value': request})
+        self.assertEqual(processor(1), {'value': 1})
+        with profileRequest() as profile:
+            processor(2)
+        self.assertEqual(list(profile.contextProcessorTimes), ['<lambda>'])
@@ -0,0 +1,229 @@
+'''Unit tests for the receipt processing pipeline.'''
+import datetime
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from walletwizard.forms import ExpenditureForm
+from walletwizard.helpers import receiptHelpers
+from walletwizard.helpers.receiptHelpers import (
+    THUMBNAIL_SIZE, WEB_SIZE, RECEIPT_JOB_MAX_ATTEMPTS, RECEIPT_JOB_FAILED_RETENTION,
+    processReceiptJobs, collectReceiptFiles, deleteFailedReceiptJobs,
+)
+from walletwizard.models import User, Category, Expenditure, ReceiptJob, ReceiptBlob
+
+ORIENTATION_TAG = 0x0112
+MAKE_TAG = 0x010F
+
+def createReceiptUpload(name='receipt.jpg', size=(3000, 2000), color='white'):
+    '''Return an uploaded JPEG shot sideways by a camera, as phones store portrait photos.'''
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = 6
+    exif[MAKE_TAG] = 'Test Camera'
+    output = BytesIO()
+    Image.new('RGB', size, color).save(output, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/jpeg')
+
+class ReceiptHelpersTest(TestCase):
+    '''Unit tests for the receipt processing pipeline.'''
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.mediaRoot = tempfile.mkdtemp()
+        mediaSettings = override_settings(MEDIA_ROOT=self.mediaRoot)
+        mediaSettings.enable()
+        self.addCleanup(mediaSettings.disable)
+        self.addCleanup(shutil.rmtree, self.mediaRoot, ignore_errors=True)
+        self.user = User.objects.get(id=1)
+        self.category = Category.objects.get(id=1)
+        self.category.users.add(self.user)
+
+    def _createExpenditure(self, receipt):
+        formInput = {
+            'title': 'Grocery Shopping',
+            'description': '',
+            'amount': 50.00,
+            'date': datetime.date.today(),
+            'otherCategory': -1,
+        }
+        form = ExpenditureForm(self.user, self.category, formInput, {'receipt': receipt})
+        self.assertTrue(form.is_valid())
+        return form.save()
+
+    def testSavingAReceiptOnlyQueuesIt(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        self.assertTrue(ReceiptJob.objects.filter(expenditure=expenditure).exists())
+        self.assertFalse(expenditure.receiptThumbnail)
+        self.assertFalse(expenditure.receiptWeb)
+
+    def testProcessingCreatesUprightVariantsWithoutExif(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        self.assertEqual(processReceiptJobs(), 1)
+        expenditure.refresh_from_db()
+        self.assertFalse(ReceiptJob.objects.exists())
+        self.assertEqual(len(expenditure.receiptHash), 64)
+        for fieldFile, size in [(expenditure.receiptThumbnail, THUMBNAIL_SIZE), (expenditure.receiptWeb, WEB_SIZE)]:
+            with fieldFile.open('rb') as file:
+                image = Image.open(file)
+                self.assertEqual(image.format, 'JPEG')
+                self.assertLessEqual(image.width, size[0])
+                self.assertLessEqual(image.height, size[1])
+                # the sideways photo has been turned upright
+                self.assertGreater(image.height, image.width)
+                self.assertEqual(len(image.getexif()), 0)
+    def testProcessingReplacesTheUploadWithAnUprightCopyWithoutExif(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        upload = expenditure.receipt.name
+        processReceiptJobs()
+        expenditure.refresh_from_db()
+        self.assertNotEqual(expenditure.receipt.name, upload)
+        with expenditure.receipt.open('rb') as file:
+            image = Image.open(file)
+            self.assertEqual(image.size, (2000, 3000))
+            self.assertEqual(len(image.getexif()), 0)
+        self.assertEqual(ReceiptBlob.objects.get(name=upload).referenceCount, 0)
+        collectReceiptFiles(gracePeriod=datetime.timedelta(0))
+        self.assertFalse(default_storage.exists(upload))
+
+    def testIdenticalUploadsShareTheirFiles(self):
+        firstExpenditure = self._createExpenditure(createReceiptUpload())
+        secondExpenditure = self._createExpenditure(createReceiptUpload(name='copy.jpg'))
+        self.assertEqual(secondExpenditure.receipt.name, firstExpenditure.receipt.name)
+        self.assertEqual(ReceiptBlob.objects.get(name=firstExpenditure.receipt.name).referenceCount, 2)
+        processReceiptJobs()
+        firstExpenditure.refresh_from_db()
+        secondExpenditure.refresh_from_db()
+        self.assertEqual(secondExpenditure.receiptThumbnail.name, firstExpenditure.receiptThumbnail.name)
+        self.assertEqual(secondExpenditure.receiptWeb.name, firstExpenditure.receiptWeb.name)
+        self.assertEqual(ReceiptBlob.objects.get(name=firstExpenditure.receiptThumbnail.name).referenceCount, 2)
+
+    def testIdenticalUploadsWithDifferentExtensionsShareTheirFilesOnceProcessed(self):
+        firstExpenditure = self._createExpenditure(createReceiptUpload())
+        processReceiptJobs()
+        secondExpenditure = self._createExpenditure(createReceiptUpload(name='copy.jpeg'))
+        secondUpload = secondExpenditure.receipt.name
+        self.assertNotEqual(secondUpload, firstExpenditure.receipt.name)
+        processReceiptJobs()
+        firstExpenditure.refresh_from_db()
+        secondExpenditure.refresh_from_db()
+        self.assertEqual(secondExpenditure.receipt.name, firstExpenditure.receipt.name)
+        self.assertEqual(ReceiptBlob.objects.get(name=secondUpload).referenceCount, 0)
+        collectReceiptFiles(gracePeriod=datetime.timedelta(0))
+        self.assertFalse(default_storage.exists(secondUpload))
+
+    def testDeletesOnlyChangeReferencesAndTheCollectorRemovesUnusedFiles(self):
+        firstExpenditure = self._createExpenditure(createReceiptUpload())
+        secondExpenditure = self._createExpenditure(createReceiptUpload(name='copy.jpg'))
+        processReceiptJobs()
+        # the upload replaced by its copy without EXIF data
+        self.assertEqual(collectReceiptFiles(gracePeriod=datetime.timedelta(0)), 1)
+        firstExpenditure.refresh_from_db()
+        receiptFiles = [firstExpenditure.receipt.name, firstExpenditure.receiptThumbnail.name, firstExpenditure.receiptWeb.name]
+        self.user.categories.add(self.category)
+        self.client.force_login(self.user)
+        self.client.get(reverse('deleteExpenditure', args=[self.category.id, firstExpenditure.id]))
+        self.assertFalse(Expenditure.objects.filter(id=firstExpenditure.id).exists())
+        self.assertEqual(collectReceiptFiles(gracePeriod=datetime.timedelta(0)), 0)
+        self.assertTrue(all(default_storage.exists(name) for name in receiptFiles))
+        self.client.get(reverse('deleteExpenditure', args=[self.category.id, secondExpenditure.id]))
+        # the delete itself leaves the files in place
+        self.assertTrue(all(default_storage.exists(name) for name in receiptFiles))
+        self.assertEqual(collectReceiptFiles(gracePeriod=datetime.timedelta(0)), 3)
+        self.assertFalse(any(default_storage.exists(name) for name in receiptFiles))
+        self.assertFalse(ReceiptBlob.objects.exists())
+
+    def testCollectorKeepsFilesWithinTheGracePeriodOrReferencedAgain(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        name = expenditure.receipt.name
+        expenditure.delete()
+        self.assertEqual(collectReceiptFiles(), 0)
+        self.assertTrue(default_storage.exists(name))
+        # an upload of the same content takes the file back before it is collected
+        self._createExpenditure(createReceiptUpload(name='again.jpg'))
+        self.assertEqual(collectReceiptFiles(gracePeriod=datetime.timedelta(0)), 0)
+        self.assertTrue(default_storage.exists(name))
+        self.assertIsNone(ReceiptBlob.objects.get(name=name).unreferencedAt)
+
+    def testReplacingAReceiptReleasesTheOldFiles(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        processReceiptJobs()
+        expenditure.refresh_from_db()
+        oldFiles = [expenditure.receipt.name, expenditure.receiptThumbnail.name, expenditure.receiptWeb.name]
+        formInput = {'title': 'Grocery Shopping', 'amount': 50.00, 'date': datetime.date.today(), 'otherCategory': -1}
+        form = ExpenditureForm(self.user, self.category, formInput, {'receipt': createReceiptUpload(color='black')}, instance=expenditure)
+        self.assertTrue(form.is_valid())
+        expenditure = form.save()
+        self.assertFalse(expenditure.receiptThumbnail)
+        self.assertTrue(all(blob.referenceCount == 0 for blob in ReceiptBlob.objects.filter(name__in=oldFiles)))
+        self.assertEqual(processReceiptJobs(), 1)
+        expenditure.refresh_from_db()
+        self.assertTrue(default_storage.exists(expenditure.receiptThumbnail.name))
+        # the three old files and both uploads, replaced by their copies without EXIF data
+        self.assertEqual(collectReceiptFiles(gracePeriod=datetime.timedelta(0)), 5)
+        self.assertFalse(any(default_storage.exists(name) for name in oldFiles))
+
+    def testCollectReceiptsCommandDeletesInBatches(self):
+        for i in range(3):
+            self._createExpenditure(createReceiptUpload(name=f'receipt{i}.jpg', color=(i * 50, 0, 0))).delete()
+        output = StringIO()
+        call_command('collectReceipts', '--batch-size', '2', '--grace-period', '0', stdout=output)
+        self.assertIn('Number of deleted receipt files: 3', output.getvalue())
+        self.assertFalse(ReceiptBlob.objects.exists())
+
+    def testBrokenReceiptIsRetriedThenKeptWithItsError(self):
+        expenditure = self._createExpenditure(createReceiptUpload())
+        with default_storage.open(expenditure.receipt.name, 'wb') as file:
+            file.write(b'not an image')
+        for _ in range(RECEIPT_JOB_MAX_ATTEMPTS):
+            self.assertEqual(processReceiptJobs(), 1)
+        self.assertEqual(processReceiptJobs(), 0)
+        job = ReceiptJob.objects.get(expenditure=expenditure)
+        self.assertEqual(job.attempts, RECEIPT_JOB_MAX_ATTEMPTS)
+        self.assertNotEqual(job.lastError, '')
+        self.assertIsNone(job.claimedAt)
+
+    def testFailedJobsAreDeletedOnceTheRetentionHasPassed(self):
+        failedExpenditure = self._createExpenditure(createReceiptUpload())
+        queuedExpenditure = self._createExpenditure(createReceiptUpload(name='other.jpg', color='black'))
+        ReceiptJob.objects.filter(expenditure=failedExpenditure).update(attempts=RECEIPT_JOB_MAX_ATTEMPTS)
+        self.assertEqual(deleteFailedReceiptJobs(), 0)
+        queuedBefore = datetime.datetime.now(datetime.timezone.utc) - RECEIPT_JOB_FAILED_RETENTION - datetime.timedelta(minutes=1)
+        ReceiptJob.objects.update(createdAt=queuedBefore)
+        self.assertEqual(deleteFailedReceiptJobs(), 1)
+        self.assertEqual(list(ReceiptJob.objects.values_list('expenditure', flat=True)), [queuedExpenditure.id])
+        ReceiptJob.objects.filter(expenditure=queuedExpenditure).update(attempts=RECEIPT_JOB_MAX_ATTEMPTS)
+        call_command('processReceipts', stdout=StringIO())
+        self.assertFalse(ReceiptJob.objects.exists())
+
+    def testUnexpectedErrorsFailOnlyTheirJob(self):
+        brokenExpenditure = self._createExpenditure(createReceiptUpload())
+        expenditure = self._createExpenditure(createReceiptUpload(name='other.jpg', color='black'))
+        originalProcessReceipt = receiptHelpers.processReceipt
+        def processReceipt(receiptExpenditure):
+            if receiptExpenditure.id == brokenExpenditure.id:
+                raise ValueError('unexpected')
+            originalProcessReceipt(receiptExpenditure)
+        with mock.patch.object(receiptHelpers, 'processReceipt', processReceipt):
+            self.assertEqual(processReceiptJobs(), 2)
+        job = ReceiptJob.objects.get()
+        self.assertEqual(job.expenditure, brokenExpenditure)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.lastError, 'unexpected')
+        self.assertIsNone(job.claimedAt)
+        expenditure.refresh_from_db()
+        self.assertTrue(expenditure.receiptThumbnail)
+
+    def testProcessReceiptsCommandDrainsTheQueue(self):
+        for i in range(3):
+            self._createExpenditure(createReceiptUpload(name=f'receipt{i}.jpg', color=(i, i, i)))
+        output = StringIO()
+        call_command('processReceipts', '--batch-size', '2', stdout=output)
+        self.assertIn('Number of processed receipts: 3', output.getvalue())
+        self.assertFalse(ReceiptJob.objects.exists())
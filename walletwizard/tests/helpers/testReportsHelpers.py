@@ -2,6 +2,7 @@ from django.test import TestCase
 from walletwizard.forms import ReportForm
 from walletwizard.models import User, Expenditure, Category
 import datetime
+from decimal import Decimal
 from walletwizard.helpers.reportsHelpers import *
 from dateutil.relativedelta import relativedelta
 
@@ -33,12 +34,12 @@ class ReportsHelpersTest(TestCase):
     def testMonthyBudgetIsCovertedToDaily(self):
         self.category.spendingLimit.timePeriod = 'monthly'
         changedBudget = convertBudgetToDaily(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount/30)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount/Decimal('30.436875'), places=10)
 
     def testYearlyBudgetIsCovertedToDaily(self):
         self.category.spendingLimit.timePeriod = 'yearly'
         changedBudget = convertBudgetToDaily(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount/365)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount/Decimal('365.2425'), places=10)
 
     def testDailyyBudgetIsCovertedToDaily(self):
         self.category.spendingLimit.timePeriod = 'daily'
@@ -53,12 +54,12 @@ class ReportsHelpersTest(TestCase):
     def testMonthyBudgetIsCovertedToWeekly(self):
         self.category.spendingLimit.timePeriod = 'monthly'
         changedBudget = convertBudgetToWeekly(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount/4)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount/Decimal('4.348125'), places=10)
 
     def testYearlyBudgetIsCovertedToWeekly(self):
         self.category.spendingLimit.timePeriod = 'yearly'
         changedBudget = convertBudgetToWeekly(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount/52)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount/(Decimal('365.2425')/7), places=10)
 
     def testDailyyBudgetIsCovertedToWeekly(self):
         self.category.spendingLimit.timePeriod = 'weekly'
@@ -68,7 +69,7 @@ class ReportsHelpersTest(TestCase):
     def testWeeklyBudgetIsCovertedToMonthly(self):
         self.category.spendingLimit.timePeriod = 'daily'
         changedBudget = convertBudgetToMonthly(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount*30)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount*Decimal('30.436875'), places=10)
 
     def testMonthyBudgetIsCovertedToMonthly(self):
         self.category.spendingLimit.timePeriod = 'monthly'
@@ -83,7 +84,7 @@ class ReportsHelpersTest(TestCase):
     def testDailyyBudgetIsCovertedToMonthly(self):
         self.category.spendingLimit.timePeriod = 'weekly'
         changedBudget = convertBudgetToMonthly(self.category)
-        self.assertEqual(changedBudget, self.category.spendingLimit.amount*4)
+        self.assertAlmostEqual(changedBudget, self.category.spendingLimit.amount*Decimal('4.348125'), places=10)
 
     def testCreateArraysDataForDailyLimit(self):
         self.category.spendingLimit.timePeriod = 'day'
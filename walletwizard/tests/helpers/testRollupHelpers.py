@@ -0,0 +1,67 @@
+'''Tests for the daily spending rollup helper functions.'''
+from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from walletwizard.models import Category, CategoryDailySpending, Expenditure, SpendingLimit
+from walletwizard.helpers.rollupHelpers import *
+
+class RollupHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.category = Category.objects.get(id=1)
+        self.today = date.today()
+        self.yesterday = self.today - timedelta(days=1)
+        self.expenditure = Expenditure.objects.create(title='test', amount=Decimal('12.50'), date=self.today)
+        self.category.expenditures.add(self.expenditure)
+
+    def testAddingExpenditureUpdatesRollup(self):
+        second = Expenditure.objects.create(title='second', amount=Decimal('7.25'), date=self.today)
+        self.category.expenditures.add(second)
+        self._assertRollup(self.today, Decimal('19.75'), 2)
+
+    def testEditingAmountUpdatesRollup(self):
+        self.expenditure.amount = Decimal('20.00')
+        self.expenditure.save()
+        self._assertRollup(self.today, Decimal('20.00'), 1)
+
+    def testEditingDateMovesRollupRow(self):
+        self.expenditure.date = self.yesterday
+        self.expenditure.save()
+        self.assertFalse(CategoryDailySpending.objects.filter(category=self.category, date=self.today).exists())
+        self._assertRollup(self.yesterday, Decimal('12.50'), 1)
+
+    def testDeletingExpenditureUpdatesRollup(self):
+        self.expenditure.delete()
+        self.assertFalse(CategoryDailySpending.objects.filter(category=self.category).exists())
+
+    def testRemovingAndClearingExpendituresUpdatesRollup(self):
+        self.category.expenditures.remove(self.expenditure)
+        self.assertFalse(CategoryDailySpending.objects.filter(category=self.category).exists())
+        self.category.expenditures.add(self.expenditure)
+        self.category.expenditures.clear()
+        self.assertFalse(CategoryDailySpending.objects.filter(category=self.category).exists())
+
+    def testSharedExpenditureIsRolledUpForEachCategory(self):
+        spendingLimit = SpendingLimit.objects.create(amount=100, timePeriod='weekly')
+        otherCategory = Category.objects.create(name='other', spendingLimit=spendingLimit)
+        otherCategory.expenditures.add(self.expenditure)
+        self._assertRollup(self.today, Decimal('12.50'), 1, otherCategory)
+        self._assertRollup(self.today, Decimal('12.50'), 1)
+
+    def testTotalSpentFromRollupRespectsWindow(self):
+        older = Expenditure.objects.create(title='older', amount=Decimal('5.00'), date=self.yesterday)
+        self.category.expenditures.add(older)
+        self.assertEqual(computeTotalSpentFromRollup(self.category.id, self.today), Decimal('12.50'))
+        self.assertEqual(computeTotalSpentFromRollup(self.category.id, self.yesterday), Decimal('17.50'))
+        self.assertEqual(computeTotalSpentFromRollup(self.category.id, self.yesterday, self.today), Decimal('5.00'))
+
+    def testRebuildMatchesIncrementalRollup(self):
+        expected = list(CategoryDailySpending.objects.values_list('category_id', 'date', 'total', 'count'))
+        rebuildDailySpending()
+        self.assertEqual(list(CategoryDailySpending.objects.values_list('category_id', 'date', 'total', 'count')), expected)
+
+    def _assertRollup(self, day, total, count, category=None):
+        rollup = CategoryDailySpending.objects.get(category=category or self.category, date=day)
+        self.assertEqual(rollup.total, total)
+        self.assertEqual(rollup.count, count)
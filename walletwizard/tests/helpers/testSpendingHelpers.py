@@ -0,0 +1,65 @@
+'''Tests for the spending aggregation helper functions.'''
+from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from walletwizard.models import Category, Expenditure
+from walletwizard.helpers.spendingHelpers import *
+
+class SpendingHelpersTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.category = Category.objects.get(id=1)
+        self.category.expenditures.clear()
+        self.today = date.today()
+
+    def testDailyWindowOnlyCoversToday(self):
+        start, end = getTimePeriodStartAndEnd('daily', date(2023, 3, 15))
+        self.assertEqual(start, date(2023, 3, 15))
+        self.assertEqual(end, date(2023, 3, 16))
+
+    def testWeeklyWindowStartsOnMonday(self):
+        start, end = getTimePeriodStartAndEnd('weekly', date(2023, 3, 15))
+        self.assertEqual(start, date(2023, 3, 13))
+        self.assertEqual(end, date(2023, 3, 20))
+
+    def testMonthlyWindowCoversCalendarMonth(self):
+        start, end = getTimePeriodStartAndEnd('monthly', date(2023, 12, 31))
+        self.assertEqual(start, date(2023, 12, 1))
+        self.assertEqual(end, date(2024, 1, 1))
+
+    def testYearlyWindowCoversCalendarYear(self):
+        start, end = getTimePeriodStartAndEnd('yearly', date(2023, 3, 15))
+        self.assertEqual(start, date(2023, 1, 1))
+        self.assertEqual(end, date(2024, 1, 1))
+
+    def testUnknownTimePeriodHasNoWindow(self):
+        self.assertIsNone(getTimePeriodStartAndEnd('hourly'))
+
+    def testTotalIsZeroWithoutExpenditures(self):
+        total = computeTotalSpentInTimePeriod('monthly', self.category.expenditures)
+        self.assertEqual(total, Decimal('0.00'))
+
+    def testTotalIsExactDecimal(self):
+        self._addExpenditure('0.10', self.today)
+        self._addExpenditure('0.20', self.today)
+        total = computeTotalSpentInTimePeriod('daily', self.category.expenditures)
+        self.assertIsInstance(total, Decimal)
+        self.assertEqual(total, Decimal('0.30'))
+
+    def testTotalExcludesExpendituresOutsideWindow(self):
+        self._addExpenditure('10.00', self.today)
+        self._addExpenditure('99.00', self.today.replace(year=self.today.year - 1))
+        total = computeTotalSpentInTimePeriod('yearly', self.category.expenditures)
+        self.assertEqual(total, Decimal('10.00'))
+
+    def testTotalUsesSingleQuery(self):
+        for i in range(10):
+            self._addExpenditure('1.00', self.today - timedelta(days=i))
+        with self.assertNumQueries(1):
+            computeTotalSpentInTimePeriod('yearly', self.category.expenditures)
+
+    def _addExpenditure(self, amount, day):
+        expenditure = Expenditure.objects.create(title='test', amount=Decimal(amount), date=day)
+        self.category.expenditures.add(expenditure)
+        return expenditure
@@ -0,0 +1,41 @@
+'''Tests for the notification dispatch middleware.'''
+from django.db import connection
+from django.http import HttpResponse, HttpResponseServerError
+from django.test import TestCase, RequestFactory
+from walletwizard.helpers.notificationsHelpers import createBasicNotification
+from walletwizard.middleware.notificationsMiddleware import NotificationDispatchMiddleware
+from walletwizard.models import User, Points, Notification
+
+class NotificationDispatchMiddlewareTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.request = RequestFactory().get('/')
+        self.notificationsBefore = Notification.objects.count()
+        self.pointsBefore = Points.objects.get(user=self.user).count
+
+    def _view(self, response):
+        def view(request):
+            Points.objects.filter(user=self.user).update(count=self.pointsBefore + 5)
+            createBasicNotification(self.user, 'Points Won!', '5 points')
+            self.assertEqual(Notification.objects.count(), self.notificationsBefore)
+            return response
+        return NotificationDispatchMiddleware(view)
+
+    def testNotificationsAreWrittenWithTheViewsChanges(self):
+        self._view(HttpResponse())(self.request)
+        self.assertEqual(Notification.objects.count(), self.notificationsBefore + 1)
+        self.assertEqual(Points.objects.get(user=self.user).count, self.pointsBefore + 5)
+
+    def testFailedViewWritesNoNotifications(self):
+        response = self._view(HttpResponseServerError())(self.request)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(Notification.objects.count(), self.notificationsBefore)
+
+    def testRequestIsNotWrappedInATransaction(self):
+        savepointsBefore = list(connection.savepoint_ids)
+        def view(request):
+            self.assertEqual(connection.savepoint_ids, savepointsBefore)
+            return HttpResponse()
+        NotificationDispatchMiddleware(view)(self.request)
@@ -0,0 +1,59 @@
+'''Tests for the request profiling middleware.'''
+import json
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from walletwizard.models import User
+
+@override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 1, 'DUPLICATE_QUERY_LIMIT': 5})
+class RequestProfilingMiddlewareTest(TestCase):
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(id=1)
+        self.client.force_login(self.user)
+        self.url = reverse('home')
+
+    def testProfiledResponseHasServerTimingHeader(self):
+        with self.assertLogs('walletwizard.profiling', level='INFO'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('contextProcessors;dur=', timing)
+        self.assertIn('templates;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def testProfiledRequestIsLoggedAsJson(self):
+        with self.assertLogs('walletwizard.profiling', level='INFO') as logs:
+            self.client.get(self.url)
+        self.assertEqual(len(logs.records), 1)
+        profile = json.loads(logs.records[0].getMessage())
+        self.assertEqual(profile['path'], self.url)
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['queryCount'], 0)
+        self.assertGreater(profile['templateMs'], 0)
+        self.assertEqual(set(profile['contextProcessorMs']), {'getNotifications', 'getPoints'})
+        self.assertLessEqual(profile['sqlMs'], profile['totalMs'])
+
+    def testDuplicateQueriesAreReported(self):
+        # the home view and the points context processor both load the user's points
+        with self.assertLogs('walletwizard.profiling', level='INFO') as logs:
+            self.client.get(self.url)
+        duplicates = json.loads(logs.records[0].getMessage())['duplicateQueries']
+        self.assertTrue(duplicates)
+        self.assertLessEqual(len(duplicates), 5)
+        for duplicate in duplicates:
+            self.assertGreater(duplicate['count'], 1)
+
+    @override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 0, 'DUPLICATE_QUERY_LIMIT': 5})
+    def testProfilingIsOffWithoutSampleRate(self):
+        with self.assertNoLogs('walletwizard.profiling', level='INFO'):
+            response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 0.000001, 'DUPLICATE_QUERY_LIMIT': 5})
+    def testUnsampledRequestIsNotProfiled(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
@@ -2,6 +2,8 @@
 from walletwizard.models import User, Category, SpendingLimit
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from unittest import mock
+from libgravatar import Gravatar
 
 class UserModelTestCase(TestCase):
     '''Unit tests for the User model.'''
@@ -155,9 +157,61 @@ class UserModelTestCase(TestCase):
         self.user.followers.add(self.secondUser)
         self.secondUser.followers.add(thirdUser)
         self.secondUser.followers.add(self.user)
+        # the counts are stored on each user, so the instances are reloaded
+        for user in [thirdUser, self.user, self.secondUser]:
+            user.refresh_from_db()
         self.assertEqual(thirdUser.followerCount(), 0)
         self.assertEqual(thirdUser.followeeCount(), 1)
         self.assertEqual(self.user.followerCount(), 1)
         self.assertEqual(self.user.followeeCount(), 1)
         self.assertEqual(self.secondUser.followerCount(), 2)
-        self.assertEqual(self.secondUser.followeeCount(), 1)
\ No newline at end of file
+        self.assertEqual(self.secondUser.followeeCount(), 1)
+
+    def testGravatarUrlsAreStoredOnSave(self):
+        expected = Gravatar('janedoe@example.org')
+        self.assertEqual(self.secondUser.gravatarUrl, expected.get_image(size=120, default='mp'))
+        self.assertEqual(self.secondUser.miniGravatarUrl, expected.get_image(size=60, default='mp'))
+
+    def testGravatarUrlsFollowEmailChanges(self):
+        self.secondUser.email = 'jane.doe@example.org'
+        self.secondUser.save()
+        self.secondUser.refresh_from_db()
+        self.assertEqual(self.secondUser.gravatar(), Gravatar('jane.doe@example.org').get_image(size=120, default='mp'))
+
+    def testStoredGravatarUrlsAreRenderedWithoutHashing(self):
+        user = User.objects.get(id=self.secondUser.id)
+        with mock.patch('walletwizard.helpers.avatarHelpers.Gravatar') as gravatar:
+            self.assertEqual(user.gravatar(), self.secondUser.gravatarUrl)
+            self.assertEqual(user.miniGravatar(), self.secondUser.miniGravatarUrl)
+        gravatar.assert_not_called()
+
+    def testGravatarFallsBackWithoutStoredUrls(self):
+        # users loaded from fixtures or bulk created without their urls
+        User.objects.filter(id=self.user.id).update(gravatarUrl='', miniGravatarUrl='')
+        user = User.objects.get(id=self.user.id)
+        self.assertEqual(user.miniGravatar(), Gravatar(user.email).get_image(size=60, default='mp'))
+        self.assertEqual(user.gravatar(size=200), Gravatar(user.email).get_image(size=200, default='mp'))
+
+    def testFollowCountersFollowRemovalsAndClears(self):
+        thirdUser = User.objects.create(
+            username='lucywhite',
+            email='lucywhite@example.org',
+            firstName='Lucy',
+            lastName='White',
+            password='Password123',
+        )
+        self.user.followers.add(self.secondUser, thirdUser)
+        self.user.followers.remove(self.secondUser)
+        self.secondUser.followees.add(thirdUser)
+        thirdUser.followees.clear()
+        for user in [thirdUser, self.user, self.secondUser]:
+            user.refresh_from_db()
+        self.assertEqual((self.user.followerCount(), self.user.followeeCount()), (0, 0))
+        self.assertEqual((self.secondUser.followerCount(), self.secondUser.followeeCount()), (0, 1))
+        self.assertEqual((thirdUser.followerCount(), thirdUser.followeeCount()), (1, 0))
+
+    def testIsFollowingRunsOneExistsQuery(self):
+        self.user.followers.add(self.secondUser)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.secondUser.isFollowing(self.user))
+        self.assertFalse(self.user.isFollowing(self.secondUser))
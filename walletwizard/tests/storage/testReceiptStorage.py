@@ -0,0 +1,46 @@
+'''Unit tests for the content addressed receipt storage.'''
+import hashlib
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.test import TestCase
+from walletwizard.models import ReceiptBlob
+from walletwizard.storage.receiptStorage import ContentAddressedStorage
+
+class ReceiptStorageTest(TestCase):
+    '''Unit tests for the content addressed receipt storage.'''
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def testFilesAreNamedAfterTheirContent(self):
+        contentHash = hashlib.sha256(b'receipt').hexdigest()
+        name = self.storage.save('receipts/Lunch.JPG', ContentFile(b'receipt'))
+        self.assertEqual(name, f'receipts/{contentHash[:2]}/{contentHash}.jpg')
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'receipt')
+
+    def testIdenticalContentIsStoredOnce(self):
+        firstName = self.storage.save('receipts/first.jpg', ContentFile(b'receipt'))
+        secondName = self.storage.save('receipts/second.jpg', ContentFile(b'receipt'))
+        self.assertEqual(firstName, secondName)
+        self.assertEqual(len(self.storage.listdir(f'receipts/{firstName.split("/")[1]}')[1]), 1)
+
+    def testDifferentContentIsStoredSeparately(self):
+        firstName = self.storage.save('receipts/receipt.jpg', ContentFile(b'first receipt'))
+        secondName = self.storage.save('receipts/receipt.jpg', ContentFile(b'second receipt'))
+        self.assertNotEqual(firstName, secondName)
+        self.assertTrue(self.storage.exists(firstName))
+        self.assertTrue(self.storage.exists(secondName))
+
+    def testReusingAnUnreferencedFileRestartsItsGracePeriod(self):
+        name = self.storage.save('receipts/receipt.jpg', ContentFile(b'receipt'))
+        unreferencedAt = timezone.now() - timedelta(days=1)
+        blob = ReceiptBlob.objects.create(name=name, unreferencedAt=unreferencedAt)
+        self.assertEqual(self.storage.save('receipts/copy.jpg', ContentFile(b'receipt')), name)
+        blob.refresh_from_db()
+        self.assertGreater(blob.unreferencedAt, unreferencedAt)
@@ -0,0 +1,66 @@
+"""Tests for the export expenditures view."""
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from walletwizard.models import User, Category, Expenditure, SpendingLimit
+from walletwizard.tests.testHelpers import reverse_with_next
+
+class ExportExpendituresViewTest(TestCase):
+    """Tests for the export expenditures view."""
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.client.force_login(self.user)
+        self.url = reverse('exportExpenditures', args=['csv'])
+        self.category = Category.objects.get(id=1)
+        self.otherCategory = Category.objects.create(
+            name='other', spendingLimit=SpendingLimit.objects.create(amount=100, timePeriod='weekly')
+        )
+        self.otherCategory.users.add(self.user)
+        self.user.categories.add(self.category, self.otherCategory)
+        self.sharedExpenditure = Expenditure.objects.create(title='shared', amount=Decimal('9.99'), date=date(2022, 1, 2))
+        self.category.expenditures.add(self.sharedExpenditure)
+        self.otherCategory.expenditures.add(self.sharedExpenditure)
+
+    def testExportCsvListsEachExpenditureOnce(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        expenditureIds = Expenditure.objects.filter(expenditures__in=self.user.categories.all()).values_list('id', flat=True)
+        self.assertEqual(sorted(int(row['id']) for row in rows), sorted(set(expenditureIds)))
+        sharedRow = next(row for row in rows if int(row['id']) == self.sharedExpenditure.id)
+        self.assertEqual(sharedRow['amount'], '9.99')
+        self.assertEqual(sharedRow['date'], '2022-01-02')
+        self.assertEqual(sharedRow['categories'].split('; '), sorted([self.category.name, self.otherCategory.name]))
+
+    def testExportNdjson(self):
+        response = self.client.get(reverse('exportExpenditures', args=['ndjson']))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        sharedRecord = next(record for record in records if record['id'] == self.sharedExpenditure.id)
+        self.assertEqual(sorted(sharedRecord['categories']), sorted([self.category.name, self.otherCategory.name]))
+
+    def testExportUnknownFormat(self):
+        response = self.client.get(reverse('exportExpenditures', args=['xml']))
+        self.assertEqual(response.status_code, 404)
+
+    def testExportCommandMatchesView(self):
+        output = StringIO()
+        call_command('exportExpenditures', self.user.username, '--format', 'ndjson', stdout=output)
+        response = self.client.get(reverse('exportExpenditures', args=['ndjson']))
+        self.assertEqual(output.getvalue(), b''.join(response.streaming_content).decode())
+
+    def testRedirectsIfUserNotLoggedIn(self):
+        self.client.logout()
+        redirectUrl = reverse_with_next('logIn', self.url)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, redirectUrl, status_code=302, target_status_code=200)
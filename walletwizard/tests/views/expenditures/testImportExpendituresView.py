@@ -0,0 +1,69 @@
+"""Tests for the import expenditures view."""
+from django.test import TestCase
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from walletwizard.models import User, Category
+from walletwizard.tests.testHelpers import reverse_with_next
+
+class ImportExpendituresViewTest(TestCase):
+    """Tests for the import expenditures view."""
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.client.force_login(self.user)
+        self.category = Category.objects.get(id=1)
+        self.user.categories.add(self.category)
+        self.url = reverse('importExpenditures', args=[self.category.id])
+
+    def testImportCsv(self):
+        countBefore = self.category.expenditures.count()
+        file = SimpleUploadedFile('expenditures.csv', b'title,amount,date\nlunch,4.50,2022-01-02\nbus,2.00,2022-01-03\n')
+        response = self.client.post(self.url, {'file': file}, follow=True)
+        self.assertRedirects(response, reverse('category', args=[self.category.id]), status_code=302, target_status_code=200)
+        self.assertEqual(self.category.expenditures.count(), countBefore + 2)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertIn('2 expenditures were successfully imported.', messages)
+
+    def testImportReportsInvalidRows(self):
+        file = SimpleUploadedFile('expenditures.csv', b'title,amount,date\nlunch,abc,2022-01-02\n')
+        response = self.client.post(self.url, {'file': file}, follow=True)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertTrue(any(message.startswith('Failed to import row 1') for message in messages))
+
+    def testImportRejectsUnknownFileType(self):
+        countBefore = self.category.expenditures.count()
+        file = SimpleUploadedFile('expenditures.pdf', b'not a statement')
+        self.client.post(self.url, {'file': file})
+        self.assertEqual(self.category.expenditures.count(), countBefore)
+
+    def testImportReportsUnreadableFiles(self):
+        countBefore = self.category.expenditures.count()
+        file = SimpleUploadedFile('expenditures.csv', 'title,amount,date\ncafé,4.50,2022-01-02\n'.encode('latin-1'))
+        response = self.client.post(self.url, {'file': file}, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.category.expenditures.count(), countBefore)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertTrue(any(message.startswith('Failed to import expenditures - File') for message in messages))
+
+    def testImportIntoAnotherUsersCategoryIsNotFound(self):
+        otherUser = User.objects.create_user(
+            username='janedoe', email='janedoe@example.org', firstName='Jane', lastName='Doe', password='Password123'
+        )
+        self.client.force_login(otherUser)
+        file = SimpleUploadedFile('expenditures.csv', b'title,amount,date\nlunch,4.50,2022-01-02\n')
+        countBefore = self.category.expenditures.count()
+        response = self.client.post(self.url, {'file': file})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.category.expenditures.count(), countBefore)
+
+    def testImportIntoUnknownCategoryIsNotFound(self):
+        response = self.client.post(reverse('importExpenditures', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def testRedirectsIfUserNotLoggedIn(self):
+        self.client.logout()
+        redirectUrl = reverse_with_next('logIn', self.url)
+        response = self.client.post(self.url)
+        self.assertRedirects(response, redirectUrl, status_code=302, target_status_code=200)
@@ -0,0 +1,160 @@
+"""Tests of receipt view."""
+import datetime
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from walletwizard.forms import ExpenditureForm
+from walletwizard.helpers.fileResponseHelpers import FILE_CHUNK_SIZE
+from walletwizard.helpers.receiptHelpers import processReceiptJobs
+from walletwizard.models import User, Category
+from walletwizard.tests.helpers.testReceiptHelpers import createReceiptUpload
+from walletwizard.tests.testHelpers import reverse_with_next
+
+class ReceiptViewTest(TestCase):
+    """Tests of receipt view."""
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.mediaRoot = tempfile.mkdtemp()
+        mediaSettings = override_settings(MEDIA_ROOT=self.mediaRoot)
+        mediaSettings.enable()
+        self.addCleanup(mediaSettings.disable)
+        self.addCleanup(shutil.rmtree, self.mediaRoot, ignore_errors=True)
+        self.user = User.objects.get(id=1)
+        self.otherUser = User.objects.create_user(
+            username='otheruser', email='other.user@example.org', firstName='Other', lastName='User', password='Password123'
+        )
+        self.category = Category.objects.get(id=1)
+        self.category.users.add(self.user)
+        self.user.categories.add(self.category)
+        self.client.force_login(self.user)
+        self.expenditure = self._createExpenditure(createReceiptUpload())
+        processReceiptJobs()
+        self.expenditure.refresh_from_db()
+        with self.expenditure.receipt.open('rb') as file:
+            self.content = file.read()
+        self.url = reverse('receipt', args=[self.expenditure.id, 'original'])
+
+    def _createExpenditure(self, receipt):
+        formInput = {'title': 'Scan', 'amount': 10.00, 'date': datetime.date.today(), 'otherCategory': -1}
+        form = ExpenditureForm(self.user, self.category, formInput, {'receipt': receipt})
+        self.assertTrue(form.is_valid())
+        return form.save()
+
+    def testOwnerGetsTheWholeReceiptStreamed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def testUserWithoutTheCategoryCannotGetTheReceipt(self):
+        self.client.force_login(self.otherUser)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def testUserSharingTheCategoryGetsTheReceipt(self):
+        self.category.users.add(self.otherUser)
+        self.client.force_login(self.otherUser)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def testRangeRequests(self):
+        size = len(self.content)
+        for header, start, end in [
+            ('bytes=0-99', 0, 99),
+            ('bytes=100-', 100, size - 1),
+            ('bytes=-50', size - 50, size - 1),
+            ('bytes=10-999999999', 10, size - 1),
+        ]:
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+            self.assertEqual(response['Content-Length'], str(end - start + 1))
+            self.assertEqual(b''.join(response.streaming_content), self.content[start:end + 1])
+
+    def testLargeRangeIsStreamedInChunks(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-')
+        chunks = list(response.streaming_content)
+        self.assertTrue(all(len(chunk) <= FILE_CHUNK_SIZE for chunk in chunks))
+        self.assertEqual(b''.join(chunks), self.content)
+
+    def testUnsatisfiableRange(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def testMalformedOrMultipleRangesServeTheWholeReceipt(self):
+        for header in ['bytes=abc', 'bytes=0-1,5-9', 'items=0-1', 'bytes=9-1']:
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 200)
+
+    def testIfRangeMismatchServesTheWholeReceipt(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    def testConditionalRequestsAreNotModified(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(RECEIPT_SERVING={'MODE': 'x-sendfile', 'ACCEL_REDIRECT_PREFIX': '/protected-media/'})
+    def testXSendfileModeLeavesTheFileToTheWebServer(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Sendfile'], self.expenditure.receipt.path)
+        self.assertEqual(response.content, b'')
+
+    @override_settings(RECEIPT_SERVING={'MODE': 'x-accel-redirect', 'ACCEL_REDIRECT_PREFIX': '/protected-media/'})
+    def testXAccelRedirectModeLeavesTheFileToTheWebServer(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.expenditure.receipt.name)
+        self.assertEqual(response.content, b'')
+
+    def testReceiptIsOnlyServedOnceProcessed(self):
+        expenditure = self._createExpenditure(createReceiptUpload(color='black'))
+        for variant in ['original', 'web', 'thumbnail']:
+            self.assertEqual(self.client.get(reverse('receipt', args=[expenditure.id, variant])).status_code, 404)
+        response = self.client.get(reverse('category', args=[self.category.id]))
+        self.assertContains(response, 'Processing...')
+        self.assertNotContains(response, reverse('receipt', args=[expenditure.id, 'thumbnail']))
+        processReceiptJobs()
+        expenditure.refresh_from_db()
+        response = self.client.get(reverse('receipt', args=[expenditure.id, 'thumbnail']))
+        with expenditure.receiptThumbnail.open('rb') as file:
+            self.assertEqual(b''.join(response.streaming_content), file.read())
+
+    def testUnknownVariantOrMissingReceipt(self):
+        self.assertEqual(self.client.get(reverse('receipt', args=[self.expenditure.id, 'other'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('receipt', args=[9999, 'original'])).status_code, 404)
+        expenditure = self._createExpenditure(None)
+        self.assertEqual(self.client.get(reverse('receipt', args=[expenditure.id, 'original'])).status_code, 404)
+
+    def testCategoryPageLinksToTheReceiptView(self):
+        response = self.client.get(reverse('category', args=[self.category.id]))
+        self.assertContains(response, reverse('receipt', args=[self.expenditure.id, 'thumbnail']))
+        self.assertContains(response, reverse('receipt', args=[self.expenditure.id, 'web']))
+        self.assertNotContains(response, self.expenditure.receipt.url)
+
+    def testRedirectIfNotLoggedIn(self):
+        self.client.logout()
+        redirectUrl = reverse_with_next('logIn', self.url)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, redirectUrl, status_code=302, target_status_code=200)
@@ -1,8 +1,10 @@
 """Tests of edit notification view."""
 from walletwizard.models import User, Notification
 from django.test import TestCase
+from django.core.cache import cache
 from django.urls import reverse
 from walletwizard.tests.testHelpers import reverse_with_next
+from walletwizard.helpers.notificationsHelpers import getCachedNotificationSummary
 
 class EditNotificationViewTest(TestCase):
     """Tests of edit notification view."""
@@ -15,6 +17,7 @@ class EditNotificationViewTest(TestCase):
         self.unreadNotification = Notification.objects.get(id=1)
         self.readNotification = Notification.objects.get(id=2)
         self.url = reverse('editNotifications', args=[self.readNotification.id])
+        cache.clear()
 
     def testRedirectToPageBeforeEdit(self):
         urlBeforeEdit = reverse('home')
@@ -37,6 +40,12 @@ class EditNotificationViewTest(TestCase):
         self.assertTrue(len(userReadNotificationsCountBefore), len(userReadNotificationsCountBefore)+1)
         self.assertTrue(len(userUnreadNotificationsCountBefore), len(userUnreadNotificationsCountBefore)-1)
     
+    def testEditClearsCachedNotificationSummary(self):
+        countBefore = getCachedNotificationSummary(self.user)['unreadNotificationCount']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(self.url, HTTP_REFERER=reverse('home'))
+        self.assertEqual(getCachedNotificationSummary(self.user)['unreadNotificationCount'], countBefore+1)
+
     def testRedirectsIfUserNotLoggedIn(self):
         self.client.logout()
         redirectUrl = reverse_with_next('logIn', self.url)
@@ -2,7 +2,9 @@
 from walletwizard.models import User, Notification
 from django.test import TestCase
 from django.urls import reverse
-from django.core.paginator import Page
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from walletwizard.helpers.paginationHelpers import KeysetPage
 from walletwizard.tests.testHelpers import reverse_with_next
 
 class NotificationViewTest(TestCase):
@@ -21,8 +23,8 @@ class NotificationViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'notifications.html')
-        self.assertIsInstance(response.context['unreadNotificationsPaginated'], Page)
-        self.assertIsInstance(response.context['readNotificationsPaginated'], Page)
+        self.assertIsInstance(response.context['unreadNotificationsPaginated'], KeysetPage)
+        self.assertIsInstance(response.context['readNotificationsPaginated'], KeysetPage)
         # Check contextProcessor context is available.
         self.assertEqual(len(response.context['unreadNotifications']), len(Notification.objects.filter(toUser=self.user, isSeen=False)))
         self.assertEqual(len(response.context['readNotifications']), len(Notification.objects.filter(toUser=self.user, isSeen=True)))
@@ -35,8 +37,9 @@ class NotificationViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(len(response.context['unreadNotificationsPaginated']), 5)
         # Check the next page displays the remaining 1 notifications.
-        response = self.client.get(self.url + '?page=2')
+        response = self.client.get(self.url + response.context['unreadNotificationsPaginated'].nextUrl)
         self.assertEqual(len(response.context['unreadNotificationsPaginated']), 1)
+        self.assertFalse(response.context['unreadNotificationsPaginated'].has_next())
 
     def testReadNotificationsPagination(self):
         # Create additional unread notifications.
@@ -46,9 +49,81 @@ class NotificationViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(len(response.context['readNotificationsPaginated']), 5)
         # Check the next page displays the remaining 5 notifications.
-        response = self.client.get(reverse('notifications') + '?page=2')
+        response = self.client.get(self.url + response.context['readNotificationsPaginated'].nextUrl)
         self.assertEqual(len(response.context['readNotificationsPaginated']), 5)
 
+    def testPagesDoNotOverlapOrSkip(self):
+        Notification.objects.filter(toUser=self.user, isSeen=True).delete()
+        # notifications created at the same time are told apart by their id
+        createdAt = self.readNotification.createdAt
+        Notification.objects.bulk_create([
+            Notification(toUser=self.user, title='test'+str(i), message='test message', isSeen=True, type='basic')
+            for i in range(12)
+        ])
+        Notification.objects.filter(toUser=self.user, isSeen=True).update(createdAt=createdAt)
+        seen = []
+        url = self.url
+        while True:
+            page = self.client.get(url).context['readNotificationsPaginated']
+            seen.extend(notification.id for notification in page)
+            if not page.has_next():
+                break
+            url = self.url + page.nextUrl
+        expected = Notification.objects.filter(toUser=self.user, isSeen=True).order_by('-id').values_list('id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def testPreviousPageLinksBackToNewerNotifications(self):
+        for i in range(9):
+            Notification.objects.create(toUser=self.user, title='test'+str(i), message='test message', isSeen=True, type="basic")
+        firstPage = self.client.get(self.url).context['readNotificationsPaginated']
+        self.assertFalse(firstPage.has_previous())
+        secondPage = self.client.get(self.url + firstPage.nextUrl).context['readNotificationsPaginated']
+        self.assertTrue(secondPage.has_previous())
+        response = self.client.get(self.url + secondPage.previousUrl)
+        page = response.context['readNotificationsPaginated']
+        self.assertEqual(list(page), list(firstPage))
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def testListsArePagedIndependently(self):
+        Notification.objects.filter(toUser=self.user).delete()
+        for i in range(6):
+            Notification.objects.create(toUser=self.user, title='test'+str(i), message='test message', isSeen=False, type="basic")
+            Notification.objects.create(toUser=self.user, title='test'+str(i), message='test message', isSeen=True, type="basic")
+        response = self.client.get(self.url)
+        firstUnreadPage = response.context['unreadNotificationsPaginated']
+        readNextUrl = response.context['readNotificationsPaginated'].nextUrl
+        response = self.client.get(self.url + readNextUrl)
+        # moving through the read list leaves the unread list on its first page
+        self.assertEqual(list(response.context['unreadNotificationsPaginated']), list(firstUnreadPage))
+        self.assertEqual(len(response.context['readNotificationsPaginated']), 1)
+        # and moving through the unread list keeps the read list's cursor
+        unreadNextUrl = response.context['unreadNotificationsPaginated'].nextUrl
+        self.assertIn('readAfter=', unreadNextUrl)
+        response = self.client.get(self.url + unreadNextUrl)
+        self.assertEqual(len(response.context['unreadNotificationsPaginated']), 1)
+        self.assertEqual(len(response.context['readNotificationsPaginated']), 1)
+
+    def testDeepPagesCostTheSameAsTheFirst(self):
+        Notification.objects.bulk_create([
+            Notification(toUser=self.user, title='test'+str(i), message='test message', isSeen=True, type='basic')
+            for i in range(50)
+        ])
+        with CaptureQueriesContext(connection) as firstPageQueries:
+            page = self.client.get(self.url).context['readNotificationsPaginated']
+        for _ in range(8):
+            page = self.client.get(self.url + page.nextUrl).context['readNotificationsPaginated']
+        with CaptureQueriesContext(connection) as deepPageQueries:
+            self.client.get(self.url + page.nextUrl)
+        self.assertEqual(len(deepPageQueries), len(firstPageQueries))
+        notificationQueries = [query['sql'] for query in deepPageQueries if 'walletwizard_notification' in query['sql']]
+        self.assertFalse(any('OFFSET' in sql for sql in notificationQueries))
+
+    def testInvalidCursorReturnsNotFound(self):
+        for cursor in ['readAfter=abc', 'unreadBefore=1-2-3', 'readBefore=12', 'readAfter=' + '9' * 30 + '-1', 'unreadAfter=1-' + '9' * 30]:
+            response = self.client.get(self.url + '?' + cursor)
+            self.assertEqual(response.status_code, 404)
+
     def testRedirectsIfUserNotLoggedIn(self): 
         self.client.logout()
         redirectUrl = reverse_with_next('logIn', self.url)
@@ -3,6 +3,9 @@ from django.test import TestCase
 from django.urls import reverse
 from walletwizard.models import User, Category, Expenditure, SpendingLimit
 from walletwizard.tests.testHelpers import reverse_with_next
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
 import datetime
 
 class HomeViewTest(TestCase):
@@ -79,4 +82,37 @@ class HomeViewTest(TestCase):
         categorySpentThisYear = self.expenditure.amount
         response = self.client.get(self.url)
         self.assertEqual(totalSpentThisYear, self.category.totalSpentInTimePeriod())
-        self.assertEqual(categorySpentThisYear, response.context['data'][0])        
\ No newline at end of file
+        self.assertEqual(categorySpentThisYear, response.context['data'][0])
+
+    def testCategoryProgressIsPrecomputed(self):
+        response = self.client.get(self.url)
+        category = response.context['summary'].categories[0]
+        self.assertEqual(category.totalSpent, self.category.totalSpentInTimePeriod())
+        self.assertEqual(category.remainingBudget, self.spendingLimit.amount - self.expenditure.amount)
+        self.assertEqual(category.progress, self.category.progressAsPercentage())
+        self.assertEqual(response.context['summary'].progressAsPercentage(), self.user.progressAsPercentage())
+
+    def testQueryCountDoesNotGrowWithCategories(self):
+        queriesBefore = self._countQueries()
+        for i in range(5):
+            spendingLimit = SpendingLimit.objects.create(amount=50, timePeriod='weekly')
+            category = Category.objects.create(name=f'category{i}', spendingLimit=spendingLimit)
+            category.expenditures.add(self.expenditure)
+            category.users.add(self.user)
+            self.user.categories.add(category)
+        self.assertEqual(queriesBefore, self._countQueries())
+
+    def testCachedPageLoadMakesNoNotificationQueries(self):
+        cache.clear()
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        notificationQueries = [query for query in context.captured_queries if 'walletwizard_notification' in query['sql']]
+        self.assertEqual(notificationQueries, [])
+
+    def _countQueries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
@@ -3,7 +3,9 @@ from django.test import TestCase
 from django.urls import reverse
 from walletwizard.tests.testHelpers import reverse_with_next
 from walletwizard.forms import ReportForm
-from walletwizard.models import User, Expenditure, Category
+from walletwizard.models import User, Expenditure, Category, SpendingLimit
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import datetime
 
 class ReportViewTest(TestCase):
@@ -58,4 +60,31 @@ class ReportViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed('reports.html')
         self.assertEqual(response.context['labels'], [])
-        self.assertEqual(response.context['data'], [])
\ No newline at end of file
+        self.assertEqual(response.context['data'], [])
+
+    def testPostGeneratesCurrentAndAverageData(self):
+        self.expenditure.save()
+        response = self.client.post(reverse('reports'), self.input, follow=True)
+        self.assertEqual(response.context['labels'], [self.category.name])
+        self.assertEqual(len(response.context['data']), 1)
+        for key in ['data1', 'data2', 'data3']:
+            self.assertEqual(len(response.context[key]), 1)
+
+    def testQueryCountDoesNotGrowWithSelectedCategories(self):
+        queriesBefore = self._countQueries()
+        selectedCategories = [self.category.id]
+        for i in range(5):
+            spendingLimit = SpendingLimit.objects.create(amount=50, timePeriod='weekly')
+            category = Category.objects.create(name=f'category{i}', spendingLimit=spendingLimit)
+            category.expenditures.add(self.expenditure)
+            category.users.add(self.user)
+            self.user.categories.add(category)
+            selectedCategories.append(category.id)
+        self.input['selectedCategory'] = selectedCategories
+        self.assertEqual(queriesBefore, self._countQueries())
+
+    def _countQueries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, self.input)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
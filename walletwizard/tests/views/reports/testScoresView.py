@@ -1,8 +1,13 @@
 """Tests for the scores view."""
 from django.test import TestCase
 from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from walletwizard.models import Points, House, User
 from walletwizard.tests.testHelpers import reverse_with_next
+from walletwizard.helpers.pointsHelpers import updateUserPoints
+from walletwizard.helpers.leaderboardHelpers import refreshLeaderboardRanks
 
 class ScoresViewTest(TestCase):
     """Tests for the scores view."""
@@ -10,6 +15,7 @@ class ScoresViewTest(TestCase):
     fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
 
     def setUp(self):
+        cache.clear()
         self.url = reverse('scores')
         self.house1 = House.objects.get(id=1)
         self.house2 = House.objects.get(id=2)
@@ -48,6 +54,94 @@ class ScoresViewTest(TestCase):
         self.assertEqual(topUsers[0], self.points2)
         self.assertEqual(topUsers[1], self.points1)
 
+    def testUserRankIsShownFromTheLastRefresh(self):
+        response = self.client.get(self.url)
+        self.assertIsNone(response.context['userRank'])
+        self.assertNotContains(response, 'You are ranked')
+        self.assertEqual(refreshLeaderboardRanks(), 2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['userRank'], 2)
+        self.assertContains(response, 'You are ranked <strong>2</strong>')
+
+    def testPointsChangesMoveUsersInTheLeaderboard(self):
+        refreshLeaderboardRanks()
+        updateUserPoints(self.user1, 100)
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['userPoints']), [self.points1, self.points2])
+        self.assertEqual(response.context['userPoints'][0].count, self.points1.count + 100)
+        self.assertEqual(response.context['userRank'], 2)
+        refreshLeaderboardRanks()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['userRank'], 1)
+
+    def testNewAndDeletedPointsUpdateTheLeaderboard(self):
+        user3 = User.objects.create(firstName="Sam", lastName="Doe", username="sam123", email="sam@email.com")
+        points3 = Points.objects.create(user=user3, count=200)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['topPoints'][0], points3)
+        points3.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['userPoints']), [self.points2, self.points1])
+
+    def _createUsers(self, number):
+        for i in range(number):
+            user = User.objects.create(firstName="User", lastName=str(i), username=f"user{i}x", email=f"user{i}@email.com", house=self.house1)
+            Points.objects.create(user=user, count=i)
+
+    def testLeaderboardIsPagedWithCursors(self):
+        self._createUsers(15)
+        firstPage = self.client.get(self.url).context['userPoints']
+        self.assertEqual(firstPage.startingNumber, 0)
+        self.assertFalse(firstPage.has_previous())
+        secondPage = self.client.get(self.url, {'after': firstPage.nextCursor}).context['userPoints']
+        self.assertEqual(secondPage.startingNumber, 10)
+        self.assertFalse(secondPage.has_next())
+        self.assertEqual(len(secondPage), 7)
+        leaderboard = list(Points.objects.order_by('-count', 'id'))
+        self.assertEqual(list(firstPage) + list(secondPage), leaderboard)
+        previousPage = self.client.get(self.url, {'before': secondPage.previousCursor}).context['userPoints']
+        self.assertEqual(list(previousPage), list(firstPage))
+        self.assertEqual(previousPage.startingNumber, 0)
+        self.assertFalse(previousPage.has_previous())
+        self.assertEqual(previousPage.nextCursor, firstPage.nextCursor)
+
+    def testMalformedCursorsAreNotFound(self):
+        for cursor in ['abc', '5_1', '5_²_1', f'5_{2 ** 63}_1']:
+            response = self.client.get(self.url, {'after': cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def testLeaderboardPageDoesNotCountTheUsers(self):
+        self._createUsers(15)
+        firstPage = self.client.get(self.url).context['userPoints']
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {'after': firstPage.nextCursor})
+        self.assertFalse([query for query in context.captured_queries if 'COUNT(' in query['sql'].upper()])
+
+    def testLeaderboardPageUsesConstantQueries(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as smallContext:
+            self.client.get(self.url)
+        self._createUsers(15)
+        firstPage = self.client.get(self.url).context['userPoints']
+        with CaptureQueriesContext(connection) as largeContext:
+            response = self.client.get(self.url, {'after': firstPage.nextCursor})
+        self.assertEqual(len(response.context['userPoints']), 7)
+        self.assertEqual(len(largeContext.captured_queries), len(smallContext.captured_queries))
+
+    def testRanksBreakTiesByPointsId(self):
+        self.points2.count = self.points1.count
+        self.points2.save()
+        refreshLeaderboardRanks()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['userRank'], 1)
+        self.assertEqual(list(response.context['userPoints']), [self.points1, self.points2])
+
+    def testRanksAreRefreshedInBatches(self):
+        self._createUsers(15)
+        self.assertEqual(refreshLeaderboardRanks(batchSize=4), 17)
+        ranks = list(Points.objects.order_by('-count', 'id').values_list('rank', flat=True))
+        self.assertEqual(ranks, list(range(1, 18)))
+
     def testScoresViewRedirectsToLoginIfNotLoggedIn(self):
         self.client.logout()
         redirectUrl = reverse_with_next('logIn', self.url)
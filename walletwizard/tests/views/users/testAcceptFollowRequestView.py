@@ -28,6 +28,7 @@ class AcceptFollowRequestViewTest(TestCase):
     def testFromUserIsFollowingToUser(self):
         followersBefore = self.toUser.followerCount()
         self.client.get(self.url)
+        self.toUser.refresh_from_db()
         followersAfter = self.toUser.followerCount()
         self.assertEqual(followersAfter, followersBefore+1) 
         self.assertTrue(self.toUser.followers.filter(id=self.fromUser.id).exists())
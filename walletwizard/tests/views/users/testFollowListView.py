@@ -0,0 +1,79 @@
+"""Tests of the follower and followee list views."""
+from django.test import TestCase
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from walletwizard.models import User
+from walletwizard.helpers.followHelpers import FOLLOW_PAGE_SIZE
+from walletwizard.tests.testHelpers import reverse_with_next
+
+class FollowListViewTest(TestCase):
+    """Tests of the follower and followee list views."""
+
+    fixtures = ['walletwizard/tests/fixtures/defaultObjects.json']
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.client.force_login(self.user)
+        User.objects.bulk_create([
+            User(username=f'follower{i}', firstName='Follower', lastName=str(i), email=f'follower{i}@example.org')
+            for i in range(FOLLOW_PAGE_SIZE + 5)
+        ])
+        self.followers = list(User.objects.filter(username__startswith='follower').order_by('id'))
+        for follower in self.followers:
+            self.user.followers.add(follower)
+        self.url = reverse('followers', args=[self.user.id])
+
+    def testFirstPageShowsMostRecentFollowers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'partials/users/followList.html')
+        users = response.context['users']
+        self.assertEqual(len(users), FOLLOW_PAGE_SIZE)
+        self.assertEqual(users[0], self.followers[-1])
+        self.assertContains(response, 'Load more')
+
+    def testNextPageFollowsTheCursor(self):
+        nextUrl = self.client.get(self.url).context['nextUrl']
+        response = self.client.get(nextUrl)
+        self.assertEqual(response.context['users'], list(reversed(self.followers[:5])))
+        self.assertIsNone(response.context['nextUrl'])
+        self.assertNotContains(response, 'Load more')
+
+    def testPageRunsConstantQueries(self):
+        singleFollowerUrl = reverse('followers', args=[self.followers[0].id])
+        self.followers[0].followers.add(self.user)
+        self.client.get(singleFollowerUrl)
+        with CaptureQueriesContext(connection) as smallContext:
+            self.client.get(singleFollowerUrl)
+        with CaptureQueriesContext(connection) as largeContext:
+            self.client.get(self.url)
+        self.assertEqual(len(largeContext.captured_queries), len(smallContext.captured_queries))
+
+    def testFolloweesPage(self):
+        self.followers[0].followers.add(self.user)
+        response = self.client.get(reverse('followees', args=[self.user.id]))
+        self.assertEqual(response.context['users'], [self.followers[0]])
+        loner = User.objects.create(username='loner', firstName='Lone', lastName='User', email='loner@example.org')
+        response = self.client.get(reverse('followees', args=[loner.id]))
+        self.assertContains(response, 'Not following anyone yet.')
+
+    def testInvalidCursorIsABadRequest(self):
+        for cursor in ['abc', '²', '-1', str(2 ** 63)]:
+            response = self.client.get(self.url, {'after': cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def testUnknownUserReturnsNotFound(self):
+        response = self.client.get(reverse('followers', args=[User.objects.order_by('-id').first().id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def testProfileDoesNotRenderFollowers(self):
+        response = self.client.get(reverse('showUser', args=[self.user.id]))
+        self.assertContains(response, f'Followers ({FOLLOW_PAGE_SIZE + 5})')
+        self.assertNotContains(response, 'follower0')
+        self.assertContains(response, self.url)
+
+    def testRedirectsToLoginIfUserNotLoggedIn(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse_with_next('logIn', self.url), status_code=302, target_status_code=200)
@@ -41,37 +41,54 @@ class SearchUsersViewTest(TestCase):
         self.assertContains(response, 'Jane', count=1)
 
     def testSearchUsersWithMultipleUsersReturned(self):
-        users = createUsers(15)
+        createUsers(15)
         response = self.client.get(self.url, {'q': 'user'})
-        for user in users:
-            if 'user' in user.username:
-                self.assertContains(response, user.username)
-        # test that the search results contain 15 users
+        for user in response.context['users']:
+            self.assertContains(response, user.username)
+        # test that the search results show the first 10 of the 15 users
         users = response.context['users']
-        self.assertEqual(users.count(), 15)
+        self.assertTrue(response.context['hasMoreUsers'])
+        self.assertEqual(len(users), 10)
         self.assertTemplateUsed(response, 'partials/users/searchResults.html')
 
     def testSearchUsersFiltersMultipleUsers(self):
         users = createUsers(15)
         response = self.client.get(self.url, {'q': 'user'})
-        users = response.context['users']
-        self.assertEqual(users.count(), 15)
+        self.assertTrue(response.context['hasMoreUsers'])
         response = self.client.get(self.url, {'q': 'user1'})
-        users = response.context['users']
-        self.assertEqual(users.count(), 7)
+        self.assertEqual(len(response.context['users']), 7)
+        self.assertFalse(response.context['hasMoreUsers'])
         response = self.client.get(self.url, {'q': 'user12'})
-        users = response.context['users']
-        self.assertEqual(users.count(), 1)
+        self.assertEqual(len(response.context['users']), 1)
         self.assertTemplateUsed(response, 'partials/users/searchResults.html')
 
     def testSearchUsersWithoutQuery(self):
         url = reverse('searchUsers')
         response = self.client.get(url)
-        self.assertContains(response, 'testuser')
-        self.assertContains(response, 'janedoe')
+        self.assertEqual(response.context['users'], [])
+        self.assertNotContains(response, 'testuser')
+        self.assertNotContains(response, 'janedoe')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'partials/users/searchResults.html')
     
+    def testSearchUsersIsCaseInsensitive(self):
+        response = self.client.get(self.url, {'q': 'JaNe'})
+        self.assertEqual([user.username for user in response.context['users']], ['janedoe'])
+
+    def testSearchUsersShowsTheFirstMatchesWithoutCounting(self):
+        createUsers(15)
+        response = self.client.get(self.url, {'q': 'user'})
+        self.assertEqual([user.username for user in response.context['users']], [f'user{i}' for i in [1, 10, 11, 12, 13, 14, 15, 2, 3, 4]])
+        self.assertContains(response, 'Showing the first 10 users')
+        response = self.client.get(self.url, {'q': 'user1'})
+        self.assertNotContains(response, 'keep typing')
+
+    def testSearchUsersWithTheLastCharacterInTheQuery(self):
+        for query in [chr(0x10FFFF), f'ja{chr(0x10FFFF)}', chr(0xD7FF)]:
+            response = self.client.get(self.url, {'q': query})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context['users']), [])
+
     def testSearchUsersViewRedirectsToLoginIfNotLoggedIn(self):
         self.client.logout()
         url = reverse('followToggle', kwargs={'userId': self.secondUser.id})
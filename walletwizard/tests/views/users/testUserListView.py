@@ -1,7 +1,9 @@
 """Tests of users view."""
 from django.test import TestCase
 from django.urls import reverse
-from walletwizard.models import User
+from walletwizard.models import User, House
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from walletwizard.tests.testHelpers import createUsers
 from walletwizard.tests.testHelpers import reverse_with_next
 
@@ -40,6 +42,44 @@ class UserListViewTest(TestCase):
         self.assertTrue(response.context['is_paginated'])
         self.assertEqual(response.context['users'].paginator.num_pages, 2)
 
+    def testUserListViewShowsHouses(self):
+        house = House.objects.get(id=2)
+        for user in createUsers(3):
+            user.house = house
+            user.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, house.name, count=3)
+
+    def testUserListViewRunsConstantQueries(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        house = House.objects.get(id=2)
+        for user in createUsers(15):
+            user.house = house
+            user.save()
+        with CaptureQueriesContext(connection) as largeContext:
+            self.client.get(self.url)
+        self.assertEqual(len(largeContext.captured_queries), len(context.captured_queries))
+
+    def testUserListViewMarksFollowedUsers(self):
+        users = createUsers(3)
+        users[1].followers.add(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['followedUserIds'], {users[1].id})
+        self.assertContains(response, 'Following', count=1)
+
+    def testUserListViewElidesPageLinks(self):
+        User.objects.bulk_create([
+            User(username=f'user{i}', firstName='first', lastName='last', email=f'user{i}@example.com')
+            for i in range(199)
+        ]) # 200 users total
+        response = self.client.get(self.url)
+        self.assertContains(response, '?page=4"')
+        self.assertNotContains(response, '?page=6"')
+        self.assertContains(response, '…')
+        self.assertContains(response, '?page=20"')
+
     def testRedirectsToLoginIfUserNotLoggedIn(self):
         self.client.logout()
         redirectUrl = reverse_with_next('logIn', self.url)
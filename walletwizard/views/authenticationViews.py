@@ -4,6 +4,7 @@ from django.views import View
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import login,logout
+from django.db.models import F
 from walletwizard.models import House
 from walletwizard.forms import SignUpForm, LogInForm
 from walletwizard.helpers.pointsHelpers import createUserPoints, updateUserPoints, updateHousePoints
@@ -38,8 +39,7 @@ class SignUpView(LoginProhibitedMixin, View):
             house = House.objects.get(id = (user.id % 4) + 1)
             user.house = house
             user.save()
-            house.memberCount += 1
-            house.save()
+            House.objects.filter(id=house.id).update(memberCount=F('memberCount') + 1)
             updateHousePoints(user, 50)
            
             return redirect(REDIRECT_URL_WHEN_LOGGED_IN)
@@ -2,12 +2,15 @@
 from django.shortcuts import render, redirect, reverse
 from django.views import View
 from django.contrib import messages
-from PersonalSpendingTracker import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
+from django.http import StreamingHttpResponse, Http404
 from walletwizard.models import Category, Expenditure
-from walletwizard.forms import ExpenditureForm
-import os
+from walletwizard.forms import ExpenditureForm, ImportExpendituresForm
 from walletwizard.helpers.pointsHelpers import updateUserPointsForExpenditureCreation, isCategoryOverSpendingLimit
+from walletwizard.helpers.exportHelpers import EXPORT_FORMATS, streamExpenditures
+from walletwizard.helpers.importHelpers import IMPORT_READ_ERRORS, getImportFormat, parseRows, importExpenditures
+from walletwizard.helpers.fileResponseHelpers import createFileResponse
 
         
 class CreateExpenditureView(LoginRequiredMixin, View):
@@ -33,6 +36,36 @@ class CreateExpenditureView(LoginRequiredMixin, View):
         return redirect(reverse('category', args=[kwargs['categoryId']]))
 
 
+class ImportExpendituresView(LoginRequiredMixin, View):
+    '''View that imports expenditures from an uploaded CSV file or OFX bank statement into a category.'''
+
+    MAX_REPORTED_ERRORS = 5
+
+    def post(self, request, *args, **kwargs):
+        category = request.user.categories.filter(id=kwargs['categoryId']).first()
+        if category is None:
+            raise Http404
+        form = ImportExpendituresForm(request.POST, request.FILES)
+        if form.is_valid():
+            file = form.cleaned_data['file']
+            try:
+                result = importExpenditures(request.user, category, parseRows(file, getImportFormat(file.name)))
+            except IMPORT_READ_ERRORS as error:
+                # the import runs in one transaction, so nothing was imported
+                messages.error(request, f'Failed to import expenditures - File: The file could not be read ({error}).')
+                return redirect(reverse('category', args=[kwargs['categoryId']]))
+            messages.success(request, f'{result.createdCount} expenditures were successfully imported.')
+            for rowNumber, error in result.errors[:self.MAX_REPORTED_ERRORS]:
+                messages.error(request, f'Failed to import row {rowNumber} - {error}')
+            if len(result.errors) > self.MAX_REPORTED_ERRORS:
+                messages.error(request, f'{len(result.errors) - self.MAX_REPORTED_ERRORS} more rows could not be imported.')
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, 'Failed to import expenditures - '+ str(field).title() +': '+ str(error))
+        return redirect(reverse('category', args=[kwargs['categoryId']]))
+
+
 class EditExpenditureView(LoginRequiredMixin, View):
     '''View that updates an expenditure of the logged-in user.'''
 
@@ -62,11 +95,50 @@ class DeleteExpenditureView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         expenditure = Expenditure.objects.get(id=kwargs['expenditureId'])
         expenditureTitle = expenditure.title
-        # Remove receipt from folder if exists
-        receiptPath = os.path.join(settings.MEDIA_ROOT, expenditure.receipt.name)
-        if not os.path.isdir(receiptPath):
-            os.remove(receiptPath)
-
+        # Receipt files may be shared, they are deleted by the receipt collector once unused
         expenditure.delete()
         messages.add_message(request, messages.SUCCESS, f'Your expenditure \'{expenditureTitle}\' was successfully deleted.')
-        return redirect(reverse('category', args=[kwargs['categoryId']]))
\ No newline at end of file
+        return redirect(reverse('category', args=[kwargs['categoryId']]))
+
+
+class ExportExpendituresView(LoginRequiredMixin, View):
+    '''View that streams all of the logged-in user's expenditures as CSV or NDJSON.'''
+
+    def get(self, request, *args, **kwargs):
+        exportFormat = kwargs['exportFormat']
+        if exportFormat not in EXPORT_FORMATS:
+            raise Http404(f'Unknown export format: {exportFormat}')
+        response = StreamingHttpResponse(
+            streamExpenditures(request.user, exportFormat), content_type=EXPORT_FORMATS[exportFormat]
+        )
+        response['Content-Disposition'] = f'attachment; filename="expenditures.{exportFormat}"'
+        return response
+
+
+class ReceiptView(LoginRequiredMixin, View):
+    '''View that serves a receipt of an expenditure in one of the logged-in user's categories.'''
+
+    VARIANT_FIELDS = {'original': 'receipt', 'thumbnail': 'receiptThumbnail', 'web': 'receiptWeb'}
+
+    def get(self, request, *args, **kwargs):
+        field = self.VARIANT_FIELDS.get(kwargs['variant'])
+        expenditure = Expenditure.objects.filter(
+            id=kwargs['expenditureId'], expenditures__users=request.user
+        ).only('receipt', 'receiptThumbnail', 'receiptWeb').first()
+        # other users' receipts are not found rather than forbidden, so their ids are not given away
+        if field is None or expenditure is None:
+            raise Http404
+        # nothing is served until the receipt worker has replaced the upload with a copy
+        # without its EXIF data, which often holds where a phone photo was taken
+        receipt = getattr(expenditure, field)
+        if not receipt or not expenditure.receiptThumbnail:
+            raise Http404
+        try:
+            return createFileResponse(
+                request,
+                receipt.path,
+                settings.RECEIPT_SERVING['MODE'],
+                settings.RECEIPT_SERVING['ACCEL_REDIRECT_PREFIX'] + receipt.name,
+            )
+        except FileNotFoundError:
+            raise Http404
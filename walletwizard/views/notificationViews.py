@@ -3,9 +3,10 @@ from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
+from django.http import Http404
 from walletwizard.models import ShareCategoryNotification, Notification
-from walletwizard.helpers.notificationsHelpers import createBasicNotification
+from walletwizard.helpers.notificationsHelpers import createBasicNotification, clearNotificationCache
+from walletwizard.helpers.paginationHelpers import getKeysetPage
 from walletwizard.contextProcessors.notificationsContextProcessor import getNotifications
 
         
@@ -38,29 +39,45 @@ class DeleteRequestView(LoginRequiredMixin, View):
     '''View that deletes a notification request and redirects to the previous page.'''
 
     def get(self, request, *args, **kwargs):
-        Notification.objects.get(id=kwargs['notificationId']).delete()
+        notification = Notification.objects.get(id=kwargs['notificationId'])
+        notification.delete()
+        clearNotificationCache(notification.toUser)
         return redirect(request.META['HTTP_REFERER'])
 
 
 class NotificationsView(LoginRequiredMixin, View):
     '''View to display logged-in user's notifications.'''
 
+    NOTIFICATIONS_PER_PAGE = 5
+
     def get(self,request):
         context = {}
         allNotifications = getNotifications(request)
-        # Add pagination - show 5 unread notifications per page
-        unreadPaginator = Paginator(allNotifications['unreadNotifications'], 5)
-        unreadPage = self.request.GET.get('page')
-        unreadNotificationPaginated = unreadPaginator.get_page(unreadPage)
-        context['unreadNotificationsPaginated'] = unreadNotificationPaginated
-        # Show 5 read notifications per page
-        readPaginator = Paginator(allNotifications['readNotifications'], 5)
-        readPage = self.request.GET.get('page')
-        readNotificationPaginated = readPaginator.get_page(readPage)
-        context['readNotificationsPaginated'] = readNotificationPaginated
+        # Each list is paged with its own cursors (e.g. readAfter), so moving through one
+        # keeps the other on its page, and a deep page costs the same as the first
+        for prefix in ['unread', 'read']:
+            try:
+                page = getKeysetPage(
+                    allNotifications[f'{prefix}Notifications'],
+                    NotificationsView.NOTIFICATIONS_PER_PAGE,
+                    after=request.GET.get(f'{prefix}After'),
+                    before=request.GET.get(f'{prefix}Before'),
+                )
+            except ValueError:
+                raise Http404
+            page.nextUrl = self._pageUrl(request, prefix, 'After', page.nextCursor)
+            page.previousUrl = self._pageUrl(request, prefix, 'Before', page.previousCursor)
+            context[f'{prefix}NotificationsPaginated'] = page
 
         return render(request, "notifications.html", context)
 
+    def _pageUrl(self, request, prefix, direction, cursor):
+        query = request.GET.copy()
+        query.pop(f'{prefix}After', None)
+        query.pop(f'{prefix}Before', None)
+        query[f'{prefix}{direction}'] = cursor
+        return f'?{query.urlencode()}'
+
 
 class EditNotificationsView(LoginRequiredMixin, View):
     '''View to mark logged-in user's notifications as read.'''
@@ -69,6 +86,7 @@ class EditNotificationsView(LoginRequiredMixin, View):
         notification = Notification.objects.get(id=kwargs['notificationId'])
         notification.isSeen = not notification.isSeen
         notification.save()
+        clearNotificationCache(notification.toUser)
 
         # Make logged-in user stay on whichever page they called this request
         return redirect(request.META['HTTP_REFERER'])
@@ -80,7 +98,8 @@ class DeleteNotificationsView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         notification = Notification.objects.get(id=kwargs['notificationId'])
         if notification.isSeen:
-            Notification.objects.get(id=kwargs['notificationId']).delete()
+            notification.delete()
+            clearNotificationCache(notification.toUser)
         return redirect("notifications")
 
 
@@ -89,4 +108,5 @@ class DeleteAllNotifications(LoginRequiredMixin, View):
 
     def get(self, request, *args, **kwargs):
         Notification.objects.filter(toUser = request.user, isSeen = True).delete()
+        clearNotificationCache(request.user)
         return redirect("notifications")
\ No newline at end of file
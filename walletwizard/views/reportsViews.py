@@ -1,15 +1,16 @@
 """Views for displaying reports or analytics."""
 from django.shortcuts import render
 from django.views import View
-from django.views.generic import ListView
+from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from walletwizard.models import Points, House, Category
+from django.http import Http404
+from walletwizard.models import Points, Category
 from walletwizard.forms import ReportForm
-from datetime import timedelta, datetime
-from dateutil.relativedelta import relativedelta
-from walletwizard.helpers.reportsHelpers import createDataAverageArrays
-from walletwizard.helpers.reportsHelpers import createDataAndLabelArrays
+from datetime import datetime
+from walletwizard.helpers.reportsHelpers import createReportArrays
+from walletwizard.helpers.dashboardHelpers import DashboardSummary
+from walletwizard.helpers.pointsHelpers import getHousesWithPoints
+from walletwizard.helpers.leaderboardHelpers import getLeaderboardPage, getUserRank
 from ..helpers.viewsHelpers import generateGraph
 
 
@@ -17,50 +18,47 @@ class HomeView(LoginRequiredMixin, View):
     '''View that handles and shows the Home page to the user.'''
 
     def get(self, request):
-        categories = []
-        totalSpent = []
-
-        for category in Category.objects.filter(users__in=[request.user]):
-            categories.append(str(category))
-            # calculate total spent this month per category
-            categoryExpenseThisMonth = 0.0
-            today = datetime.now()
-            for expense in category.expenditures.filter(date__month=today.month):
-                    categoryExpenseThisMonth += float(expense.amount)
-            totalSpent.append(round(categoryExpenseThisMonth, 2))
+        summary = DashboardSummary(request.user)
 
         houses =[]
         pointTotals = []
-        for house in House.objects.all():
+        for house in getHousesWithPoints():
             houses.append(house.name)
-            pointTotals.append(house.points)
-        dict = generateGraph(categories, totalSpent,'pie')
+            pointTotals.append(house.totalPoints)
+        dict = generateGraph(summary.categoryNames(), summary.spentThisMonthByCategory(),'pie')
         dict.update(generateGraph(houses, pointTotals,'doughnut', 2))
 
         context = {**dict, **{
             'month': datetime.now().strftime('%B'),
             'year': datetime.now().strftime('%Y'),
             'points': Points.objects.get(user=request.user),
+            'summary': summary,
         }}
 
         return render(request, "home.html", context)
 
 
-class ScoresView(LoginRequiredMixin, ListView):
+class ScoresView(LoginRequiredMixin, TemplateView):
     '''View that handles and shows the Scores page to the user.'''
 
-    model = Points
     template_name = "scores.html"
     paginate_by = 10
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        orderedPoints = Points.objects.all().order_by('-count')
-        paginator = Paginator(orderedPoints, self.paginate_by)
-        pageNumber = self.request.GET.get('page')
-        context['houses'] = House.objects.order_by('-points')
-        context['userPoints'] = paginator.get_page(pageNumber)
-        context['topPoints'] = orderedPoints[:4]
+        # the page is read from a cursor onwards and the rank from the last refresh, so nothing
+        # here counts the users however many there are
+        try:
+            userPoints, topPoints = getLeaderboardPage(
+                self.paginate_by, after=self.request.GET.get('after'), before=self.request.GET.get('before')
+            )
+        except ValueError:
+            raise Http404
+        # evaluated once, the template reads the standings by index
+        context['houses'] = list(getHousesWithPoints().order_by('-totalPoints'))
+        context['userPoints'] = userPoints
+        context['topPoints'] = topPoints
+        context['userRank'] = getUserRank(self.request.user)
         return context
 
 
@@ -74,40 +72,24 @@ class ReportsView(LoginRequiredMixin, View):
         return render(request, "reports.html", graphData)
 
     def post(self, request):
-        today = datetime.now()
         form = ReportForm(request.POST, user=request.user)
         categories = []
         totalSpent = []
-        createdArrays = []
         if form.is_valid():
             timePeriod = form.cleaned_data.get('timePeriod')
             selectedCategories = form.cleaned_data.get('selectedCategory')
 
-            createdArrays = createDataAndLabelArrays(selectedCategories, timePeriod)
-            categories = createdArrays[0]
-            totalSpent = createdArrays[1]
+            # the current period and every historical average are computed in a single pass
+            report = createReportArrays(selectedCategories, timePeriod)
+            data1, data2, data3 = report['averages']
 
-            graphData = generateGraph(categories, totalSpent, 'bar')
+            graphData = generateGraph(report['labels'], report['data'], 'bar')
             graphData.update({"form": form, "text": f"An overview of your spending within the last {timePeriod}."})
 
-            # generate a graph for historical data
-            firstDayThisMonth = today.replace(day=1)
-            firstDayNextMonth = (firstDayThisMonth + timedelta(days=32)).replace(day=1)
-            firstDayTwelveMonthsAgo = firstDayNextMonth - relativedelta(years=1)
-            data1 = createDataAverageArrays(selectedCategories, timePeriod, firstDayTwelveMonthsAgo,  [365, 52, 12])
-
+            # graphs for historical data over the last 12, 6 and 3 months
             graphData.update({'data1':data1})
-            graphData.update({'text2':"Comparison to average over last 12 months"})
-
-            sixMonthsAgo = today + relativedelta(months=-6)
-            data2 = createDataAverageArrays(selectedCategories, timePeriod, sixMonthsAgo,  [180, 24, 6])
-
             graphData.update({'data2':data2})
             graphData.update({'text2':f"Compare your average spendings per {timePeriod} in the past"})
-
-            threeMonthsAgo = today + relativedelta(months=-3)
-            data3 = createDataAverageArrays(selectedCategories, timePeriod, threeMonthsAgo,  [90, 12, 3])
-
             graphData.update({'data3':data3})
             graphData.update({'text3':f"Your average spending per {timePeriod}"})
 
@@ -1,17 +1,18 @@
 """Views that are user-related but do not deal with user profile."""
-from django.shortcuts import render, redirect, reverse
+import re
+from django.shortcuts import render, redirect, reverse, get_object_or_404
 from django.views import View
 from django.views.generic import ListView, DetailView
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
-from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseBadRequest
 from walletwizard.models import User, FollowRequestNotification
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from walletwizard.helpers.notificationsHelpers import createBasicNotification
-from walletwizard.helpers.followHelpers import toggleFollow, follow
+from walletwizard.helpers.followHelpers import toggleFollow, follow, getFollowedUserIds, getFollowersPage, getFolloweesPage
+from walletwizard.helpers.paginationHelpers import MAX_ROW_ID
+from walletwizard.helpers.userDirectoryHelpers import USER_DIRECTORY_PAGE_SIZE, getUserDirectory, searchUserDirectoryPage
 
 
 class ShowUserView(LoginRequiredMixin, DetailView):
@@ -29,7 +30,7 @@ class ShowUserView(LoginRequiredMixin, DetailView):
         '''Generate content to be displayed in the template.'''
 
         context = super().get_context_data(*args, **kwargs)
-        user = self.get_object()
+        user = self.object
         context['following'] = self.request.user.isFollowing(user)
         context['followable'] = (self.request.user != user)
         return context
@@ -76,22 +77,50 @@ class AcceptFollowRequestView(LoginRequiredMixin, View):
         return redirect('deleteRequest', notificationId = notification.id)
     
 
+class FollowListView(LoginRequiredMixin, View):
+    '''View returning a page of a user's followers or followees, loaded on demand by the profile panels.'''
+
+    relation = None
+    RELATIONS = {
+        'followers': (getFollowersPage, 'No followers yet.'),
+        'followees': (getFolloweesPage, 'Not following anyone yet.'),
+    }
+
+    def get(self, request, userId):
+        getPage, emptyMessage = FollowListView.RELATIONS[self.relation]
+        user = get_object_or_404(User, id=userId)
+        cursor = request.GET.get('after')
+        # only ASCII digits, isdigit() also accepts characters such as '²' that int() rejects
+        if cursor is not None and (not re.fullmatch(r'[0-9]+', cursor) or int(cursor) > MAX_ROW_ID):
+            return HttpResponseBadRequest('Malformed cursor')
+        users, nextCursor = getPage(user, cursor and int(cursor))
+        context = {
+            'users': users,
+            'emptyMessage': emptyMessage if cursor is None else None,
+            'nextUrl': f"{reverse(self.relation, args=[userId])}?after={nextCursor}" if nextCursor else None,
+        }
+        return render(request, 'partials/users/followList.html', context)
+
+
 class UserListView(LoginRequiredMixin, ListView):
     '''View to show the list of all users.'''
 
-    model = User
     template_name = 'users.html'
     context_object_name = 'users'
-    paginate_by = 10
+    paginate_by = USER_DIRECTORY_PAGE_SIZE
+
+    def get_queryset(self):
+        return getUserDirectory()
 
     def get_context_data(self, *args, **kwargs):
         '''Generate content to be displayed in the template.'''
 
         context = super().get_context_data(*args, **kwargs)
-        paginator = Paginator(self.get_queryset(), self.paginate_by)
-        page = self.request.GET.get('page')
-        users = paginator.get_page(page)
-        context['users'] = users
+        page = context['page_obj']
+        context['users'] = page
+        # only the pages around the current one are linked, however many users there are
+        context['pageRange'] = page.paginator.get_elided_page_range(page.number)
+        context['followedUserIds'] = getFollowedUserIds(self.request.user, page.object_list)
         return context
 
 
@@ -99,11 +128,7 @@ class UserListView(LoginRequiredMixin, ListView):
 def searchUsers(request):
     '''View function to allow logged-in user to filter users by username.'''
 
-    query = request.GET.get('q')
-    if query is None:
-        users = User.objects.all()
-    else:
-        users = User.objects.filter(
-            Q(username__istartswith=query)
-        )
-    return render(request, 'partials/users/searchResults.html', {'users': users})
\ No newline at end of file
+    query = request.GET.get('q', '').strip()
+    users, hasMoreUsers = searchUserDirectoryPage(query)
+    context = {'users': users, 'hasMoreUsers': hasMoreUsers, 'followedUserIds': getFollowedUserIds(request.user, users)}
+    return render(request, 'partials/users/searchResults.html', context)
\ No newline at end of file